@@ -0,0 +1,169 @@
+from bisect import bisect_left
+from collections import defaultdict
+from datetime import date
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from finolog.columnar import ColumnarTable, column, INT, FLOAT, STR, DATE
+
+# Summary rows are read from {'contractor': <contractor>, 'summary': <summary row>}
+SUMMARY_COLUMNS = (
+    column('contractor_id', INT, 'contractor.id'),
+    column('contractor_name', STR, 'contractor.name'),
+    column('date', DATE, 'summary.date'),
+    column('currency_id', INT, 'summary.currency_id'),
+    column('balance', FLOAT, 'summary.balance'),
+    column('incoming', FLOAT, 'summary.incoming'),
+    column('outcoming', FLOAT, 'summary.outcoming'),
+    column('base_balance', FLOAT, 'summary.base_balance'),
+    column('base_incoming', FLOAT, 'summary.base_incoming'),
+    column('base_outcoming', FLOAT, 'summary.base_outcoming'),
+)
+
+DEFAULT_AGING_BUCKETS = (30, 60, 90)
+
+
+def _numpy():
+    """
+    Returns numpy, or None to use the pure Python implementations.
+    """
+    try:
+        import numpy
+    except ImportError:
+        return None
+    return numpy
+
+
+class ContractorBalances:
+    """
+    Summary rows (balances per currency and date) of many contractors in a columnar table,
+    with group-bys computed over whole columns.
+
+    Aggregations run vectorized when numpy is installed and fall back to loops over the
+    array buffers otherwise; both give the same results. Null numbers count as 0.
+    """
+
+    def __init__(self) -> None:
+        self.table = ColumnarTable(SUMMARY_COLUMNS)
+
+    def append(self, contractor: Dict[str, Any]) -> None:
+        """
+        Adds the summary rows of a decoded contractor object.
+        """
+        for summary in contractor.get('summary') or ():
+            self.table.append({'contractor': contractor, 'summary': summary})
+
+    def extend(self, contractors: Iterable[Dict[str, Any]]) -> 'ContractorBalances':
+        for contractor in contractors:
+            self.append(contractor)
+        return self
+
+    def __len__(self) -> int:
+        return len(self.table)
+
+    def _column(self, name: str, np):
+        values = self.table[name].values
+        return np.frombuffer(values, dtype=np.dtype(values.typecode)) if np is not None else values
+
+    def totals_by_currency(self, field: str = 'balance') -> Dict[int, float]:
+        """
+        Returns the sum of a numeric column (balance, incoming, outcoming, ...) per currency_id.
+        """
+
+        np = _numpy()
+        currencies = self._column('currency_id', np)
+        values = self._column(field, np)
+
+        if np is None:
+            totals = defaultdict(float)
+            for currency_id, value in zip(currencies, values):
+                totals[currency_id] += value
+            return dict(totals)
+
+        keys, groups = np.unique(currencies, return_inverse=True)
+        sums = np.bincount(groups, weights=values, minlength=len(keys))
+        return dict(zip(keys.tolist(), sums.tolist()))
+
+    def aging(
+            self,
+            as_of: Optional[date] = None,
+            buckets: Sequence[int] = DEFAULT_AGING_BUCKETS,
+            field: str = 'balance'
+    ) -> Dict[str, Dict[int, float]]:
+        """
+        Returns the sum of a numeric column per age bucket and currency_id. The age of a row
+        is the number of days between its date and as_of (today by default).
+
+        buckets: Sequence[int] : Upper bounds in days, e.g. (30, 60, 90) gives the buckets
+        '0-30', '31-60', '61-90' and '90+'. Rows dated after as_of fall into the first bucket,
+        rows without a date are left out
+        """
+
+        bounds = sorted(buckets)
+        labels = [f'{low}-{high}' for low, high in zip([0] + [b + 1 for b in bounds], bounds)] + [f'{bounds[-1]}+']
+        as_of_day = ((as_of or date.today()) - date(1970, 1, 1)).days
+
+        np = _numpy()
+        days = self._column('date', np)
+        currencies = self._column('currency_id', np)
+        values = self._column(field, np)
+        dated = self.table['date'].valid
+        result: Dict[str, Dict[int, float]] = {label: dict() for label in labels}
+
+        if np is None:
+            for day, currency_id, value, valid in zip(days, currencies, values, dated):
+                if not valid:
+                    continue
+                totals = result[labels[bisect_left(bounds, as_of_day - day)]]
+                totals[currency_id] = totals.get(currency_id, 0.0) + value
+            return result
+
+        dated = np.frombuffer(dated, dtype=np.uint8) != 0
+        if not dated.all():
+            days, currencies, values = days[dated], currencies[dated], values[dated]
+
+        bucket = np.searchsorted(np.asarray(bounds), as_of_day - days, side='left')
+        keys, groups = np.unique(currencies, return_inverse=True)
+        sums = np.bincount(bucket * len(keys) + groups, weights=values, minlength=len(labels) * len(keys))
+        present = np.bincount(bucket * len(keys) + groups, minlength=len(labels) * len(keys)) > 0
+
+        for index in np.flatnonzero(present).tolist():
+            result[labels[index // len(keys)]][int(keys[index % len(keys)])] = float(sums[index])
+        return result
+
+    def top_debtors(self, n: int = 10, currency_id: Optional[int] = None) -> List[Tuple[int, str, float]]:
+        """
+        Returns (contractor_id, name, balance) of the n contractors with the largest positive balance,
+        i.e. the most money owed to the business. Balances of one currency are compared if currency_id
+        is given, otherwise base_balance is summed over all currencies.
+        """
+
+        np = _numpy()
+        ids = self._column('contractor_id', np)
+        names = self._column('contractor_name', np)
+        values = self._column('balance' if currency_id is not None else 'base_balance', np)
+        categories = self.table.categories('contractor_name')
+
+        if np is None:
+            totals: Dict[int, float] = defaultdict(float)
+            name_codes: Dict[int, int] = dict()
+            currencies = self._column('currency_id', np)
+            for id_, code, value, row_currency in zip(ids, names, values, currencies):
+                if currency_id is None or row_currency == currency_id:
+                    totals[id_] += value
+                    name_codes.setdefault(id_, code)
+            ranked = sorted((item for item in totals.items() if item[1] > 0), key=lambda item: (-item[1], item[0]))[:n]
+            return [(id_, categories[name_codes[id_]] if name_codes[id_] >= 0 else None, total) for id_, total in ranked]
+
+        if currency_id is not None:
+            selected = self._column('currency_id', np) == currency_id
+            ids, names, values = ids[selected], names[selected], values[selected]
+
+        keys, first, groups = np.unique(ids, return_index=True, return_inverse=True)
+        totals = np.bincount(groups, weights=values, minlength=len(keys))
+        order = np.argsort(-totals, kind='stable')[:n]
+        order = order[totals[order] > 0]
+
+        return [
+            (int(keys[i]), categories[names[first[i]]] if names[first[i]] >= 0 else None, float(totals[i]))
+            for i in order.tolist()
+        ]
@@ -0,0 +1,266 @@
+import json
+import re
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Set, Tuple, Iterable
+
+from finolog.transport import request_key
+
+# Collections whose responses embed objects of the key collection:
+# documents embed contractors and requisites, contractors may embed requisites.
+EMBEDDED_IN = {
+    'contractor': ('orders/document',),
+    'requisite': ('contractor', 'orders/document'),
+}
+
+
+class CacheBackend:
+    """
+    Storage for cached responses. Entries are stored with the request URL so they can be invalidated by URL.
+    """
+
+    def get(self, key: str) -> Any:
+        """
+        Returns the stored value, or None if the key is missing or expired.
+        """
+        raise NotImplementedError
+
+    def set(self, key: str, url: str, value: Any, ttl: float) -> None:
+        raise NotImplementedError
+
+    def invalidate(self, url: str, subtree: bool = True) -> None:
+        """
+        Removes entries for url and, if subtree is set, for every URL below it.
+        """
+        raise NotImplementedError
+
+    def clear(self) -> None:
+        raise NotImplementedError
+
+
+class LRUCacheBackend(CacheBackend):
+    """
+    In-memory cache backend. Entries are indexed by URL, and URLs by their parent path,
+    so invalidation visits only the affected entries.
+    """
+
+    def __init__(self, maxsize: int = 10000) -> None:
+        self.maxsize = maxsize
+        self._lock = threading.Lock()
+        self._data: 'OrderedDict[str, Tuple[str, Any, float]]' = OrderedDict()
+        # Keys of the entries by URL, and the URLs one path segment below a URL
+        # that hold entries or have some below them
+        self._keys: Dict[str, Set[str]] = dict()
+        self._children: Dict[str, Set[str]] = dict()
+
+    def _link(self, url: str) -> None:
+        self._keys.setdefault(url, set())
+        parent = url.rpartition('/')[0]
+        while parent:
+            children = self._children.setdefault(parent, set())
+            if url in children:
+                return
+            children.add(url)
+            url, parent = parent, parent.rpartition('/')[0]
+
+    def _unlink(self, url: str) -> None:
+        while url not in self._keys and url not in self._children:
+            parent = url.rpartition('/')[0]
+            children = self._children.get(parent)
+            if children is None:
+                return
+            children.discard(url)
+            if children:
+                return
+            del self._children[parent]
+            url = parent
+
+    def _delete(self, key: str) -> None:
+        url = self._data.pop(key)[0]
+        keys = self._keys[url]
+        keys.discard(key)
+        if not keys:
+            del self._keys[url]
+            self._unlink(url)
+
+    def get(self, key: str) -> Any:
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                return None
+
+            url, value, expires_at = entry
+            if expires_at < time.monotonic():
+                self._delete(key)
+                return None
+
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key: str, url: str, value: Any, ttl: float) -> None:
+        with self._lock:
+            if key in self._data:
+                self._delete(key)
+            self._data[key] = (url, value, time.monotonic() + ttl)
+            self._link(url)
+            self._keys[url].add(key)
+
+            while len(self._data) > self.maxsize:
+                self._delete(next(iter(self._data)))
+
+    def invalidate(self, url: str, subtree: bool = True) -> None:
+        with self._lock:
+            urls = [url]
+            keys = []
+            for current in urls:
+                keys.extend(self._keys.get(current, ()))
+                if subtree:
+                    urls.extend(self._children.get(current, ()))
+
+            for key in keys:
+                self._delete(key)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+            self._keys.clear()
+            self._children.clear()
+
+
+class SQLiteCacheBackend(CacheBackend):
+    """
+    Persistent cache backend; entries survive restarts and can be shared by processes on one host.
+    Expired entries are deleted when they are read and, all at once, whenever an entry is stored.
+    """
+
+    def __init__(self, path: str) -> None:
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._db.execute('PRAGMA journal_mode=WAL')
+        self._db.execute(
+            'CREATE TABLE IF NOT EXISTS response_cache '
+            '(key TEXT PRIMARY KEY, url TEXT NOT NULL, value TEXT NOT NULL, expires_at REAL NOT NULL)'
+        )
+        self._db.execute('CREATE INDEX IF NOT EXISTS response_cache_url ON response_cache (url)')
+        self._db.execute('CREATE INDEX IF NOT EXISTS response_cache_expires_at ON response_cache (expires_at)')
+
+    def get(self, key: str) -> Any:
+        now = time.time()
+        with self._lock:
+            row = self._db.execute(
+                'SELECT value, expires_at FROM response_cache WHERE key = ?', (key,)
+            ).fetchone()
+
+            if row is not None and row[1] < now:
+                self._db.execute('DELETE FROM response_cache WHERE key = ? AND expires_at < ?', (key, now))
+
+        if row is None or row[1] < now:
+            return None
+
+        return json.loads(row[0])
+
+    def set(self, key: str, url: str, value: Any, ttl: float) -> None:
+        now = time.time()
+        with self._lock:
+            self._db.execute('DELETE FROM response_cache WHERE expires_at < ?', (now,))
+            self._db.execute(
+                'INSERT OR REPLACE INTO response_cache (key, url, value, expires_at) VALUES (?, ?, ?, ?)',
+                (key, url, json.dumps(value), now + ttl)
+            )
+
+    def invalidate(self, url: str, subtree: bool = True) -> None:
+        with self._lock:
+            if subtree:
+                pattern = url.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_') + '/%'
+                self._db.execute(
+                    "DELETE FROM response_cache WHERE url = ? OR url LIKE ? ESCAPE '\\'", (url, pattern)
+                )
+            else:
+                self._db.execute('DELETE FROM response_cache WHERE url = ?', (url,))
+
+    def clear(self) -> None:
+        with self._lock:
+            self._db.execute('DELETE FROM response_cache')
+
+    def close(self) -> None:
+        self._db.close()
+
+
+class ResponseCache:
+    """
+    Opt-in cache of decoded GET responses, keyed by URL and payload.
+
+    Writes sent through the same transport evict the written entity, everything below it,
+    the list pages of its collection and the collections that embed it (see EMBEDDED_IN).
+
+    backend: CacheBackend : Storage, LRUCacheBackend by default
+    ttls: dict : Per-endpoint TTLs in seconds: regular expressions searched in the request URL,
+    the first match wins. A TTL of 0 disables caching for the endpoint
+    default_ttl: float : TTL of endpoints not matched by ttls
+    """
+
+    def __init__(
+            self,
+            backend: Optional[CacheBackend] = None,
+            ttls: Optional[Dict[str, float]] = None,
+            default_ttl: float = 60
+    ) -> None:
+        self.backend = LRUCacheBackend() if backend is None else backend
+        self.ttls = [(re.compile(pattern), ttl) for pattern, ttl in (ttls or {}).items()]
+        self.default_ttl = default_ttl
+        # Bumped on every write, so responses of reads that raced a write are not stored
+        self.generation = 0
+
+    def ttl_for(self, url: str) -> float:
+        for pattern, ttl in self.ttls:
+            if pattern.search(url):
+                return ttl
+        return self.default_ttl
+
+    @staticmethod
+    def key(method: str, url: str, payload) -> str:
+        return '\n'.join(request_key(method, url, payload))
+
+    def get(self, method: str, url: str, payload) -> Any:
+        if method != 'GET':
+            return None
+
+        return self.backend.get(self.key(method, url, payload))
+
+    def set(self, method: str, url: str, payload, value: Any, generation: Optional[int] = None) -> None:
+        """
+        Stores a response. Pass the generation read before sending the request
+        to drop the response if a write happened in the meantime.
+        """
+        if method != 'GET' or generation is not None and generation != self.generation:
+            return
+
+        ttl = self.ttl_for(url)
+        if ttl > 0:
+            self.backend.set(self.key(method, url, payload), url, value, ttl)
+
+    def invalidate_for_write(self, url: str) -> None:
+        self.generation += 1
+        for invalidated, subtree in self._invalidated_urls(url):
+            self.backend.invalidate(invalidated, subtree)
+
+    @staticmethod
+    def _invalidated_urls(url: str) -> Iterable[Tuple[str, bool]]:
+        collection, _, last = url.rpartition('/')
+        if last.isdigit():
+            yield url, True
+        else:
+            collection = url
+
+        yield collection, False
+
+        for name, embedders in EMBEDDED_IN.items():
+            if collection.endswith('/' + name):
+                root = collection[:-len(name)]
+                for embedder in embedders:
+                    yield root + embedder, True
+
+    def clear(self) -> None:
+        self.backend.clear()
@@ -1,17 +1,125 @@
-from finolog.services.contractor_service import FinologContractorService
-from finolog.services.country_service import FinologCountryService
-from finolog.services.document_service import FinologDocumentService
-from finolog.services.requisite_service import FinologRequisiteService
+from typing import Optional
+
+from finolog.services.contractor_service import FinologContractorService, AsyncFinologContractorService
+from finolog.services.country_service import FinologCountryService, AsyncFinologCountryService
+from finolog.services.document_service import FinologDocumentService, AsyncFinologDocumentService
+from finolog.services.requisite_service import FinologRequisiteService, AsyncFinologRequisiteService
+from finolog.identity_map import IdentityMap
+from finolog.transport import FinologTransport, AsyncFinologTransport
 
 
 class FinologClient:
-    def __init__(self, api_token: str, biz_id: int) -> None:
+    def __init__(
+            self,
+            api_token: str,
+            biz_id: int,
+            transport: Optional[FinologTransport] = None,
+            identity_map: Optional[IdentityMap] = None,
+            validate_payloads: bool = True,
+            trust_responses: bool = False,
+            **transport_options
+    ) -> None:
+        """
+        All services of the client share one transport (and so one connection pool).
+
+        transport: FinologTransport : Existing transport to share, e.g. between clients of several businesses
+        identity_map: IdentityMap : Map of known entities shared by the services, used to answer
+        get_contractor, get_requisite and get_document without a request
+        validate_payloads: bool : Check payloads against the endpoint schemas before sending.
+        Disable in production once the calling code is known to send valid payloads
+        trust_responses: bool : Return ModelView objects, built without validation and parsing
+        datetime fields on access, instead of pydantic models. Can be overridden per call
+        transport_options : Options for a new FinologTransport, see FinologTransport
+        """
+
+        if not isinstance(biz_id, int):
+            raise TypeError('biz_id must be a number')
+
+        if transport is None:
+            transport = FinologTransport(api_token, **transport_options)
+        elif transport_options:
+            raise ValueError('transport options cannot be combined with an existing transport')
+
+        self.biz_id = biz_id
+        self.transport = transport
+        self.identity_map = identity_map
+
+        self.contractor = FinologContractorService(
+            api_token=api_token, biz_id=self.biz_id, transport=transport, identity_map=identity_map,
+            validate_payloads=validate_payloads, trust_responses=trust_responses
+        )
+        self.document = FinologDocumentService(
+            api_token=api_token, biz_id=self.biz_id, transport=transport, identity_map=identity_map,
+            validate_payloads=validate_payloads, trust_responses=trust_responses
+        )
+        self.requisite = FinologRequisiteService(
+            api_token=api_token, biz_id=self.biz_id, transport=transport, identity_map=identity_map,
+            validate_payloads=validate_payloads, trust_responses=trust_responses
+        )
+        self.country = FinologCountryService(api_token=api_token, transport=transport)
+
+    def close(self) -> None:
+        self.transport.close()
+
+    def __enter__(self) -> 'FinologClient':
+        return self
+
+    def __exit__(self, *args) -> None:
+        self.close()
+
+
+class AsyncFinologClient:
+    def __init__(
+            self,
+            api_token: str,
+            biz_id: int,
+            transport: Optional[AsyncFinologTransport] = None,
+            identity_map: Optional[IdentityMap] = None,
+            validate_payloads: bool = True,
+            trust_responses: bool = False,
+            **transport_options
+    ) -> None:
+        """
+        Asyncio counterpart of FinologClient: every service method is awaitable.
+
+        transport: AsyncFinologTransport : Existing transport to share
+        identity_map: IdentityMap : See FinologClient
+        validate_payloads: bool : See FinologClient
+        trust_responses: bool : See FinologClient
+        transport_options : Options for a new AsyncFinologTransport, see AsyncFinologTransport
+        """
+
         if not isinstance(biz_id, int):
             raise TypeError('biz_id must be a number')
 
+        if transport is None:
+            transport = AsyncFinologTransport(api_token, **transport_options)
+        elif transport_options:
+            raise ValueError('transport options cannot be combined with an existing transport')
+
         self.biz_id = biz_id
+        self.transport = transport
+        self.identity_map = identity_map
+
+        self.contractor = AsyncFinologContractorService(
+            api_token=api_token, biz_id=self.biz_id, transport=transport, identity_map=identity_map,
+            validate_payloads=validate_payloads, trust_responses=trust_responses
+        )
+        self.document = AsyncFinologDocumentService(
+            api_token=api_token, biz_id=self.biz_id, transport=transport, identity_map=identity_map,
+            validate_payloads=validate_payloads, trust_responses=trust_responses
+        )
+        self.requisite = AsyncFinologRequisiteService(
+            api_token=api_token, biz_id=self.biz_id, transport=transport, identity_map=identity_map,
+            validate_payloads=validate_payloads, trust_responses=trust_responses
+        )
+        self.country = AsyncFinologCountryService(api_token=api_token, transport=transport)
+
+    async def close(self) -> None:
+        await self.transport.close()
+
+    async def __aenter__(self) -> 'AsyncFinologClient':
+        return self
 
-        self.contractor = FinologContractorService(api_token=api_token, biz_id=self.biz_id)
-        self.document = FinologDocumentService(api_token=api_token, biz_id=self.biz_id)
-        self.requisite = FinologRequisiteService(api_token=api_token, biz_id=self.biz_id)
-        self.country = FinologCountryService(api_token=api_token)
+    async def __aexit__(self, *args) -> None:
+        await self.close()
@@ -0,0 +1,303 @@
+from array import array
+from datetime import date, datetime, timezone
+from typing import Any, Dict, Iterable, List, NamedTuple, Optional, Sequence, Tuple
+
+from pydantic.datetime_parse import parse_datetime
+
+INT, FLOAT, BOOL, STR, DATETIME, DATE = 'int', 'float', 'bool', 'str', 'datetime', 'date'
+
+_EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+_EPOCH_DAY = date(1970, 1, 1).toordinal()
+_TYPECODES = {INT: 'q', FLOAT: 'd', BOOL: 'b', STR: 'i', DATETIME: 'q', DATE: 'q'}
+
+
+class ColumnSpec(NamedTuple):
+    """
+    name: str : Column name
+    kind: str : One of INT, FLOAT, BOOL, STR (dictionary-encoded), DATETIME (microseconds since the epoch, UTC)
+    and DATE (days since the epoch)
+    path: tuple : Keys leading to the value in a decoded object
+    """
+
+    name: str
+    kind: str
+    path: Tuple[str, ...]
+
+
+def column(name: str, kind: str, path: Optional[str] = None) -> ColumnSpec:
+    """
+    Declares a column; path is a dotted path into the decoded object and defaults to the name.
+    """
+    return ColumnSpec(name, kind, tuple((path or name).split('.')))
+
+
+def _timestamp(value: str) -> int:
+    try:
+        moment = datetime.fromisoformat(value)
+    except ValueError:
+        moment = parse_datetime(value)
+
+    if moment.tzinfo is None:
+        moment = moment.replace(tzinfo=timezone.utc)
+
+    delta = moment - _EPOCH
+    return (delta.days * 86400 + delta.seconds) * 1000000 + delta.microseconds
+
+
+def _day(value: str) -> int:
+    return date.fromisoformat(value[:10]).toordinal() - _EPOCH_DAY
+
+
+class Column:
+    """
+    Growable typed buffer of one column with a validity byte per row.
+
+    String columns are dictionary-encoded: values holds codes into categories, -1 for null.
+    """
+
+    __slots__ = ('spec', 'values', 'valid', 'categories', '_codes')
+
+    def __init__(self, spec: ColumnSpec) -> None:
+        self.spec = spec
+        self.values = array(_TYPECODES[spec.kind])
+        self.valid = bytearray()
+        self.categories: List[str] = []
+        self._codes: Dict[str, int] = dict()
+
+    def append(self, value: Any) -> None:
+        if value is None:
+            self.values.append(-1 if self.spec.kind == STR else 0)
+            self.valid.append(0)
+            return
+
+        kind = self.spec.kind
+        if kind == STR:
+            code = self._codes.get(value)
+            if code is None:
+                code = self._codes[value] = len(self.categories)
+                self.categories.append(value)
+            value = code
+        elif kind == DATETIME:
+            value = _timestamp(value)
+        elif kind == DATE:
+            value = _day(value)
+        elif kind == FLOAT:
+            value = float(value)
+        elif kind == INT:
+            value = int(value)
+
+        self.values.append(value)
+        self.valid.append(1)
+
+    @property
+    def null_count(self) -> int:
+        return len(self.valid) - sum(self.valid)
+
+    def to_list(self) -> list:
+        """
+        Returns the column as Python values; datetimes are returned as aware datetime objects.
+        """
+
+        kind = self.spec.kind
+        if kind == STR:
+            return [self.categories[code] if code >= 0 else None for code in self.values]
+        if kind == DATETIME:
+            return [
+                datetime.fromtimestamp(value / 1000000, timezone.utc) if valid else None
+                for value, valid in zip(self.values, self.valid)
+            ]
+        if kind == DATE:
+            return [date.fromordinal(value + _EPOCH_DAY) if valid else None for value, valid in zip(self.values, self.valid)]
+        if kind == BOOL:
+            return [bool(value) if valid else None for value, valid in zip(self.values, self.valid)]
+        return [value if valid else None for value, valid in zip(self.values, self.valid)]
+
+    def to_numpy(self):
+        """
+        Returns a copy of the column as a NumPy array: int64 (a masked array if there are nulls),
+        float64 with NaN for nulls, bool, int32 category codes with -1 for nulls, or
+        datetime64[us] / datetime64[D] with NaT for nulls. The table can keep growing afterwards,
+        which a view of the buffer would prevent.
+        """
+
+        np = _numpy()
+        kind = self.spec.kind
+        values = self._copy(np)
+        nulls = np.frombuffer(self.valid, dtype=np.uint8) == 0
+
+        if kind == STR:
+            return values
+        if kind == FLOAT:
+            return np.where(nulls, np.nan, values) if nulls.any() else values
+        if kind == BOOL:
+            values = values.astype(bool)
+            return np.ma.MaskedArray(values, mask=nulls) if nulls.any() else values
+        if kind in (DATETIME, DATE):
+            values[nulls] = np.iinfo(np.int64).min
+            return values.view('datetime64[us]' if kind == DATETIME else 'datetime64[D]')
+        return np.ma.MaskedArray(values, mask=nulls) if nulls.any() else values
+
+    def _copy(self, np):
+        return np.frombuffer(self.values, dtype=np.dtype(self.values.typecode)).copy()
+
+    def to_arrow(self):
+        """
+        Returns the column as a pyarrow array built from a copy of the buffer, see to_numpy.
+        """
+
+        pa = _pyarrow()
+        np = _numpy()
+        kind = self.spec.kind
+        values = self._copy(np)
+        nulls = np.frombuffer(self.valid, dtype=np.uint8) == 0
+        mask = nulls if nulls.any() else None
+
+        if kind == STR:
+            codes = pa.array(values, mask=mask)
+            return pa.DictionaryArray.from_arrays(codes, pa.array(self.categories, pa.string()))
+        if kind == DATETIME:
+            return pa.array(values, pa.timestamp('us', tz='UTC'), mask=mask)
+        if kind == DATE:
+            return pa.array(values.astype(np.int32), pa.date32(), mask=mask)
+
+        arrow_type = {INT: pa.int64(), FLOAT: pa.float64(), BOOL: pa.bool_()}[kind]
+        return pa.array(values.astype(bool) if kind == BOOL else values, arrow_type, mask=mask)
+
+
+class ColumnarTable:
+    """
+    Rows of decoded objects stored column by column, filled without building models.
+
+    columns: Sequence[ColumnSpec] : Columns to extract
+    """
+
+    def __init__(self, columns: Sequence[ColumnSpec]) -> None:
+        self.columns: Dict[str, Column] = {spec.name: Column(spec) for spec in columns}
+        self._paths = [(col, spec.path) for spec, col in zip(columns, self.columns.values())]
+
+    def append(self, obj: Dict[str, Any]) -> None:
+        for col, path in self._paths:
+            value = obj
+            for key in path:
+                value = value.get(key)
+                if value is None:
+                    break
+            col.append(value)
+
+    def extend(self, objects: Iterable[Dict[str, Any]]) -> None:
+        for obj in objects:
+            self.append(obj)
+
+    def __len__(self) -> int:
+        return len(next(iter(self.columns.values())).valid) if self.columns else 0
+
+    def __getitem__(self, name: str) -> Column:
+        return self.columns[name]
+
+    def categories(self, name: str) -> List[str]:
+        """
+        Returns the values of a string column, indexed by the codes stored in it.
+        """
+        return self.columns[name].categories
+
+    def to_dict(self) -> Dict[str, list]:
+        return {name: col.to_list() for name, col in self.columns.items()}
+
+    def to_numpy(self) -> Dict[str, Any]:
+        """
+        Returns NumPy arrays by column name, see Column.to_numpy. Requires numpy.
+        """
+        return {name: col.to_numpy() for name, col in self.columns.items()}
+
+    def to_arrow(self):
+        """
+        Returns a pyarrow.RecordBatch; string columns are dictionary arrays. Requires pyarrow and numpy.
+        """
+
+        pa = _pyarrow()
+        return pa.RecordBatch.from_arrays([col.to_arrow() for col in self.columns.values()], list(self.columns))
+
+
+def _numpy():
+    try:
+        import numpy
+    except ImportError:
+        raise ImportError('numpy is required for NumPy and Arrow export: pip install finolog-sdk[analytics]')
+    return numpy
+
+
+def _pyarrow():
+    try:
+        import pyarrow
+    except ImportError:
+        raise ImportError('pyarrow is required for Arrow export: pip install finolog-sdk[analytics]')
+    return pyarrow
+
+
+DOCUMENT_COLUMNS = (
+    column('id', INT),
+    column('number', STR),
+    column('kind', STR),
+    column('type', STR),
+    column('status', STR),
+    column('template', STR),
+    column('date', DATE),
+    column('from_contractor_id', INT),
+    column('to_contractor_id', INT),
+    column('currency_id', INT, 'package.currency_id'),
+    column('total_price', FLOAT, 'package.total_price'),
+    column('total_vat', FLOAT, 'package.total_vat'),
+    column('base_total_price', FLOAT, 'package.base_total_price'),
+    column('base_total_vat', FLOAT, 'package.base_total_vat'),
+    column('vat_type', STR, 'package.vat_type'),
+    column('created_at', DATETIME),
+    column('updated_at', DATETIME),
+)
+
+# Item rows are read from {'document': <document>, 'item': <package item>}
+DOCUMENT_ITEM_COLUMNS = (
+    column('document_id', INT, 'document.id'),
+    column('document_date', DATE, 'document.date'),
+    column('document_type', STR, 'document.type'),
+    column('document_status', STR, 'document.status'),
+    column('id', INT, 'item.id'),
+    column('item_id', INT, 'item.item_id'),
+    column('item_name', STR, 'item.item_name'),
+    column('item_type', STR, 'item.item_type'),
+    column('count', FLOAT, 'item.count'),
+    column('price', FLOAT, 'item.price'),
+    column('price_currency_id', INT, 'item.price_currency_id'),
+    column('vat', INT, 'item.vat'),
+    column('project_id', INT, 'item.project_id'),
+)
+
+
+class DocumentExport:
+    """
+    A document table and a table of their package items, one row per item, filled in one pass
+    over decoded document objects.
+
+    document_columns: Sequence[ColumnSpec] : Columns of the document table
+    item_columns: Sequence[ColumnSpec] : Columns of the item table, None to skip items
+    """
+
+    def __init__(
+            self,
+            document_columns: Sequence[ColumnSpec] = DOCUMENT_COLUMNS,
+            item_columns: Optional[Sequence[ColumnSpec]] = DOCUMENT_ITEM_COLUMNS
+    ) -> None:
+        self.documents = ColumnarTable(document_columns)
+        self.items = ColumnarTable(item_columns or ())
+
+    def append(self, document: Dict[str, Any]) -> None:
+        self.documents.append(document)
+
+        if self.items.columns:
+            package = document.get('package') or {}
+            for item in package.get('items') or ():
+                self.items.append({'document': document, 'item': item})
+
+    def extend(self, documents: Iterable[Dict[str, Any]]) -> 'DocumentExport':
+        for document in documents:
+            self.append(document)
+        return self
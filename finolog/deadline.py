@@ -0,0 +1,98 @@
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar, Token
+from typing import Optional, Iterator, Tuple, Union
+
+from finolog.exceptions import DeadlineExceeded
+
+_current: ContextVar[Optional['Deadline']] = ContextVar('finolog_deadline', default=None)
+# Tokens of the `with` blocks entered in the current context, innermost last. Kept per context,
+# so one Deadline can be entered by several threads or tasks at once.
+_entered: ContextVar[Tuple[Token, ...]] = ContextVar('finolog_deadline_tokens', default=())
+
+
+class Deadline:
+    """
+    Time budget shared by every request made while it is active.
+
+    Each HTTP call draws its timeout from the remaining budget, retries are not started
+    when their backoff would not fit into it, and requests fail fast with DeadlineExceeded
+    once it runs out. Deadlines nest: the earlier one wins.
+
+        with Deadline(2.5):
+            contractor, created = client.contractor.get_or_create_by_inn(inn, defaults)
+
+    One Deadline can be shared by a fan-out: threads and asyncio tasks may each enter it.
+
+    Iterators take the deadline as an argument, because they are consumed outside of the `with` block:
+
+        for document in client.document.iter_documents(deadline=Deadline(60)):
+            ...
+
+    seconds: float : Budget in seconds, counted from creation
+    """
+
+    def __init__(self, seconds: float) -> None:
+        self.seconds = seconds
+        self.expires_at = time.monotonic() + seconds
+
+    def remaining(self) -> float:
+        return max(self.expires_at - time.monotonic(), 0.0)
+
+    @property
+    def expired(self) -> bool:
+        return time.monotonic() >= self.expires_at
+
+    def check(self) -> None:
+        if self.expired:
+            raise DeadlineExceeded(f'deadline of {self.seconds}s exceeded')
+
+    def limit(self, timeout: Union[None, float, Tuple[float, float]]) -> Union[float, Tuple[float, float]]:
+        """
+        Returns timeout capped by the remaining budget.
+        """
+
+        self.check()
+        remaining = self.remaining()
+
+        if timeout is None:
+            return remaining
+        if isinstance(timeout, tuple):
+            return tuple(min(t, remaining) for t in timeout)
+        return min(timeout, remaining)
+
+    def __enter__(self) -> 'Deadline':
+        token = _current.set(earliest(_current.get(), self))
+        _entered.set(_entered.get() + (token,))
+        return self
+
+    def __exit__(self, *args) -> None:
+        tokens = _entered.get()
+        _entered.set(tokens[:-1])
+        _current.reset(tokens[-1])
+
+
+def earliest(*deadlines: Optional[Deadline]) -> Optional[Deadline]:
+    deadlines = [d for d in deadlines if d is not None]
+    return min(deadlines, key=lambda d: d.expires_at) if deadlines else None
+
+
+def current_deadline() -> Optional[Deadline]:
+    return _current.get()
+
+
+@contextmanager
+def deadline_scope(deadline: Optional[Deadline]) -> Iterator[Optional[Deadline]]:
+    """
+    Activates a deadline for the current context; safe to use for one deadline from several threads at once.
+    """
+
+    if deadline is None:
+        yield current_deadline()
+        return
+
+    token = _current.set(earliest(_current.get(), deadline))
+    try:
+        yield deadline
+    finally:
+        _current.reset(token)
@@ -0,0 +1,36 @@
+import json
+from typing import Any, Callable
+
+# Turns a raw response body into Python objects
+Decoder = Callable[[bytes], Any]
+
+
+def json_decoder(content: bytes) -> Any:
+    return json.loads(content)
+
+
+def orjson_decoder() -> Decoder:
+    import orjson
+
+    return orjson.loads
+
+
+def msgspec_decoder() -> Decoder:
+    import msgspec
+
+    return msgspec.json.Decoder().decode
+
+
+def default_decoder() -> Decoder:
+    """
+    Returns the fastest available decoder: orjson, then msgspec, then the json module.
+    Install finolog-sdk[speedups] to get orjson.
+    """
+
+    for factory in (orjson_decoder, msgspec_decoder):
+        try:
+            return factory()
+        except ImportError:
+            pass
+
+    return json_decoder
@@ -0,0 +1,297 @@
+import threading
+from array import array
+from bisect import bisect_left
+from typing import Any, Dict, Iterable, Iterator, List, NamedTuple, Optional, Tuple, Union
+
+
+class DirectoryEntry(NamedTuple):
+    id: int
+    name: str
+    email: Optional[str]
+    phone: Optional[str]
+    inns: Tuple[str, ...]
+
+
+def normalize_email(email: Optional[str]) -> Optional[str]:
+    return email.strip().casefold() or None if email else None
+
+
+def normalize_phone(phone: Optional[str]) -> Optional[str]:
+    """
+    Keeps the digits of a phone number only, so '+7 (900) 123-45-67' and '79001234567' match.
+    """
+    return ''.join(char for char in phone if char.isdigit()) or None if phone else None
+
+
+def normalize_name(name: Optional[str]) -> str:
+    return ' '.join(name.casefold().split()) if name else ''
+
+
+def _compact(key: Optional[str], value: Optional[str]) -> Optional[str]:
+    """
+    Returns value instead of an equal normalized key, so both are stored once.
+    """
+    return value if key == value else key
+
+
+class _KeyIndex:
+    """
+    Hash index of rows by key. A key of one row, the common case, holds the row number
+    itself rather than a container, which keeps the index small.
+    """
+
+    __slots__ = ('rows',)
+
+    def __init__(self) -> None:
+        self.rows: Dict[str, Union[int, Tuple[int, ...]]] = dict()
+
+    def add(self, key: Optional[str], row: int) -> None:
+        if key is None:
+            return
+        current = self.rows.get(key)
+        if current is None:
+            self.rows[key] = row
+        elif isinstance(current, int):
+            self.rows[key] = (current, row)
+        else:
+            self.rows[key] = current + (row,)
+
+    def remove(self, key: Optional[str], row: int) -> None:
+        current = self.rows.get(key)
+        if current is None:
+            return
+        if isinstance(current, int) or len(current) == 1:
+            del self.rows[key]
+        else:
+            rest = tuple(r for r in current if r != row)
+            self.rows[key] = rest[0] if len(rest) == 1 else rest
+
+    def get(self, key: Optional[str]) -> Tuple[int, ...]:
+        current = self.rows.get(key)
+        if current is None:
+            return ()
+        return (current,) if isinstance(current, int) else current
+
+
+class _Tables:
+    """
+    Contractors stored column by column, one row per contractor, with the indexes over them.
+    Removed rows keep their place, out of the indexes, until the next reload.
+    """
+
+    __slots__ = ('ids', 'names', 'emails', 'phones', 'inns', 'by_id', 'by_inn', 'by_email', 'by_phone',
+                 'name_keys', 'name_rows')
+
+    def __init__(self) -> None:
+        self.ids = array('q')
+        self.names: List[Optional[str]] = []
+        self.emails: List[Optional[str]] = []
+        self.phones: List[Optional[str]] = []
+        # A single INN is stored as is, several as a tuple
+        self.inns: List[Union[str, Tuple[str, ...]]] = []
+        self.by_id: Dict[int, int] = dict()
+        self.by_inn = _KeyIndex()
+        self.by_email = _KeyIndex()
+        self.by_phone = _KeyIndex()
+        # Sorted normalized names and the rows they belong to, for prefix search
+        self.name_keys: List[str] = []
+        self.name_rows = array('q')
+
+    def row_inns(self, row: int) -> Tuple[str, ...]:
+        inns = self.inns[row]
+        return (inns,) if isinstance(inns, str) else inns
+
+    def entry(self, row: int) -> DirectoryEntry:
+        return DirectoryEntry(self.ids[row], self.names[row], self.emails[row], self.phones[row], self.row_inns(row))
+
+    def append(self, contractor: Dict[str, Any]) -> int:
+        row = len(self.ids)
+        self.ids.append(contractor['id'])
+        self.names.append(contractor.get('name'))
+        self.emails.append(contractor.get('email'))
+        self.phones.append(contractor.get('phone'))
+        inns = tuple(sorted({
+            requisite['inn'].strip() for requisite in contractor.get('requisites') or () if requisite.get('inn')
+        }))
+        self.inns.append(inns[0] if len(inns) == 1 else inns)
+        self.by_id[contractor['id']] = row
+        self._index(row)
+        return row
+
+    def _index(self, row: int) -> None:
+        for inn in self.row_inns(row):
+            self.by_inn.add(inn, row)
+        email, phone = self.emails[row], self.phones[row]
+        self.by_email.add(_compact(normalize_email(email), email), row)
+        self.by_phone.add(_compact(normalize_phone(phone), phone), row)
+
+    def unindex(self, row: int) -> None:
+        for inn in self.row_inns(row):
+            self.by_inn.remove(inn, row)
+        self.by_email.remove(normalize_email(self.emails[row]), row)
+        self.by_phone.remove(normalize_phone(self.phones[row]), row)
+
+        key = normalize_name(self.names[row])
+        position = bisect_left(self.name_keys, key)
+        while self.name_rows[position] != row:
+            position += 1
+        del self.name_keys[position]
+        del self.name_rows[position]
+
+    def sort_names(self) -> None:
+        names = self.names
+        order = sorted((_compact(normalize_name(names[row]), names[row]), row) for row in self.by_id.values())
+        self.name_keys = [key for key, _ in order]
+        self.name_rows = array('q', (row for _, row in order))
+
+    def insert_name(self, row: int) -> None:
+        key = normalize_name(self.names[row])
+        position = bisect_left(self.name_keys, key)
+        while position < len(self.name_keys) and self.name_keys[position] == key and self.name_rows[position] < row:
+            position += 1
+        self.name_keys.insert(position, key)
+        self.name_rows.insert(position, row)
+
+
+class ContractorDirectory:
+    """
+    In-memory copy of the contractor list for local lookups by id, INN, email, phone and name prefix.
+
+    Only the fields needed for matching are kept, in flat columns rather than one object per
+    contractor; full contractors can be fetched by id. INNs are taken from nested requisites, so
+    load contractors with_='requisites' (FinologContractorService.load_directory does). Emails
+    are compared case-insensitively and phones by their digits.
+
+    reload swaps in a complete new copy at once, so lookups running meanwhile see either the
+    old or the new one. upsert and discard apply single changes, e.g. after local writes; as they
+    change the current copy in place, lookups and changes take turns on a lock.
+    """
+
+    def __init__(self, contractors: Iterable[Dict[str, Any]] = ()) -> None:
+        self._lock = threading.Lock()
+        self._tables = _Tables()
+        self.reload(contractors)
+
+    def reload(self, contractors: Iterable[Dict[str, Any]]) -> 'ContractorDirectory':
+        """
+        Replaces the content with decoded contractor objects.
+        """
+
+        loader = self.loader()
+        for contractor in contractors:
+            loader.append(contractor)
+        return loader.commit()
+
+    def loader(self) -> 'DirectoryLoader':
+        """
+        Returns a DirectoryLoader filling a new copy of the directory object by object,
+        e.g. from an async iterator; the directory is replaced on commit.
+        """
+        return DirectoryLoader(self)
+
+    def _swap(self, tables: _Tables) -> None:
+        with self._lock:
+            self._tables = tables
+
+    def upsert(self, contractor: Dict[str, Any]) -> None:
+        """
+        Adds or replaces one decoded contractor object; a deleted one is discarded.
+        """
+
+        if contractor.get('deleted_at') is not None:
+            self.discard(contractor['id'])
+            return
+
+        with self._lock:
+            tables = self._tables
+            self._remove(tables, contractor['id'])
+            tables.insert_name(tables.append(contractor))
+
+    def discard(self, id_: int) -> None:
+        with self._lock:
+            self._remove(self._tables, id_)
+
+    @staticmethod
+    def _remove(tables: _Tables, id_: int) -> None:
+        row = tables.by_id.pop(id_, None)
+        if row is not None:
+            tables.unindex(row)
+            tables.names[row] = tables.emails[row] = tables.phones[row] = None
+            tables.inns[row] = ()
+
+    def __len__(self) -> int:
+        return len(self._tables.by_id)
+
+    def __contains__(self, id_: int) -> bool:
+        return id_ in self._tables.by_id
+
+    def __iter__(self) -> Iterator[DirectoryEntry]:
+        with self._lock:
+            tables = self._tables
+            return iter([tables.entry(row) for row in tables.by_id.values()])
+
+    def get(self, id_: int) -> Optional[DirectoryEntry]:
+        with self._lock:
+            tables = self._tables
+            row = tables.by_id.get(id_)
+            return None if row is None else tables.entry(row)
+
+    def by_inn(self, inn: str) -> List[DirectoryEntry]:
+        inn = inn.strip()
+        with self._lock:
+            tables = self._tables
+            return [tables.entry(row) for row in tables.by_inn.get(inn)]
+
+    def by_email(self, email: str) -> List[DirectoryEntry]:
+        email = normalize_email(email)
+        with self._lock:
+            tables = self._tables
+            return [tables.entry(row) for row in tables.by_email.get(email)]
+
+    def by_phone(self, phone: str) -> List[DirectoryEntry]:
+        phone = normalize_phone(phone)
+        with self._lock:
+            tables = self._tables
+            return [tables.entry(row) for row in tables.by_phone.get(phone)]
+
+    def search(self, prefix: str, limit: Optional[int] = 20) -> List[DirectoryEntry]:
+        """
+        Returns contractors whose name starts with prefix, ignoring case and repeated spaces,
+        in name order.
+        """
+
+        prefix = normalize_name(prefix)
+        result = []
+
+        with self._lock:
+            tables = self._tables
+            keys, rows = tables.name_keys, tables.name_rows
+            position = bisect_left(keys, prefix)
+
+            while position < len(keys) and keys[position].startswith(prefix):
+                if limit is not None and len(result) >= limit:
+                    break
+                result.append(tables.entry(rows[position]))
+                position += 1
+
+        return result
+
+
+class DirectoryLoader:
+    """
+    Builds the content of a ContractorDirectory; see ContractorDirectory.loader.
+    Deleted contractors are skipped, and the first copy of a contractor is kept.
+    """
+
+    def __init__(self, directory: ContractorDirectory) -> None:
+        self.directory = directory
+        self._tables = _Tables()
+
+    def append(self, contractor: Dict[str, Any]) -> None:
+        if contractor.get('deleted_at') is None and contractor['id'] not in self._tables.by_id:
+            self._tables.append(contractor)
+
+    def commit(self) -> ContractorDirectory:
+        self._tables.sort_names()
+        self.directory._swap(self._tables)
+        return self.directory
@@ -0,0 +1,205 @@
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from finolog.exceptions import ErrorDetail, ValidationError
+
+
+class PayloadSchema:
+    """
+    Parameter schema of an endpoint, compiled once into lookup tables.
+
+    Calling the schema checks a payload and applies its coercions in place.
+    With validate=False only the coercions run, which is what the API needs
+    to understand the payload; type, length and required checks are skipped.
+
+    fields: dict : Field name -> expected type
+    lengths: dict : Field name -> (min, max) length of string values
+    flags: Iterable[str] : Boolean fields the API expects as 'true'/'false'
+    aliases: dict : Keyword names renamed before sending, e.g. with_ -> with
+    required: Iterable[str] : Fields that must be present
+    items: PayloadSchema : Schema of every element of list fields
+    """
+
+    __slots__ = ('types', 'lengths', 'flags', 'aliases', 'required', 'items')
+
+    def __init__(
+            self,
+            fields: Dict[str, type],
+            *,
+            lengths: Optional[Dict[str, Tuple[int, int]]] = None,
+            flags: Iterable[str] = (),
+            aliases: Optional[Dict[str, str]] = None,
+            required: Iterable[str] = (),
+            items: Optional['PayloadSchema'] = None
+    ) -> None:
+        self.types = dict(fields)
+        self.lengths = tuple((lengths or {}).items())
+        self.flags = tuple(flags)
+        self.aliases = tuple((aliases or {}).items())
+        self.required = tuple(required)
+        self.items = items
+
+    def __call__(self, payload: Dict[str, Any], validate: bool = True) -> Dict[str, Any]:
+        for alias, name in self.aliases:
+            if alias in payload:
+                payload[name] = payload.pop(alias)
+
+        if validate:
+            self.check(payload)
+
+        for flag in self.flags:
+            if flag in payload:
+                payload[flag] = 'true' if payload[flag] is True else 'false'
+
+        return payload
+
+    def check(self, payload: Dict[str, Any]) -> None:
+        """
+        Raises ValidationError listing every problem of the payload, including those of its list items.
+        """
+
+        errors = self.errors(payload)
+        if errors:
+            raise ValidationError(errors)
+
+    def errors(self, payload: Dict[str, Any], prefix: str = '') -> List[ErrorDetail]:
+        """
+        Returns the problems of a payload; fields of list items are named like items[0].price.
+        """
+
+        types = self.types
+        errors = [ErrorDetail('field required', prefix + field) for field in self.required if field not in payload]
+
+        for field, value in payload.items():
+            _type = types.get(field)
+
+            if _type is None:
+                errors.append(ErrorDetail('unknown field', prefix + field))
+            elif not isinstance(value, _type):
+                errors.append(ErrorDetail(f'must be of type {_type}', prefix + field))
+
+        for field, (min_l, max_l) in self.lengths:
+            value = payload.get(field)
+            if isinstance(value, str) and not min_l <= len(value) <= max_l:
+                errors.append(ErrorDetail(f'must be between {min_l} and {max_l} characters long', prefix + field))
+
+        if self.items is not None:
+            for field, value in payload.items():
+                if isinstance(value, list):
+                    for index, item in enumerate(value):
+                        name = f'{prefix}{field}[{index}]'
+                        if isinstance(item, dict):
+                            errors.extend(self.items.errors(item, name + '.'))
+                        else:
+                            errors.append(ErrorDetail(f'must be of type {dict}', name))
+
+        return errors
+
+CONTRACTOR_FIELDS = {
+    'name': str,
+    'email': str,
+    'phone': str,
+    'person': str,
+    'description': str
+}
+
+DOCUMENT_FIELDS = {
+    'type': str,
+    'kind': str,
+    'date': str,
+    'template': str,
+    'from_contractor_id': int,
+    'from_requisite_id': int,
+    'to_contractor_id': int,
+    'to_requisite_id': int,
+    'to_contractor_draft': str,
+    'number': str,
+    'status': str,
+    'comment': str,
+    'description': str,
+    'model_type': str,
+    'model_id': int
+}
+
+DOCUMENT_ITEM_FIELDS = {
+    'id': int,
+    'item_id': int,
+    'count': int,
+    'vat': int,
+    'price': int,
+    'price_currency_id': int,
+    'amortization': int,
+    'item_name': str
+}
+
+REQUISITE_FIELDS = {
+    'contractor_id': int,
+    'name': str,
+    'description': str,
+    'full_name': str,
+    'inn': str,
+    'kpp': str,
+    'bank_account': str,
+    'bank_bic': str,
+    'address_postal_index': str,
+    'address_city': str,
+    'address_street': str,
+    'country_id': int,
+    'phone': str,
+    'email': str,
+    'web': str,
+    'bank_iban': str,
+    'bank_mfo': str
+}
+
+ENDPOINTS: Dict[str, PayloadSchema] = {
+    'contractor.list': PayloadSchema(
+        {
+            'email': str,
+            'inn': str,
+            'with': str,
+            'page': int,
+            'pagesize': int,
+            'query': str,
+            'ids': str,
+            'is_bizzed': bool
+        },
+        lengths={'inn': (10, 12)},
+        flags=('is_bizzed',),
+        aliases={'with_': 'with'}
+    ),
+    'contractor.create': PayloadSchema(CONTRACTOR_FIELDS, required=('name',)),
+    'contractor.update': PayloadSchema(CONTRACTOR_FIELDS),
+    'contractor.defaults': PayloadSchema(CONTRACTOR_FIELDS),
+    'document.list': PayloadSchema({
+        'page': int,
+        'pagesize': int,
+        'query': str,
+        'item_id': int,
+        'kind': str,
+        'template': str
+    }),
+    'document.pdf': PayloadSchema({'no_sign': bool}, flags=('no_sign',)),
+    'document.create': PayloadSchema(
+        {**DOCUMENT_FIELDS, 'vat_type': str, 'items': list},
+        required=('items',),
+        items=PayloadSchema(DOCUMENT_ITEM_FIELDS)
+    ),
+    'document.update': PayloadSchema(DOCUMENT_FIELDS),
+    'requisite.list': PayloadSchema(
+        {
+            'contractor_id': int,
+            'ids': str,
+            'is_bizzed': bool
+        },
+        flags=('is_bizzed',)
+    ),
+    'requisite.write': PayloadSchema(
+        REQUISITE_FIELDS,
+        lengths={
+            'inn': (10, 12),
+            'kpp': (9, 9),
+            'bank_account': (20, 28),
+            'bank_bic': (9, 9)
+        }
+    ),
+}
@@ -77,3 +77,36 @@ def flatten_errors(errors: Sequence[Any]) -> Generator['ErrorDetail', None, None
 
 def error_detail(exc: Exception) -> 'ErrorDetail':
     return ErrorDetail(str(exc))
+
+
+class APIError(ValueError):
+    """
+    Error response from the Finolog API.
+    """
+
+    def __init__(self, status_code: int, body: Any = None, retry_after: Optional[float] = None) -> None:
+        super().__init__(status_code, body)
+        self.status_code = status_code
+        self.body = body
+        self.retry_after = retry_after
+
+    def __str__(self) -> str:
+        return f'{self.status_code}: {self.body}'
+
+
+class RateLimitError(APIError):
+    """
+    The request was still throttled (429) after the rate limiter's retries.
+    """
+
+
+class DeadlineExceeded(TimeoutError):
+    """
+    The time budget of a Deadline ran out before the request could be completed.
+    """
+
+
+class DownloadError(IOError):
+    """
+    A file could not be downloaded completely, e.g. its size does not match the announced one.
+    """
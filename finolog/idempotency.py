@@ -0,0 +1,82 @@
+import json
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Optional
+
+
+class IdempotencyStore:
+    """
+    Client-side record of decoded responses of create requests by idempotency key.
+
+    A request whose key is already recorded is not sent again, so a batch can be retried after a
+    partial failure without creating duplicates. Keys are recorded once the response arrives: a
+    request interrupted after the server processed it, but before its response was received,
+    can still be repeated.
+
+    This store lives in memory and keeps the last maxsize keys; older ones are forgotten, and a
+    payload with a forgotten key is sent again. Use SQLiteIdempotencyStore to retry batches across
+    restarts or to keep every key.
+
+    maxsize: int : Maximum number of keys kept, None for no limit
+    """
+
+    def __init__(self, maxsize: Optional[int] = 10000) -> None:
+        self.maxsize = maxsize
+        self._lock = threading.Lock()
+        self._data: 'OrderedDict[str, Any]' = OrderedDict()
+
+    def get(self, key: str) -> Optional[Any]:
+        with self._lock:
+            return self._data.get(key)
+
+    def set(self, key: str, value: Any) -> None:
+        with self._lock:
+            self._data[key] = value
+            self._data.move_to_end(key)
+
+            if self.maxsize is not None:
+                while len(self._data) > self.maxsize:
+                    self._data.popitem(last=False)
+
+    def discard(self, key: str) -> None:
+        with self._lock:
+            self._data.pop(key, None)
+
+
+class SQLiteIdempotencyStore(IdempotencyStore):
+    """
+    IdempotencyStore kept in an SQLite database, shared between processes and restarts.
+
+    path: str : Path of the database file
+    """
+
+    def __init__(self, path: str) -> None:
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._db.execute('PRAGMA journal_mode=WAL')
+        self._db.execute(
+            'CREATE TABLE IF NOT EXISTS idempotency '
+            '(key TEXT PRIMARY KEY, value TEXT NOT NULL, created_at REAL NOT NULL)'
+        )
+
+    def get(self, key: str) -> Optional[Any]:
+        with self._lock:
+            row = self._db.execute('SELECT value FROM idempotency WHERE key = ?', (key,)).fetchone()
+
+        return None if row is None else json.loads(row[0])
+
+    def set(self, key: str, value: Any) -> None:
+        with self._lock:
+            self._db.execute(
+                'INSERT OR REPLACE INTO idempotency (key, value, created_at) VALUES (?, ?, ?)',
+                (key, json.dumps(value), time.time())
+            )
+
+    def discard(self, key: str) -> None:
+        with self._lock:
+            self._db.execute('DELETE FROM idempotency WHERE key = ?', (key,))
+
+    def close(self) -> None:
+        self._db.close()
@@ -0,0 +1,185 @@
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime
+from typing import Any, Dict, Iterable, Optional, Set, Tuple, Union
+
+from pydantic.datetime_parse import parse_datetime
+
+Key = Tuple[str, int]
+
+# Nested objects carried by responses of each entity type: field -> entity type
+NESTED_ENTITIES = {
+    'document': {
+        'from_contractor': 'contractor',
+        'to_contractor': 'contractor',
+        'from_requisite': 'requisite',
+        'to_requisite': 'requisite',
+    },
+    'contractor': {
+        'requisites': 'requisite',
+    },
+}
+
+
+class IdentityMap:
+    """
+    Client-side map of the latest known state of entities, keyed by (entity type, id).
+
+    Every parsed response is harvested, including nested objects, e.g. contractors and
+    requisites embedded in documents. A stored copy is only replaced by one with the same
+    or a newer updated_at, and is served for max_age seconds after it was last seen.
+
+    The map holds at most maxsize entries; the least recently stored or read ones are evicted
+    first, and expired ones are dropped when they are read. Harvesting a long listing therefore
+    keeps only its last maxsize entities alive.
+
+    Stored objects that embed other entities are linked to them. Evicting an entity, or storing
+    a newer copy of it, also evicts the stored objects embedding it, e.g. the contractor holding
+    a requisite and the documents holding that contractor, since their copies are outdated.
+
+    max_age: float : Seconds a stored copy is considered fresh
+    maxsize: int : Maximum number of entities kept
+    """
+
+    def __init__(self, max_age: float = 60, maxsize: int = 10000) -> None:
+        self.max_age = max_age
+        self.maxsize = maxsize
+        self._lock = threading.Lock()
+        self._entries: 'OrderedDict[Key, Tuple[Dict[str, Any], datetime, float]]' = OrderedDict()
+        # Keys of the entries embedding an entity, and the entities embedded by an entry
+        self._embedders: Dict[Key, Set[Key]] = dict()
+        self._embedded: Dict[Key, Tuple[Key, ...]] = dict()
+
+    @staticmethod
+    def _updated_at(data: Dict[str, Any]) -> Optional[datetime]:
+        value = data.get('updated_at')
+        if value is None:
+            return None
+        try:
+            return parse_datetime(value)
+        except (TypeError, ValueError):
+            return None
+
+    def put(self, entity: str, data: Dict[str, Any], embedded: Iterable[Key] = ()) -> None:
+        """
+        Stores a decoded object; embedded are the keys of the entities it carries.
+        """
+
+        id_ = data.get('id')
+        updated_at = self._updated_at(data)
+        if not isinstance(id_, int) or updated_at is None:
+            return
+
+        key = (entity, id_)
+        with self._lock:
+            current = self._entries.get(key)
+            if current is None or current[1] <= updated_at:
+                if current is not None and current[1] < updated_at:
+                    self._evict_embedders(key)
+
+                self._unlink(key)
+                self._entries[key] = (data, updated_at, time.monotonic())
+                self._entries.move_to_end(key)
+                self._link(key, tuple(embedded))
+
+                while len(self._entries) > self.maxsize:
+                    self._remove(next(iter(self._entries)))
+
+    def _link(self, key: Key, embedded: Tuple[Key, ...]) -> None:
+        if embedded:
+            self._embedded[key] = embedded
+            for nested in embedded:
+                self._embedders.setdefault(nested, set()).add(key)
+
+    def _unlink(self, key: Key) -> None:
+        for nested in self._embedded.pop(key, ()):
+            embedders = self._embedders.get(nested)
+            if embedders is not None:
+                embedders.discard(key)
+                if not embedders:
+                    del self._embedders[nested]
+
+    def _remove(self, key: Key) -> None:
+        self._entries.pop(key, None)
+        self._unlink(key)
+
+    def _evict_embedders(self, key: Key) -> None:
+        for embedder in self._embedders.pop(key, ()):
+            self._remove(embedder)
+            self._evict_embedders(embedder)
+
+    def harvest(self, entity: str, data: Union[Dict[str, Any], list]) -> None:
+        """
+        Stores a decoded object, or a list of them, and every nested entity it carries.
+        """
+
+        if isinstance(data, list):
+            for obj in data:
+                self.harvest(entity, obj)
+            return
+
+        if not isinstance(data, dict):
+            return
+
+        embedded = []
+        for field, nested_entity in NESTED_ENTITIES.get(entity, {}).items():
+            nested = data.get(field)
+            if nested:
+                self.harvest(nested_entity, nested)
+                embedded.extend(
+                    (nested_entity, obj['id']) for obj in (nested if isinstance(nested, list) else (nested,))
+                    if isinstance(obj, dict) and isinstance(obj.get('id'), int)
+                )
+
+        self.put(entity, data, embedded)
+
+    def get(self, entity: str, id_: int, max_age: Optional[float] = None) -> Optional[Dict[str, Any]]:
+        """
+        Returns the stored decoded object, or None if it is unknown or older than max_age.
+        """
+
+        max_age = self.max_age if max_age is None else max_age
+        key = (entity, id_)
+
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+
+            age = time.monotonic() - entry[2]
+            if age > max_age:
+                if age > self.max_age:
+                    self._remove(key)
+                return None
+
+            self._entries.move_to_end(key)
+
+        return entry[0]
+
+    def evict(self, entity: str, id_: int) -> None:
+        """
+        Drops an entity and the stored objects embedding it.
+        """
+
+        key = (entity, id_)
+        with self._lock:
+            self._remove(key)
+            self._evict_embedders(key)
+
+    def evict_embedders(self, entity: str, id_: int) -> None:
+        """
+        Drops the stored objects embedding an entity, e.g. after it was written.
+        """
+
+        with self._lock:
+            self._evict_embedders((entity, id_))
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._embedders.clear()
+            self._embedded.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
@@ -0,0 +1,215 @@
+import asyncio
+import threading
+import time
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import Optional
+
+THROTTLE_STATUSES = frozenset((429, 503))
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """
+    Returns the delay in seconds from a Retry-After header given either as seconds or as an HTTP date.
+    """
+
+    if not value:
+        return None
+
+    try:
+        return max(float(value), 0.0)
+    except ValueError:
+        pass
+
+    try:
+        retry_at = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+
+    if retry_at.tzinfo is None:
+        retry_at = retry_at.replace(tzinfo=timezone.utc)
+
+    return max((retry_at - datetime.now(timezone.utc)).total_seconds(), 0.0)
+
+
+class RateLimiter:
+    """
+    Client-side throttling shared by all services of a client.
+
+    Combines a token bucket, which caps the request rate, with an AIMD concurrency limit:
+    the number of requests in flight grows by one per window of successful responses and
+    is cut by backoff_factor on 429 or 5xx responses. A burst of such responses counts as one
+    event: after a cut, further ones are ignored until as many responses as were in flight have
+    arrived, roughly one round trip, and until a pause is over. A Retry-After header pauses all
+    requests until the given time.
+
+    rate: float : Sustained requests per second
+    burst: int : Bucket size, i.e. requests that may be sent at once after an idle period
+    max_concurrency: int : Upper bound of requests in flight
+    min_concurrency: int : Lower bound of requests in flight
+    backoff_factor: float : Multiplier applied to the concurrency limit on throttling
+    default_pause: float : Pause in seconds after a 429 response without Retry-After
+    max_throttle_retries: int : Times a request rejected with 429 is sent again
+    """
+
+    def __init__(
+            self,
+            rate: float = 10.0,
+            burst: Optional[int] = None,
+            max_concurrency: int = 10,
+            min_concurrency: int = 1,
+            backoff_factor: float = 0.5,
+            default_pause: float = 1.0,
+            max_throttle_retries: int = 3
+    ) -> None:
+        if rate <= 0:
+            raise ValueError('rate must be greater than 0')
+        if not 1 <= min_concurrency <= max_concurrency:
+            raise ValueError('concurrency bounds must satisfy 1 <= min_concurrency <= max_concurrency')
+
+        self.rate = rate
+        self.burst = max(int(rate), 1) if burst is None else burst
+        self.max_concurrency = max_concurrency
+        self.min_concurrency = min_concurrency
+        self.backoff_factor = backoff_factor
+        self.default_pause = default_pause
+        self.max_throttle_retries = max_throttle_retries
+
+        self.limit = float(max_concurrency)
+        self.in_flight = 0
+        self.paused_until = 0.0
+
+        # Responses to await before the limit may be cut again
+        self._cut_pending = 0
+        self._tokens = float(self.burst)
+        self._refilled_at = time.monotonic()
+        self._lock = threading.Lock()
+        self._slots = threading.Condition(self._lock)
+
+    def _reserve(self) -> float:
+        """
+        Takes a token and returns how long the caller has to wait before sending. Call with the lock held.
+        """
+
+        now = time.monotonic()
+        self._tokens = min(self.burst, self._tokens + (now - self._refilled_at) * self.rate)
+        self._refilled_at = now
+        self._tokens -= 1
+
+        wait = -self._tokens / self.rate if self._tokens < 0 else 0.0
+        return max(wait, self.paused_until - now)
+
+    def _has_slot(self) -> bool:
+        return self.in_flight < int(self.limit)
+
+    def _record(self, status: Optional[int], retry_after: Optional[float]) -> None:
+        """
+        Adjusts the concurrency limit and pause after a response. Call with the lock held.
+        """
+
+        self.in_flight -= 1
+        now = time.monotonic()
+        holding = self._cut_pending > 0 or now < self.paused_until
+        if self._cut_pending > 0:
+            self._cut_pending -= 1
+
+        if status is not None and (status in THROTTLE_STATUSES or status >= 500):
+            if not holding:
+                self.limit = max(float(self.min_concurrency), self.limit * self.backoff_factor)
+                self._cut_pending = self.in_flight
+
+            if status == 429 or retry_after is not None:
+                pause = self.default_pause if retry_after is None else retry_after
+                self.paused_until = max(self.paused_until, now + pause)
+        elif status is not None and status < 400:
+            self.limit = min(float(self.max_concurrency), self.limit + 1 / self.limit)
+
+    def _admit(self, timeout: Optional[float], started_at: float) -> Optional[float]:
+        """
+        Takes a slot and a token and returns how long to wait before sending, or returns None,
+        taking nothing, if the wait would not end within timeout. Call with the lock held.
+        """
+
+        wait = self._reserve()
+        if timeout is not None and time.monotonic() + wait > started_at + timeout:
+            self._tokens += 1
+            return None
+
+        self.in_flight += 1
+        return wait
+
+    def acquire(self, timeout: Optional[float] = None) -> bool:
+        """
+        Waits for a slot and a token. Returns False, without taking them, if that would take
+        longer than timeout seconds, including a Retry-After pause.
+        """
+
+        started_at = time.monotonic()
+        with self._slots:
+            while not self._has_slot():
+                remaining = None if timeout is None else started_at + timeout - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    return False
+                self._slots.wait(remaining)
+
+            wait = self._admit(timeout, started_at)
+            if wait is None:
+                return False
+
+        if wait > 0:
+            time.sleep(wait)
+        return True
+
+    def release(self, status: Optional[int] = None, retry_after: Optional[float] = None) -> None:
+        """
+        Returns the slot taken by acquire. status is None when the request failed without a response.
+        """
+
+        with self._slots:
+            self._record(status, retry_after)
+            self._slots.notify_all()
+
+
+class AsyncRateLimiter(RateLimiter):
+    """
+    RateLimiter for AsyncFinologTransport; waiting does not block the event loop.
+    """
+
+    def __init__(self, *args, **kwargs) -> None:
+        super().__init__(*args, **kwargs)
+        self._async_slots: Optional[asyncio.Condition] = None
+
+    def _condition(self) -> asyncio.Condition:
+        if self._async_slots is None:
+            self._async_slots = asyncio.Condition()
+        return self._async_slots
+
+    async def acquire(self, timeout: Optional[float] = None) -> bool:
+        started_at = time.monotonic()
+        slots = self._condition()
+        async with slots:
+            try:
+                await asyncio.wait_for(slots.wait_for(self._has_slot), timeout)
+            except asyncio.TimeoutError:
+                return False
+
+            with self._lock:
+                wait = self._admit(timeout, started_at)
+            if wait is None:
+                return False
+
+        if wait > 0:
+            try:
+                await asyncio.sleep(wait)
+            except BaseException:
+                # Cancelled while waiting, e.g. by the deadline of the caller: give the slot back
+                await asyncio.shield(self.release())
+                raise
+        return True
+
+    async def release(self, status: Optional[int] = None, retry_after: Optional[float] = None) -> None:
+        slots = self._condition()
+        async with slots:
+            with self._lock:
+                self._record(status, retry_after)
+            slots.notify_all()
@@ -0,0 +1,121 @@
+import random
+import re
+import threading
+from collections import deque
+from typing import Optional, Iterable, Dict, Deque
+
+IDEMPOTENT_METHODS = frozenset(('GET', 'HEAD', 'OPTIONS', 'PUT', 'DELETE'))
+RETRY_STATUSES = frozenset((429, 500, 502, 503, 504))
+
+_ID_SEGMENT = re.compile(r'/\d+(?=/|$)')
+
+
+def endpoint_of(url: str) -> str:
+    """
+    Returns the URL with id segments replaced, so that e.g. all contractor lookups share one endpoint.
+    """
+    return _ID_SEGMENT.sub('/{id}', url)
+
+
+class RetryPolicy:
+    """
+    Decides whether and when a failed request is sent again.
+
+    Idempotent requests are retried after connection errors, timeouts and retryable statuses,
+    with exponential backoff and full jitter. Non-idempotent requests (POST) are not retried
+    unless retry_non_idempotent is set, because the server may already have processed them.
+
+    total: int : Maximum number of retries
+    backoff_factor: float : Base delay in seconds, doubled on every retry
+    max_backoff: float : Upper bound of a single delay
+    jitter: bool : Randomize delays between 0 and the backoff (full jitter)
+    statuses: Iterable[int] : Response statuses worth retrying
+    retry_non_idempotent: bool : Retry POST requests as well
+    """
+
+    def __init__(
+            self,
+            total: int = 3,
+            backoff_factor: float = 0.5,
+            max_backoff: float = 30.0,
+            jitter: bool = True,
+            statuses: Iterable[int] = RETRY_STATUSES,
+            retry_non_idempotent: bool = False
+    ) -> None:
+        self.total = total
+        self.backoff_factor = backoff_factor
+        self.max_backoff = max_backoff
+        self.jitter = jitter
+        self.statuses = frozenset(statuses)
+        self.retry_non_idempotent = retry_non_idempotent
+
+    def should_retry(self, method: str, attempt: int, status: Optional[int] = None) -> bool:
+        """
+        attempt: int : Number of retries already made
+        status: int : Response status, or None if the request failed without a response
+        """
+
+        if attempt >= self.total:
+            return False
+        if method.upper() not in IDEMPOTENT_METHODS and not self.retry_non_idempotent:
+            return False
+
+        return status is None or status in self.statuses
+
+    def delay(self, attempt: int, retry_after: Optional[float] = None) -> float:
+        backoff = min(self.max_backoff, self.backoff_factor * 2 ** attempt)
+        if self.jitter:
+            backoff = random.uniform(0, backoff)
+
+        return backoff if retry_after is None else max(backoff, retry_after)
+
+
+class HedgePolicy:
+    """
+    Sends a duplicate GET request when the first one is slower than a latency percentile
+    of the endpoint; the first successful response wins.
+
+    percentile: float : Latency percentile (0-100) after which a hedge is sent
+    min_samples: int : Latencies needed for an endpoint before hedging starts
+    window: int : Number of latest latencies kept per endpoint
+    max_hedges: int : Maximum number of duplicates per request
+    """
+
+    def __init__(
+            self,
+            percentile: float = 95.0,
+            min_samples: int = 20,
+            window: int = 500,
+            max_hedges: int = 1
+    ) -> None:
+        if not 0 < percentile < 100:
+            raise ValueError('percentile must be between 0 and 100')
+
+        self.percentile = percentile
+        self.min_samples = min_samples
+        self.window = window
+        self.max_hedges = max_hedges
+
+        self._lock = threading.Lock()
+        self._latencies: Dict[str, Deque[float]] = dict()
+
+    def record(self, url: str, latency: float) -> None:
+        endpoint = endpoint_of(url)
+        with self._lock:
+            latencies = self._latencies.get(endpoint)
+            if latencies is None:
+                latencies = self._latencies[endpoint] = deque(maxlen=self.window)
+            latencies.append(latency)
+
+    def threshold(self, url: str) -> Optional[float]:
+        """
+        Returns the delay in seconds after which a hedge is sent, or None while there are too few samples.
+        """
+
+        with self._lock:
+            latencies = sorted(self._latencies.get(endpoint_of(url), ()))
+
+        if len(latencies) < self.min_samples:
+            return None
+
+        return latencies[min(len(latencies) - 1, int(len(latencies) * self.percentile / 100))]
@@ -1,29 +1,217 @@
-from typing import Dict, Any
+import asyncio
+from collections import deque
+from typing import Dict, Any, Optional, Iterator, AsyncIterator, Type, Union, Callable, Sequence
 
-import requests
+from pydantic import BaseModel
 
+from finolog.deadline import Deadline, deadline_scope
+from finolog.endpoints import ENDPOINTS
 from finolog.exceptions import ErrorDetail, ValidationError
+from finolog.identity_map import IdentityMap
+from finolog.transport import FinologTransport, AsyncFinologTransport
+from finolog.types.tracking import TrackedModel
+from finolog.types.views import ModelView, view, projection
 
 
 class FinologAPIService:
     BASE_URI = 'https://api.finolog.ru/v1/'
+    DEFAULT_PAGESIZE = 100
+    transport_class = FinologTransport
 
-    def __init__(self, api_token: str) -> None:
-        self.client = requests.Session()
-        self.client.headers.update({
-            'Api-Token': api_token
-        })
+    # Entity type and model returned by the service
+    entity: Optional[str] = None
+    model: Optional[Type[BaseModel]] = None
+
+    def __init__(
+            self,
+            api_token: str,
+            transport: Optional[FinologTransport] = None,
+            identity_map: Optional[IdentityMap] = None,
+            validate_payloads: bool = True,
+            trust_responses: bool = False
+    ) -> None:
+        if transport is None:
+            transport = self.transport_class(api_token)
+
+        self.transport = transport
+        self.identity_map = identity_map
+        self.validate_payloads = validate_payloads
+        self.trust_responses = trust_responses
+
+    @property
+    def client(self):
+        return self.transport.session
 
     def request(self, method, uri, payload=None):
-        if payload is None:
-            payload = {}
+        """
+        Returns the decoded response, or an awaitable of it when the service runs on AsyncFinologTransport.
+        """
+        return self.transport.request(method, self.BASE_URI + uri, payload)
+
+    def build(self, obj: Dict[str, Any], trusted: Optional[bool] = None) -> Union[BaseModel, ModelView]:
+        """
+        Builds the service model from a decoded object, or a ModelView of it without validation
+        when responses are trusted (trusted overrides the trust_responses setting of the service).
+        """
+
+        if self.trust_responses if trusted is None else trusted:
+            return view(self.model, obj)
+
+        return self.model(**obj)
+
+    def model_changes(self, model: BaseModel) -> Dict[str, Any]:
+        """
+        Returns the changed fields of a tracked model of the service, for update_from_model.
+        """
+
+        if isinstance(model, ModelView):
+            raise TypeError(f'{type(model).__name__} is read-only, update the model returned by its to_model()')
+        if not isinstance(model, self.model) or not isinstance(model, TrackedModel):
+            raise TypeError(f'expected {self.model.__name__}, got {type(model).__name__}')
+
+        return model.changes()
+
+    def parse(
+            self,
+            obj: Dict[str, Any],
+            remember: bool = True,
+            trusted: Optional[bool] = None
+    ) -> Union[BaseModel, ModelView]:
+        """
+        Builds the service model from a decoded object, recording it in the identity map.
+        """
+
+        if remember and self.identity_map is not None:
+            self.identity_map.harvest(self.entity, obj)
+
+        return self.build(obj, trusted)
+
+    def parser(
+            self,
+            fields: Optional[Sequence[str]] = None,
+            trusted: Optional[bool] = None
+    ) -> Callable[[Dict[str, Any]], Any]:
+        """
+        Returns the function building results of a listing: models (see parse) or,
+        if fields are given, records of those fields only (see finolog.types.views.Projection).
+        """
+
+        if not fields:
+            return lambda obj: self.parse(obj, trusted=trusted)
+
+        project = projection(self.model, (fields,) if isinstance(fields, str) else tuple(fields))
+
+        def parse(obj: Dict[str, Any]) -> tuple:
+            if self.identity_map is not None:
+                self.identity_map.harvest(self.entity, obj)
+            return project(obj)
+
+        return parse
+
+    def remembered(self, id_: int, trusted: Optional[bool] = None) -> Optional[Union[BaseModel, ModelView]]:
+        """
+        Returns a fresh enough copy of the entity from the identity map, if there is one.
+        """
+
+        if self.identity_map is None:
+            return None
+
+        obj = self.identity_map.get(self.entity, id_)
+        return None if obj is None else self.build(obj, trusted)
+
+    def forget(self, id_: int) -> None:
+        if self.identity_map is not None:
+            self.identity_map.evict(self.entity, id_)
+
+    def _page_payloads(self, payload: Dict[str, Any]) -> Iterator[Dict[str, Any]]:
+        payload = payload.copy()
+        page = payload.pop('page', 1)
+        payload.setdefault('pagesize', self.DEFAULT_PAGESIZE)
+
+        while True:
+            yield {**payload, 'page': page}
+            page += 1
+
+    def _get_page(self, uri: str, page_payload: Dict[str, Any], deadline: Optional[Deadline]):
+        with deadline_scope(deadline):
+            return self.request('GET', uri, page_payload)
+
+    def _stream_pages(self, uri: str, payload: Dict[str, Any], deadline: Optional[Deadline]) -> Iterator[Dict[str, Any]]:
+        for page_payload in self._page_payloads(payload):
+            with deadline_scope(deadline):
+                objects = self.transport.stream('GET', self.BASE_URI + uri, page_payload)
+
+            count = 0
+            try:
+                for obj in objects:
+                    count += 1
+                    yield obj
+            finally:
+                objects.close()
+
+            if count < page_payload['pagesize']:
+                return
+
+    def paginate(
+            self,
+            uri: str,
+            payload: Dict[str, Any],
+            prefetch: int = 0,
+            deadline: Optional[Deadline] = None,
+            stream: bool = False
+    ) -> Iterator[Dict[str, Any]]:
+        """
+        Yields decoded objects of a paginated listing one by one, requesting pages on demand.
+        Stops after the first page shorter than pagesize.
 
-        response = self.client.request(method, self.BASE_URI + uri, json=payload)
+        prefetch: int : Number of pages requested ahead on the transport worker pool.
+        Pages are still yielded in order, and no more than prefetch pages are in flight
+        or buffered while the consumer is busy.
+        deadline: Deadline : Time budget of the whole walk
+        stream: bool : Decode every page element by element while it is received (see
+        FinologTransport.stream), so memory is bounded by one object rather than one page.
+        Cannot be combined with prefetch
+        """
 
-        if response.status_code == 404:
-            raise ValueError(*response)
+        if stream:
+            if prefetch > 0:
+                raise ValueError('prefetch cannot be combined with stream')
+            yield from self._stream_pages(uri, payload, deadline)
+            return
 
-        return response.json()
+        if prefetch < 1:
+            for page_payload in self._page_payloads(payload):
+                objects = self._get_page(uri, page_payload, deadline)
+
+                yield from objects
+
+                if len(objects) < page_payload['pagesize']:
+                    return
+            return
+
+        page_payloads = self._page_payloads(payload)
+        in_flight = deque()
+
+        try:
+            for _ in range(prefetch):
+                page_payload = next(page_payloads)
+                in_flight.append((self.transport.submit(self._get_page, uri, page_payload, deadline), page_payload))
+
+            while in_flight:
+                future, page_payload = in_flight.popleft()
+                objects = future.result()
+
+                if len(objects) < page_payload['pagesize']:
+                    yield from objects
+                    return
+
+                next_payload = next(page_payloads)
+                in_flight.append((self.transport.submit(self._get_page, uri, next_payload, deadline), next_payload))
+
+                yield from objects
+        finally:
+            for future, _ in in_flight:
+                future.cancel()
 
     def validate_payload(self, payload: Dict[str, Any], types) -> bool:
         errors = list()
@@ -42,3 +230,96 @@ class FinologAPIService:
             raise ValidationError(errors)
 
         return True
+
+    def prepare(self, endpoint: str, payload: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Checks a payload against the compiled schema of the endpoint (see finolog.endpoints)
+        and applies its coercions. Checks are skipped when validate_payloads is off.
+        """
+        return ENDPOINTS[endpoint](payload, self.validate_payloads)
+
+    def validate_id(self, id_: int) -> bool:
+        if self.validate_payloads and not isinstance(id_, int):
+            raise ValidationError([ErrorDetail(f'must be of type {int}', 'id')])
+        return True
+
+
+class AsyncFinologAPIService(FinologAPIService):
+    transport_class = AsyncFinologTransport
+
+    async def _get_page(self, uri: str, page_payload: Dict[str, Any], deadline: Optional[Deadline]):
+        with deadline_scope(deadline):
+            return await self.request('GET', uri, page_payload)
+
+    async def _stream_pages(
+            self,
+            uri: str,
+            payload: Dict[str, Any],
+            deadline: Optional[Deadline]
+    ) -> AsyncIterator[Dict[str, Any]]:
+        for page_payload in self._page_payloads(payload):
+            with deadline_scope(deadline):
+                objects = await self.transport.stream('GET', self.BASE_URI + uri, page_payload)
+
+            count = 0
+            try:
+                async for obj in objects:
+                    count += 1
+                    yield obj
+            finally:
+                await objects.aclose()
+
+            if count < page_payload['pagesize']:
+                return
+
+    async def paginate(
+            self,
+            uri: str,
+            payload: Dict[str, Any],
+            prefetch: int = 0,
+            deadline: Optional[Deadline] = None,
+            stream: bool = False
+    ) -> AsyncIterator[Dict[str, Any]]:
+        if stream:
+            if prefetch > 0:
+                raise ValueError('prefetch cannot be combined with stream')
+            async for obj in self._stream_pages(uri, payload, deadline):
+                yield obj
+            return
+
+        if prefetch < 1:
+            for page_payload in self._page_payloads(payload):
+                objects = await self._get_page(uri, page_payload, deadline)
+
+                for obj in objects:
+                    yield obj
+
+                if len(objects) < page_payload['pagesize']:
+                    return
+            return
+
+        page_payloads = self._page_payloads(payload)
+        in_flight = deque()
+
+        try:
+            for _ in range(prefetch):
+                page_payload = next(page_payloads)
+                in_flight.append((asyncio.ensure_future(self._get_page(uri, page_payload, deadline)), page_payload))
+
+            while in_flight:
+                task, page_payload = in_flight.popleft()
+                objects = await task
+
+                if len(objects) < page_payload['pagesize']:
+                    for obj in objects:
+                        yield obj
+                    return
+
+                next_payload = next(page_payloads)
+                in_flight.append((asyncio.ensure_future(self._get_page(uri, next_payload, deadline)), next_payload))
+
+                for obj in objects:
+                    yield obj
+        finally:
+            for task, _ in in_flight:
+                task.cancel()
@@ -1,13 +1,34 @@
-from typing import List, Any, Optional, Dict, Union, Tuple
-
-from finolog.services.api_service import FinologAPIService
+import asyncio
+from typing import List, Any, Optional, Dict, Union, Tuple, Iterator, AsyncIterator, Iterable, Sequence
+
+from finolog.analytics import ContractorBalances
+from finolog.directory import ContractorDirectory
+from finolog.services.api_service import FinologAPIService, AsyncFinologAPIService
+from finolog.deadline import Deadline
+from finolog.identity_map import IdentityMap
+from finolog.transport import FinologTransport
 from finolog.types.contractor_types import Contractor
-from finolog.utils import validate_string_length
+from finolog.utils import BulkResult, chunk_ids
+
 
+class BaseContractorService(FinologAPIService):
+    """
+    Payload validation and response parsing shared by the sync and async contractor services.
+    """
 
-class FinologContractorService(FinologAPIService):
-    def __init__(self, api_token: str, biz_id: int) -> None:
-        super().__init__(api_token)
+    entity = 'contractor'
+    model = Contractor
+
+    def __init__(
+            self,
+            api_token: str,
+            biz_id: int,
+            transport: Optional[FinologTransport] = None,
+            identity_map: Optional[IdentityMap] = None,
+            validate_payloads: bool = True,
+            trust_responses: bool = False
+    ) -> None:
+        super().__init__(api_token, transport, identity_map, validate_payloads, trust_responses)
 
         if not isinstance(biz_id, int):
             raise TypeError('biz_id must be a number')
@@ -15,7 +36,129 @@ class FinologContractorService(FinologAPIService):
         self.biz_id = biz_id
         self.uri = f'biz/{self.biz_id}/contractor'
 
-    def get_contractors(self, **payload) -> List[Contractor]:
+    def _prepare_get_contractors(self, payload: Dict[str, Any]) -> Dict[str, Any]:
+        return self.prepare('contractor.list', payload)
+
+    def _prepare_load_directory(self, payload: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Adds requisites to the related entities requested by the caller, keeping the others.
+        """
+
+        included = [name.strip() for name in str(payload.get('with_') or '').split(',') if name.strip()]
+        if 'requisites' not in included:
+            included.append('requisites')
+
+        return self._prepare_get_contractors({**payload, 'with_': ','.join(included)})
+
+    def _prepare_get_contractors_by_ids(self, chunks: List[List[int]], payload: Dict[str, Any]) -> List[Dict[str, Any]]:
+        return [
+            self._prepare_get_contractors({**payload, 'ids': ','.join(map(str, chunk)), 'page': 1, 'pagesize': len(chunk)})
+            for chunk in chunks
+        ]
+
+    def _parse_contractors(
+            self,
+            response,
+            trusted: Optional[bool] = None,
+            fields: Optional[Sequence[str]] = None
+    ) -> List[Contractor]:
+        parse = self.parser(fields, trusted)
+        try:
+            return [parse(obj) for obj in response]
+        except TypeError:
+            raise TypeError(response)
+
+    def _validate_defaults(self, defaults: Optional[Dict[str, Any]]) -> None:
+        if defaults:
+            self.prepare('contractor.defaults', defaults)
+
+    def _prepare_create_contractor(self, name: str, payload: Dict[str, Any]) -> Dict[str, Any]:
+        payload['name'] = name
+        return self.prepare('contractor.create', payload)
+
+    def _prepare_create_from_defaults(self, defaults: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+        return self.prepare('contractor.create', dict(defaults or {}))
+
+    def _prepare_records_by_inn(
+            self,
+            records: Iterable[Dict[str, Any]]
+    ) -> Tuple[Dict[str, Tuple[Exception, bool]], Dict[str, Dict[str, Any]]]:
+        """
+        Validates get_or_create_many_by_inn records. Returns the results of invalid records and
+        the contractor payloads of valid ones, both keyed by inn. Only the first record of an inn is used.
+        """
+
+        results = dict()
+        payloads = dict()
+
+        for record in records:
+            payload = dict(record)
+            inn = payload.pop('inn', None)
+            if inn in results or inn in payloads:
+                continue
+
+            try:
+                self.prepare('requisite.write', {'inn': inn})
+                payloads[inn] = self.prepare('contractor.defaults', payload)
+            except ValueError as e:
+                results[inn] = (e, False)
+
+        return results, payloads
+
+    def _missing_inns(
+            self,
+            payloads: Dict[str, Dict[str, Any]],
+            index: Dict[str, Dict[str, Any]],
+            results: Dict[str, Tuple[Exception, bool]]
+    ) -> List[str]:
+        """
+        Returns the inns without a contractor; records that cannot be created (no name) get their error in results.
+        """
+
+        missing = []
+        for inn, payload in payloads.items():
+            if inn in index:
+                continue
+            try:
+                self.prepare('contractor.create', payload)
+                missing.append(inn)
+            except ValueError as e:
+                results[inn] = (e, False)
+
+        return missing
+
+    @staticmethod
+    def _index_inns(obj: Dict[str, Any], wanted: Dict[str, Any], index: Dict[str, Dict[str, Any]]) -> bool:
+        """
+        Adds a decoded contractor to index under the wanted inns of its requisites.
+        Returns True once every wanted inn is indexed.
+        """
+
+        for requisite in obj.get('requisites') or ():
+            inn = requisite.get('inn')
+            if inn in wanted and inn not in index:
+                index[inn] = obj
+
+        return len(index) == len(wanted)
+
+    def _requisite_uri(self) -> str:
+        return f'biz/{self.biz_id}/requisite'
+
+    def _prepare_inn_requisite(self, contractor: Dict[str, Any], inn: str) -> Dict[str, Any]:
+        return self.prepare('requisite.write', {'contractor_id': contractor['id'], 'name': contractor['name'], 'inn': inn})
+
+    def _validate_update_contractor(self, contractor_id: int, payload: Dict[str, Any]) -> None:
+        self.validate_id(contractor_id)
+        self.prepare('contractor.update', payload)
+
+
+class FinologContractorService(BaseContractorService):
+    def get_contractors(
+            self,
+            trust_responses: Optional[bool] = None,
+            fields: Optional[Sequence[str]] = None,
+            **payload
+    ) -> List[Contractor]:
         """
         Returns a list of Contractor.
 
@@ -29,47 +172,123 @@ class FinologContractorService(FinologAPIService):
         query: str: Search line
         ids: str : Filter elements by ID (list of id separated by commas)
         is_bizzed: bool : Filter by counterparties that are business counterparties
+
+        trust_responses: bool : Return ModelView objects built without validation,
+        overrides the trust_responses setting of the service
+        fields: Sequence[str] : Return namedtuples of only these fields instead of Contractor objects.
+        Nested fields are given as dotted paths; dots become underscores in attribute names
         """
 
-        if 'with_' in payload:
-            payload['with'] = payload.pop('with_')
-
-        self.validate_payload(
-            payload=payload,
-            types={
-                'email': str,
-                'inn': str,
-                'with': str,
-                'page': int,
-                'pagesize': int,
-                'query': str,
-                'ids': str,
-                'is_bizzed': bool
-            }
-        )
+        payload = self._prepare_get_contractors(payload)
 
-        if 'inn' in payload:
-            validate_string_length('inn', payload['inn'], min_l=10, max_l=12)
+        return self._parse_contractors(self.request('GET', self.uri, payload), trust_responses, fields)
 
-        if 'is_bizzed' in payload:
-            payload['is_bizzed'] = 'true' if payload['is_bizzed'] is True else 'false'
+    def iter_contractors(
+            self,
+            prefetch: int = 0,
+            deadline: Optional[Deadline] = None,
+            trust_responses: Optional[bool] = None,
+            fields: Optional[Sequence[str]] = None,
+            stream: bool = False,
+            **payload
+    ) -> Iterator[Contractor]:
+        """
+        Lazily iterates over all contractors matching the filters, fetching pages on demand.
+        Accepts the same payload as get_contractors; page sets the first page to fetch.
+
+        prefetch: int : Number of pages to request ahead concurrently, see FinologAPIService.paginate
+        deadline: Deadline : Time budget of the whole iteration
+        trust_responses: bool : See get_contractors
+        fields: Sequence[str] : See get_contractors
+        stream: bool : Parse every page element by element while it is received, holding one
+        object in memory instead of the whole page; allows a large pagesize. Cannot be combined with prefetch
+        """
 
-        response = self.request('GET', self.uri, payload)
+        payload = self._prepare_get_contractors(payload)
+        parse = self.parser(fields, trust_responses)
 
-        try:
-            return [Contractor(**obj) for obj in response]
-        except TypeError:
-            raise TypeError(response)
+        return (parse(obj) for obj in self.paginate(self.uri, payload, prefetch, deadline, stream))
+
+    def export_balances(
+            self,
+            prefetch: int = 0,
+            deadline: Optional[Deadline] = None,
+            stream: bool = False,
+            **payload
+    ) -> ContractorBalances:
+        """
+        Reads the summary rows of all contractors matching the filters into ContractorBalances
+        (see finolog.analytics) without building models. Accepts the same payload as get_contractors.
+
+        prefetch: int : See iter_contractors
+        deadline: Deadline : See iter_contractors
+        stream: bool : See iter_contractors
+        """
+
+        payload = self._prepare_get_contractors(payload)
+
+        return ContractorBalances().extend(self.paginate(self.uri, payload, prefetch, deadline, stream))
+
+    def load_directory(
+            self,
+            directory: Optional[ContractorDirectory] = None,
+            prefetch: int = 0,
+            deadline: Optional[Deadline] = None,
+            stream: bool = False,
+            **payload
+    ) -> ContractorDirectory:
+        """
+        Reads all contractors matching the filters, with their requisites, into a ContractorDirectory
+        (see finolog.directory) without building models. Accepts the same payload as get_contractors;
+        requisites are added to the entities requested with with_.
+
+        directory: ContractorDirectory : Directory to reload in place, to refresh one in use
+        prefetch: int : See iter_contractors
+        deadline: Deadline : See iter_contractors
+        stream: bool : See iter_contractors
+        """
+
+        payload = self._prepare_load_directory(payload)
+        directory = directory if directory is not None else ContractorDirectory()
+
+        return directory.reload(self.paginate(self.uri, payload, prefetch, deadline, stream))
+
+    def get_contractors_by_ids(
+            self,
+            ids: Iterable[int],
+            trust_responses: Optional[bool] = None,
+            **payload
+    ) -> BulkResult:
+        """
+        Returns a BulkResult of Contractor keyed by id; ids that were not found are listed in `missing`.
+
+        Ids are split into chunks for the `ids` filter, and the chunks are fetched concurrently.
+
+        Payload:
+        with_: str : Include related entities, see get_contractors
+
+        trust_responses: bool : See get_contractors
+        """
+
+        chunks = chunk_ids(ids)
+        payloads = self._prepare_get_contractors_by_ids(chunks, payload)
 
-    def get_contractor(self, contractor_id: int) -> Contractor:
-        self.validate_payload(
-            payload={'id': contractor_id},
-            types={
-                'id': int
-            }
+        futures = [self.transport.submit(self.request, 'GET', self.uri, page_payload) for page_payload in payloads]
+        pages = (future.result() for future in futures)
+
+        return BulkResult.from_objects(
+            (id_ for chunk in chunks for id_ in chunk),
+            (self.parse(obj, trusted=trust_responses) for page in pages for obj in page)
         )
 
-        return Contractor(**self.request('GET', f'{self.uri}/{str(contractor_id)}'))
+    def get_contractor(self, contractor_id: int, trust_responses: Optional[bool] = None) -> Contractor:
+        self.validate_id(contractor_id)
+
+        contractor = self.remembered(contractor_id, trust_responses)
+        if contractor is not None:
+            return contractor
+
+        return self.parse(self.request('GET', f'{self.uri}/{str(contractor_id)}'), trusted=trust_responses)
 
     def get_or_create_by_inn(
             self,
@@ -86,25 +305,80 @@ class FinologContractorService(FinologAPIService):
         description: str : Description
         """
 
-        if defaults:
-            self.validate_payload(
-                payload=defaults,
-                types={
-                    'name': str,
-                    'email': str,
-                    'phone': str,
-                    'person': str,
-                    'description': str
-                }
-            )
+        self._validate_defaults(defaults)
 
         contractors = self.get_contractors(inn=inn, with_='requisites')
 
         if not contractors:
-            return self.create_contractor(defaults.pop('name'), **defaults), True
+            payload = self._prepare_create_from_defaults(defaults)
+            return self.parse(self.request('POST', self.uri, payload=payload)), True
 
         return contractors, False
 
+    def get_or_create_many_by_inn(
+            self,
+            records: Iterable[Dict[str, Any]],
+            prefetch: int = 0,
+            deadline: Optional[Deadline] = None
+    ) -> Dict[str, Tuple[Union[Contractor, Exception], bool]]:
+        """
+        Returns a dict of (Contractor, created) keyed by inn, like get_or_create_by_inn for many inns at once.
+
+        Existing contractors are found in one walk over the contractor list with requisites, which stops
+        as soon as every inn is found. Missing ones are created concurrently on the transport worker pool,
+        each with a requisite holding its inn. Invalid records and failed creations are returned as
+        (exception, False); they do not stop the batch. A contractor whose requisite could not be
+        created is deleted again, so running the batch again does not duplicate it.
+
+        records: Iterable[dict] : inn, plus the create_contractor payload (name, email, phone, person,
+        description) used if no contractor has a requisite with that inn; name is required only then
+        prefetch: int : See iter_contractors
+        deadline: Deadline : Time budget of the contractor walk
+        """
+
+        results, payloads = self._prepare_records_by_inn(records)
+        index = dict()
+
+        if payloads:
+            pages = self.paginate(self.uri, self._prepare_get_contractors({'with_': 'requisites'}), prefetch, deadline)
+            for obj in pages:
+                if self._index_inns(obj, payloads, index):
+                    break
+            pages.close()
+
+        futures = {
+            inn: self.transport.submit(self._create_with_inn, inn, payloads[inn])
+            for inn in self._missing_inns(payloads, index, results)
+        }
+
+        for inn, obj in index.items():
+            results[inn] = (self.parse(obj), False)
+        for inn, future in futures.items():
+            results[inn] = (future.exception(), False) if future.exception() else (future.result(), True)
+
+        return results
+
+    def _create_with_inn(self, inn: str, payload: Dict[str, Any]) -> Contractor:
+        """
+        Creates a contractor and its INN requisite. If the requisite cannot be created, the contractor
+        is deleted again, so that a repeated batch does not create a duplicate, and the requisite error
+        is raised (with the deletion error as its context if the deletion failed as well).
+        """
+
+        contractor = self.request('POST', self.uri, payload=payload)
+        try:
+            requisite = self.request(
+                'POST', self._requisite_uri(), payload=self._prepare_inn_requisite(contractor, inn)
+            )
+        except Exception as e:
+            try:
+                self.request('DELETE', f'{self.uri}/{contractor["id"]}')
+            except Exception:
+                raise e
+            raise
+
+        return self.parse({**contractor, 'requisites': [requisite]})
+
     def create_contractor(self, name: str, **payload) -> Contractor:
         """
         Returns Contractor object.
@@ -116,20 +390,9 @@ class FinologContractorService(FinologAPIService):
         description: str : Description
         """
 
-        payload['name'] = name
-
-        self.validate_payload(
-            payload=payload,
-            types={
-                'name': str,
-                'email': str,
-                'phone': str,
-                'person': str,
-                'description': str
-            }
-        )
+        payload = self._prepare_create_contractor(name, payload)
 
-        return Contractor(**self.request('POST', self.uri, payload=payload))
+        return self.parse(self.request('POST', self.uri, payload=payload))
 
     def update_contractor(self, contractor_id: int, **payload) -> Contractor:
         """
@@ -143,29 +406,206 @@ class FinologContractorService(FinologAPIService):
         description: str : Description
         """
 
-        payload_copy = payload.copy()
-        payload_copy['id'] = contractor_id
+        self._validate_update_contractor(contractor_id, payload)
 
-        self.validate_payload(
-            payload=payload_copy,
-            types={
-                'id': int,
-                'name': str,
-                'email': str,
-                'phone': str,
-                'person': str,
-                'description': str
-            }
-        )
+        return self.parse(self.request('PUT', f'{self.uri}/{str(contractor_id)}', payload))
+
+    def update_from_model(self, contractor: Contractor) -> Contractor:
+        """
+        Sends only the changed fields of a Contractor (see TrackedModel) with update_contractor and returns
+        the updated Contractor. Returns contractor itself, without a request, if nothing changed.
+        Raises TypeError for views returned with trust_responses.
+        """
+
+        changes = self.model_changes(contractor)
+        if not changes:
+            return contractor
 
-        return Contractor(**self.request('PUT', f'{self.uri}/{str(contractor_id)}', payload))
+        updated = self.update_contractor(contractor.id, **changes)
+        contractor.clear_changes()
+
+        return updated
 
     def delete_contractor(self, contractor_id: int) -> Contractor:
-        self.validate_payload(
-            payload={'id': contractor_id},
-            types={
-                'id': int
-            }
+        self.validate_id(contractor_id)
+
+        response = self.request('DELETE', f'{self.uri}/{str(contractor_id)}')
+        self.forget(contractor_id)
+
+        return self.parse(response, remember=False)
+
+
+class AsyncFinologContractorService(AsyncFinologAPIService, BaseContractorService):
+    """
+    Awaitable counterpart of FinologContractorService; see it for payload documentation.
+    """
+
+    async def get_contractors(
+            self,
+            trust_responses: Optional[bool] = None,
+            fields: Optional[Sequence[str]] = None,
+            **payload
+    ) -> List[Contractor]:
+        payload = self._prepare_get_contractors(payload)
+
+        return self._parse_contractors(await self.request('GET', self.uri, payload), trust_responses, fields)
+
+    def iter_contractors(
+            self,
+            prefetch: int = 0,
+            deadline: Optional[Deadline] = None,
+            trust_responses: Optional[bool] = None,
+            fields: Optional[Sequence[str]] = None,
+            stream: bool = False,
+            **payload
+    ) -> AsyncIterator[Contractor]:
+        payload = self._prepare_get_contractors(payload)
+        parse = self.parser(fields, trust_responses)
+
+        return (parse(obj) async for obj in self.paginate(self.uri, payload, prefetch, deadline, stream))
+
+    async def export_balances(
+            self,
+            prefetch: int = 0,
+            deadline: Optional[Deadline] = None,
+            stream: bool = False,
+            **payload
+    ) -> ContractorBalances:
+        payload = self._prepare_get_contractors(payload)
+
+        balances = ContractorBalances()
+        async for obj in self.paginate(self.uri, payload, prefetch, deadline, stream):
+            balances.append(obj)
+
+        return balances
+
+    async def load_directory(
+            self,
+            directory: Optional[ContractorDirectory] = None,
+            prefetch: int = 0,
+            deadline: Optional[Deadline] = None,
+            stream: bool = False,
+            **payload
+    ) -> ContractorDirectory:
+        payload = self._prepare_load_directory(payload)
+        loader = (directory if directory is not None else ContractorDirectory()).loader()
+
+        async for obj in self.paginate(self.uri, payload, prefetch, deadline, stream):
+            loader.append(obj)
+
+        return loader.commit()
+
+    async def get_contractors_by_ids(
+            self,
+            ids: Iterable[int],
+            trust_responses: Optional[bool] = None,
+            **payload
+    ) -> BulkResult:
+        chunks = chunk_ids(ids)
+        payloads = self._prepare_get_contractors_by_ids(chunks, payload)
+
+        pages = await asyncio.gather(*(self.request('GET', self.uri, page_payload) for page_payload in payloads))
+
+        return BulkResult.from_objects(
+            (id_ for chunk in chunks for id_ in chunk),
+            (self.parse(obj, trusted=trust_responses) for page in pages for obj in page)
         )
 
-        return Contractor(**self.request('DELETE', f'{self.uri}/{str(contractor_id)}'))
+    async def get_contractor(self, contractor_id: int, trust_responses: Optional[bool] = None) -> Contractor:
+        self.validate_id(contractor_id)
+
+        contractor = self.remembered(contractor_id, trust_responses)
+        if contractor is not None:
+            return contractor
+
+        return self.parse(await self.request('GET', f'{self.uri}/{str(contractor_id)}'), trusted=trust_responses)
+
+    async def get_or_create_by_inn(
+            self,
+            inn: str,
+            defaults: Optional[Dict[str, Any]] = None
+    ) -> Tuple[Union[Contractor, List[Contractor]], bool]:
+        self._validate_defaults(defaults)
+
+        contractors = await self.get_contractors(inn=inn, with_='requisites')
+
+        if not contractors:
+            payload = self._prepare_create_from_defaults(defaults)
+            return self.parse(await self.request('POST', self.uri, payload=payload)), True
+
+        return contractors, False
+
+    async def get_or_create_many_by_inn(
+            self,
+            records: Iterable[Dict[str, Any]],
+            prefetch: int = 0,
+            deadline: Optional[Deadline] = None
+    ) -> Dict[str, Tuple[Union[Contractor, Exception], bool]]:
+        results, payloads = self._prepare_records_by_inn(records)
+        index = dict()
+
+        if payloads:
+            pages = self.paginate(self.uri, self._prepare_get_contractors({'with_': 'requisites'}), prefetch, deadline)
+            async for obj in pages:
+                if self._index_inns(obj, payloads, index):
+                    break
+            await pages.aclose()
+
+        slots = asyncio.Semaphore(self.transport.pool_maxsize)
+
+        async def create(inn: str) -> Contractor:
+            async with slots:
+                return await self._create_with_inn(inn, payloads[inn])
+
+        missing = self._missing_inns(payloads, index, results)
+        created = await asyncio.gather(*(create(inn) for inn in missing), return_exceptions=True)
+
+        for inn, obj in index.items():
+            results[inn] = (self.parse(obj), False)
+        for inn, contractor in zip(missing, created):
+            results[inn] = (contractor, False) if isinstance(contractor, Exception) else (contractor, True)
+
+        return results
+
+    async def _create_with_inn(self, inn: str, payload: Dict[str, Any]) -> Contractor:
+        contractor = await self.request('POST', self.uri, payload=payload)
+        try:
+            requisite = await self.request(
+                'POST', self._requisite_uri(), payload=self._prepare_inn_requisite(contractor, inn)
+            )
+        except Exception as e:
+            try:
+                await self.request('DELETE', f'{self.uri}/{contractor["id"]}')
+            except Exception:
+                raise e
+            raise
+
+        return self.parse({**contractor, 'requisites': [requisite]})
+
+    async def create_contractor(self, name: str, **payload) -> Contractor:
+        payload = self._prepare_create_contractor(name, payload)
+
+        return self.parse(await self.request('POST', self.uri, payload=payload))
+
+    async def update_contractor(self, contractor_id: int, **payload) -> Contractor:
+        self._validate_update_contractor(contractor_id, payload)
+
+        return self.parse(await self.request('PUT', f'{self.uri}/{str(contractor_id)}', payload))
+
+    async def update_from_model(self, contractor: Contractor) -> Contractor:
+        changes = self.model_changes(contractor)
+        if not changes:
+            return contractor
+
+        updated = await self.update_contractor(contractor.id, **changes)
+        contractor.clear_changes()
+
+        return updated
+
+    async def delete_contractor(self, contractor_id: int) -> Contractor:
+        self.validate_id(contractor_id)
+
+        response = await self.request('DELETE', f'{self.uri}/{str(contractor_id)}')
+        self.forget(contractor_id)
+
+        return self.parse(response, remember=False)
@@ -1,14 +1,149 @@
-from typing import List
+import asyncio
+import json
+import threading
+import time
+import weakref
+from typing import List, Optional, Dict, Any
 
-from finolog.services.api_service import FinologAPIService
+from finolog.services.api_service import FinologAPIService, AsyncFinologAPIService
+from finolog.transport import FinologTransport
 from finolog.types.country_types import Country
 
 
-class FinologCountryService(FinologAPIService):
-    def __init__(self, api_token: str) -> None:
-        super().__init__(api_token)
+class CountryCache:
+    """
+    Process-wide reference data for countries with lookups by id and code.
+
+    ttl: float : Seconds after which the list is reloaded from the API
+    """
+
+    DEFAULT_TTL = 24 * 60 * 60
+
+    def __init__(self, ttl: float = DEFAULT_TTL) -> None:
+        self.ttl = ttl
+        self.lock = threading.Lock()
+        # asyncio locks are bound to an event loop, so async services get one per loop;
+        # the registry has its own lock, as lock is held by sync services while they load
+        self._async_locks_lock = threading.Lock()
+        self._async_locks: 'weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, asyncio.Lock]' = \
+            weakref.WeakKeyDictionary()
+        self.countries: List[Country] = list()
+        self.by_id: Dict[int, Country] = dict()
+        self.by_code: Dict[str, Country] = dict()
+        self.loaded_at: Optional[float] = None
+
+    @property
+    def is_fresh(self) -> bool:
+        return self.loaded_at is not None and time.monotonic() - self.loaded_at < self.ttl
+
+    def async_lock(self) -> asyncio.Lock:
+        """
+        Returns the lock serializing loads by async services on the running event loop.
+        """
+
+        loop = asyncio.get_running_loop()
+        with self._async_locks_lock:
+            lock = self._async_locks.get(loop)
+            if lock is None:
+                lock = self._async_locks[loop] = asyncio.Lock()
+        return lock
+
+    def load(self, data: List[Dict[str, Any]]) -> None:
+        countries = [Country(**obj) for obj in data]
+
+        self.countries = countries
+        self.by_id = {country.id: country for country in countries}
+        self.by_code = {country.code.upper(): country for country in countries}
+        self.loaded_at = time.monotonic()
+
+    def load_snapshot(self, path: str) -> None:
+        """
+        Loads countries from a JSON file written by dump_snapshot, so no API call is needed at startup.
+        """
+        with open(path, encoding='utf-8') as f:
+            self.load(json.load(f))
+
+    def dump_snapshot(self, path: str) -> None:
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump([country.dict() for country in self.countries], f, ensure_ascii=False)
+
+    def invalidate(self) -> None:
+        self.loaded_at = None
+
+
+country_cache = CountryCache()
+
+
+class BaseCountryService(FinologAPIService):
+    def __init__(
+            self,
+            api_token: str,
+            transport: Optional[FinologTransport] = None,
+            cache: Optional[CountryCache] = None
+    ) -> None:
+        super().__init__(api_token, transport)
 
         self.uri = f'country'
+        self.cache = country_cache if cache is None else cache
+
+    def _lookup(self, index: Dict[Any, Country], key: Any, field: str) -> Country:
+        try:
+            return index[key]
+        except KeyError:
+            raise ValueError(f'country with {field} {key!r} not found')
+
+
+class FinologCountryService(BaseCountryService):
+    def _ensure_loaded(self, refresh: bool = False) -> None:
+        if refresh or not self.cache.is_fresh:
+            with self.cache.lock:
+                if refresh or not self.cache.is_fresh:
+                    self.cache.load(self.request('GET', self.uri))
+
+    def get_countries(self, refresh: bool = False) -> List[Country]:
+        """
+        Returns a list of Country.
+
+        The list is loaded once per process and kept for CountryCache.ttl seconds.
+
+        refresh: bool : Reload the list from the API
+        """
+
+        self._ensure_loaded(refresh)
+
+        return list(self.cache.countries)
+
+    def get_country(self, id_: int) -> Country:
+        self.validate_id(id_)
+        self._ensure_loaded()
+
+        return self._lookup(self.cache.by_id, id_, 'id')
+
+    def get_country_by_code(self, code: str) -> Country:
+        self._ensure_loaded()
+
+        return self._lookup(self.cache.by_code, code.upper(), 'code')
+
+
+class AsyncFinologCountryService(AsyncFinologAPIService, BaseCountryService):
+    async def _ensure_loaded(self, refresh: bool = False) -> None:
+        if refresh or not self.cache.is_fresh:
+            async with self.cache.async_lock():
+                if refresh or not self.cache.is_fresh:
+                    self.cache.load(await self.request('GET', self.uri))
+
+    async def get_countries(self, refresh: bool = False) -> List[Country]:
+        await self._ensure_loaded(refresh)
+
+        return list(self.cache.countries)
+
+    async def get_country(self, id_: int) -> Country:
+        self.validate_id(id_)
+        await self._ensure_loaded()
+
+        return self._lookup(self.cache.by_id, id_, 'id')
+
+    async def get_country_by_code(self, code: str) -> Country:
+        await self._ensure_loaded()
 
-    def get_countries(self) -> List[Country]:
-        return [Country(**data) for data in self.request('GET', self.uri)]
+        return self._lookup(self.cache.by_code, code.upper(), 'code')
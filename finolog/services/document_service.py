@@ -1,21 +1,133 @@
-from typing import List
-
-from finolog.services.api_service import FinologAPIService
+import asyncio
+import os
+from concurrent.futures import wait, FIRST_COMPLETED
+from functools import partial
+from typing import List, Optional, Dict, Any, Iterator, AsyncIterator, Sequence, Iterable, Union, BinaryIO, Tuple
+from urllib.parse import urlsplit
+
+from finolog.columnar import ColumnSpec, DocumentExport, DOCUMENT_COLUMNS, DOCUMENT_ITEM_COLUMNS
+from finolog.services.api_service import FinologAPIService, AsyncFinologAPIService
+from finolog.deadline import Deadline
+from finolog.exceptions import DownloadError
+from finolog.idempotency import IdempotencyStore
+from finolog.identity_map import IdentityMap
+from finolog.transport import FinologTransport
 from finolog.types.document_types import Document, DocumentPDF
 
 
-class FinologDocumentService(FinologAPIService):
-    def __init__(self, api_token: str, biz_id: int) -> None:
-        super().__init__(api_token)
+class BaseDocumentService(FinologAPIService):
+    """
+    Payload validation shared by the sync and async document services.
+    """
+
+    entity = 'document'
+    model = Document
+
+    def __init__(
+            self,
+            api_token: str,
+            biz_id: int,
+            transport: Optional[FinologTransport] = None,
+            identity_map: Optional[IdentityMap] = None,
+            validate_payloads: bool = True,
+            trust_responses: bool = False
+    ) -> None:
+        super().__init__(api_token, transport, identity_map, validate_payloads, trust_responses)
 
         if not isinstance(biz_id, int):
             raise TypeError('biz_id must be a number')
 
         self.biz_id = biz_id
         self.uri = f'biz/{self.biz_id}/orders/document'
+        self.idempotency_store = IdempotencyStore()
+
+    def _validate_get_documents(self, payload: Dict[str, Any]) -> None:
+        self.prepare('document.list', payload)
+
+    def _prepare_get_document_pdf(self, id_: int, payload: Dict[str, Any]) -> Dict[str, Any]:
+        self.validate_id(id_)
+        return self.prepare('document.pdf', payload)
+
+    def _validate_create_document(self, payload: Dict[str, Any]) -> None:
+        self.prepare('document.create', payload)
+
+    def _prepare_batch(
+            self,
+            payloads: Iterable[Dict[str, Any]],
+            idempotency_keys: Optional[Sequence[Optional[str]]],
+            idempotency_store: Optional[IdempotencyStore]
+    ) -> Tuple[List[Any], List[Tuple[int, Dict[str, Any], Optional[str]]], IdempotencyStore]:
+        """
+        Validates a batch of create_document payloads. Returns the result list, holding the
+        validation error of invalid payloads and the stored documents of known keys, the
+        (index, payload, key) of the requests to send, and the idempotency store to use.
+        """
+
+        payloads = [dict(payload) for payload in payloads]
+        keys = [None] * len(payloads) if idempotency_keys is None else list(idempotency_keys)
+
+        if len(keys) != len(payloads):
+            raise ValueError('idempotency_keys must have one key per payload')
+
+        used = [key for key in keys if key is not None]
+        if len(set(used)) != len(used):
+            raise ValueError('idempotency_keys must be unique')
+
+        if idempotency_store is None:
+            idempotency_store = self.idempotency_store
+
+        results: List[Any] = [None] * len(payloads)
+        pending = []
+
+        for index, (payload, key) in enumerate(zip(payloads, keys)):
+            try:
+                self._validate_create_document(payload)
+            except ValueError as e:
+                results[index] = e
+                continue
 
+            stored = None if key is None else idempotency_store.get(key)
+            if stored is not None:
+                results[index] = self.parse(stored)
+            else:
+                pending.append((index, payload, key))
+
+        return results, pending, idempotency_store
+
+    def _is_api_url(self, url: str) -> bool:
+        return urlsplit(url).netloc == urlsplit(self.BASE_URI).netloc
+
+    @staticmethod
+    def _open_part(dest: Union[str, os.PathLike], size: int) -> BinaryIO:
+        """
+        Opens dest + '.part' for appending; a part left by an interrupted download is resumed,
+        unless it is larger than the file, which means it is stale.
+        """
+
+        file = open(f'{os.fspath(dest)}.part', 'ab')
+        if file.tell() > size:
+            file.seek(0)
+            file.truncate()
+        return file
+
+    @staticmethod
+    def _finish_download(pdf: DocumentPDF, received: int, dest: Optional[Union[str, os.PathLike]] = None) -> None:
+        if received != pdf.size:
+            raise DownloadError(f'document {pdf.id}: received {received} bytes of {pdf.size}')
+
+        if dest is not None:
+            os.replace(f'{os.fspath(dest)}.part', dest)
+
+    def _validate_update_document(self, id_: int, payload: Dict[str, Any]) -> None:
+        self.validate_id(id_)
+        self.prepare('document.update', payload)
+
+
+class FinologDocumentService(BaseDocumentService):
     def get_documents(
             self,
+            trust_responses: Optional[bool] = None,
+            fields: Optional[Sequence[str]] = None,
             **payload
     ) -> List[Document]:
         """
@@ -32,33 +144,80 @@ class FinologDocumentService(FinologAPIService):
         international - интернациональный шаблон, если kind равен invoice
         stock - отгрузка по остаткам, если kind равен shipment
         asset - отгрузка по средствам, если kind равен shipment
+
+        trust_responses: bool : Return ModelView objects built without validation,
+        overrides the trust_responses setting of the service
+        fields: Sequence[str] : Return namedtuples of only these fields instead of Document objects.
+        Nested fields are given as dotted paths, e.g. ['id', 'number', 'package.total_price'];
+        the attribute of package.total_price is package_total_price
         """
 
-        self.validate_payload(
-            payload=payload,
-            types={
-                'page': int,
-                'pagesize': int,
-                'query': str,
-                'item_id': int,
-                'kind': str,
-                'template': str
-            }
-        )
+        self._validate_get_documents(payload)
+        parse = self.parser(fields, trust_responses)
 
         response = self.request('GET', self.uri, payload)
 
-        return [Document(**obj) for obj in response]
+        return [parse(obj) for obj in response]
 
-    def get_document(self, id_: int) -> Document:
-        self.validate_payload(
-            payload={'id': id_},
-            types={
-                'id': int
-            }
-        )
+    def iter_documents(
+            self,
+            prefetch: int = 0,
+            deadline: Optional[Deadline] = None,
+            trust_responses: Optional[bool] = None,
+            fields: Optional[Sequence[str]] = None,
+            stream: bool = False,
+            **payload
+    ) -> Iterator[Document]:
+        """
+        Lazily iterates over all documents matching the filters, fetching pages on demand.
+        Accepts the same payload as get_documents; page sets the first page to fetch.
+
+        prefetch: int : Number of pages to request ahead concurrently, see FinologAPIService.paginate
+        deadline: Deadline : Time budget of the whole iteration
+        trust_responses: bool : See get_documents
+        fields: Sequence[str] : See get_documents
+        stream: bool : Parse every page element by element while it is received, holding one
+        object in memory instead of the whole page; allows a large pagesize. Cannot be combined with prefetch
+        """
+
+        self._validate_get_documents(payload)
+        parse = self.parser(fields, trust_responses)
+
+        return (parse(obj) for obj in self.paginate(self.uri, payload, prefetch, deadline, stream))
+
+    def export_documents(
+            self,
+            document_columns: Sequence[ColumnSpec] = DOCUMENT_COLUMNS,
+            item_columns: Optional[Sequence[ColumnSpec]] = DOCUMENT_ITEM_COLUMNS,
+            prefetch: int = 0,
+            deadline: Optional[Deadline] = None,
+            stream: bool = False,
+            **payload
+    ) -> DocumentExport:
+        """
+        Reads all documents matching the filters into columnar tables of documents and of their
+        package items (see finolog.columnar) without building models. Accepts the same payload as get_documents.
+
+        document_columns: Sequence[ColumnSpec] : Columns of the document table
+        item_columns: Sequence[ColumnSpec] : Columns of the item table, None to skip items
+        prefetch: int : See iter_documents
+        deadline: Deadline : See iter_documents
+        stream: bool : See iter_documents
+        """
+
+        self._validate_get_documents(payload)
 
-        return Document(**self.request('GET', f'{self.uri}/{str(id_)}'))
+        export = DocumentExport(document_columns, item_columns)
+        return export.extend(self.paginate(self.uri, payload, prefetch, deadline, stream))
+
+    def get_document(self, id_: int, trust_responses: Optional[bool] = None) -> Document:
+        self.validate_id(id_)
+
+        document = self.remembered(id_, trust_responses)
+        if document is not None:
+            return document
+
+        return self.parse(self.request('GET', f'{self.uri}/{str(id_)}'), trusted=trust_responses)
 
     def get_document_pdf(self, id_: int, **payload) -> DocumentPDF:
         """
@@ -68,21 +227,57 @@ class FinologDocumentService(FinologAPIService):
         no_sign: bool : Don't show print and signature in generated pdf
         """
 
-        payload_copy = payload.copy()
-        payload_copy['id'] = id_
+        payload = self._prepare_get_document_pdf(id_, payload)
 
-        self.validate_payload(
-            payload=payload_copy,
-            types={
-                'id': int,
-                'no_sign': bool
-            }
-        )
+        return DocumentPDF(**self.request('GET', f'{self.uri}/{str(id_)}/pdf/invoice', payload))
+
+    def download_document_pdf(self, id_: int, dest: Union[str, os.PathLike, BinaryIO], **payload) -> DocumentPDF:
+        """
+        Downloads the PDF of a document in chunks and returns its DocumentPDF.
 
-        if 'no_sign' in payload:
-            payload['no_sign'] = 'true' if payload['no_sign'] is True else 'false'
+        dest is a file path or a binary file object. A path is written through dest + '.part' and
+        renamed once complete; a part left by an interrupted run is resumed with a Range request.
+        Raises DownloadError if the received size differs from DocumentPDF.size.
 
-        return DocumentPDF(**self.request('GET', f'{self.uri}/{str(id_)}/pdf/invoice', payload))
+        Payload: see get_document_pdf
+        """
+
+        pdf = self.get_document_pdf(id_, **payload)
+        download = partial(self.transport.download, pdf.url, size=pdf.size, authenticate=self._is_api_url(pdf.url))
+
+        if not isinstance(dest, (str, os.PathLike)):
+            self._finish_download(pdf, download(dest))
+            return pdf
+
+        with self._open_part(dest, pdf.size) as file:
+            received = download(file, offset=file.tell())
+
+        self._finish_download(pdf, received, dest)
+        return pdf
+
+    def download_document_pdfs(
+            self,
+            ids: Iterable[int],
+            directory: Union[str, os.PathLike],
+            **payload
+    ) -> Dict[int, Union[DocumentPDF, Exception]]:
+        """
+        Downloads the PDFs of many documents into directory as <id>.pdf, concurrently on the transport
+        worker pool. Returns DocumentPDF by id, or the exception raised for a document that failed.
+
+        Payload: see get_document_pdf
+        """
+
+        os.makedirs(directory, exist_ok=True)
+
+        futures = {
+            id_: self.transport.submit(
+                partial(self.download_document_pdf, id_, os.path.join(directory, f'{id_}.pdf'), **payload)
+            )
+            for id_ in dict.fromkeys(ids)
+        }
+
+        return {id_: future.exception() or future.result() for id_, future in futures.items()}
 
     def create_document(self, **payload) -> Document:
         """
@@ -122,47 +317,55 @@ class FinologDocumentService(FinologAPIService):
         ]
         """
 
-        if 'items' not in payload:
-            raise ValueError('items not specified')
-
-        self.validate_payload(
-            payload=payload,
-            types={
-                'kind': str,
-                'vat_type': str,
-                'type': str,
-                'date': str,
-                'template': str,
-                'from_contractor_id': int,
-                'from_requisite_id': int,
-                'to_contractor_id': int,
-                'to_requisite_id': int,
-                'to_contractor_draft': str,
-                'number': str,
-                'status': str,
-                'comment': str,
-                'description': str,
-                'model_type': str,
-                'model_id': int,
-                'items': list
-            }
-        )
-
-        self.validate_payload(
-            payload=payload['items'],
-            types={
-                'id': int,
-                'item_id': int,
-                'count': int,
-                'vat': int,
-                'price': int,
-                'price_currency_id': int,
-                'amortization': int,
-                'item_name': str
-            }
-        )
+        self._validate_create_document(payload)
+
+        return self.parse(self.request('POST', self.uri, payload=payload))
 
-        return Document(**self.request('POST', self.uri, payload=payload))
+    def create_documents(
+            self,
+            payloads: Iterable[Dict[str, Any]],
+            concurrency: Optional[int] = None,
+            idempotency_keys: Optional[Sequence[Optional[str]]] = None,
+            idempotency_store: Optional[IdempotencyStore] = None
+    ) -> List[Union[Document, Exception]]:
+        """
+        Creates many documents concurrently on the transport worker pool. Returns, in the order of
+        payloads, the created Document or the exception raised for it; failures do not stop the batch.
+
+        All payloads are validated before the first request is sent, and invalid ones are not sent.
+
+        payloads: Iterable[dict] : Payloads of create_document
+        concurrency: int : Maximum number of requests in flight, pool_maxsize of the transport by default
+        idempotency_keys: Sequence[str] : A unique key per payload, or None for payloads without one.
+        A payload whose key is in the store is not sent again and its stored document is returned
+        idempotency_store: IdempotencyStore : Store of created documents by key; idempotency_store of the
+        service by default, which keeps the last 10000 keys in memory. Use SQLiteIdempotencyStore to retry
+        a batch after a restart
+        """
+
+        results, pending, store = self._prepare_batch(payloads, idempotency_keys, idempotency_store)
+        limit = concurrency or self.transport.pool_maxsize
+        in_flight = dict()
+
+        def collect(futures) -> None:
+            for future in futures:
+                results[in_flight.pop(future)] = future.exception() or future.result()
+
+        for index, payload, key in pending:
+            if len(in_flight) >= limit:
+                collect(wait(in_flight, return_when=FIRST_COMPLETED).done)
+            in_flight[self.transport.submit(self._create_document, payload, key, store)] = index
+
+        collect(list(in_flight))
+
+        return results
+
+    def _create_document(self, payload: Dict[str, Any], key: Optional[str], store: Optional[IdempotencyStore]) -> Document:
+        response = self.request('POST', self.uri, payload=payload)
+        if key is not None:
+            store.set(key, response)
+
+        return self.parse(response)
 
     def update_document(self, id_: int, **payload) -> Document:
         """
@@ -187,40 +390,181 @@ class FinologDocumentService(FinologAPIService):
         model_id: int : ID of the model to which the document will be linked
         """
 
-        payload_copy = payload.copy()
-        payload_copy['id'] = id_
-
-        self.validate_payload(
-            payload=payload_copy,
-            types={
-                'type': str,
-                'kind': str,
-                'date': str,
-                'template': str,
-                'from_contractor_id': int,
-                'from_requisite_id': int,
-                'to_contractor_id': int,
-                'to_requisite_id': int,
-                'to_contractor_draft': str,
-                'number': str,
-                'status': str,
-                'comment': str,
-                'description': str,
-                'model_type': str,
-                'model_id': int
-            }
-        )
+        self._validate_update_document(id_, payload)
 
         response = self.request('PUT', f'{self.uri}/{str(id_)}', payload)
 
-        return Document(**response)
+        return self.parse(response)
+
+    def update_from_model(self, document: Document) -> Document:
+        """
+        Sends only the changed fields of a Document (see TrackedModel) with update_document and returns
+        the updated Document. Returns document itself, without a request, if nothing changed.
+        Raises TypeError for views returned with trust_responses.
+        """
+
+        changes = self.model_changes(document)
+        if not changes:
+            return document
+
+        updated = self.update_document(document.id, **changes)
+        document.clear_changes()
+
+        return updated
 
     def delete_document(self, id_: int) -> Document:
-        self.validate_payload(
-            payload={'id': id_},
-            types={
-                'id': int
-            }
-        )
+        self.validate_id(id_)
+
+        response = self.request('DELETE', f'{self.uri}/{str(id_)}')
+        self.forget(id_)
+
+        return self.parse(response, remember=False)
+
+
+class AsyncFinologDocumentService(AsyncFinologAPIService, BaseDocumentService):
+    """
+    Awaitable counterpart of FinologDocumentService; see it for payload documentation.
+    """
+
+    async def get_documents(
+            self,
+            trust_responses: Optional[bool] = None,
+            fields: Optional[Sequence[str]] = None,
+            **payload
+    ) -> List[Document]:
+        self._validate_get_documents(payload)
+        parse = self.parser(fields, trust_responses)
+
+        return [parse(obj) for obj in await self.request('GET', self.uri, payload)]
+
+    def iter_documents(
+            self,
+            prefetch: int = 0,
+            deadline: Optional[Deadline] = None,
+            trust_responses: Optional[bool] = None,
+            fields: Optional[Sequence[str]] = None,
+            stream: bool = False,
+            **payload
+    ) -> AsyncIterator[Document]:
+        self._validate_get_documents(payload)
+        parse = self.parser(fields, trust_responses)
+
+        return (parse(obj) async for obj in self.paginate(self.uri, payload, prefetch, deadline, stream))
+
+    async def export_documents(
+            self,
+            document_columns: Sequence[ColumnSpec] = DOCUMENT_COLUMNS,
+            item_columns: Optional[Sequence[ColumnSpec]] = DOCUMENT_ITEM_COLUMNS,
+            prefetch: int = 0,
+            deadline: Optional[Deadline] = None,
+            stream: bool = False,
+            **payload
+    ) -> DocumentExport:
+        self._validate_get_documents(payload)
+
+        export = DocumentExport(document_columns, item_columns)
+        async for obj in self.paginate(self.uri, payload, prefetch, deadline, stream):
+            export.append(obj)
+
+        return export
+
+    async def get_document(self, id_: int, trust_responses: Optional[bool] = None) -> Document:
+        self.validate_id(id_)
+
+        document = self.remembered(id_, trust_responses)
+        if document is not None:
+            return document
+
+        return self.parse(await self.request('GET', f'{self.uri}/{str(id_)}'), trusted=trust_responses)
+
+    async def get_document_pdf(self, id_: int, **payload) -> DocumentPDF:
+        payload = self._prepare_get_document_pdf(id_, payload)
+
+        return DocumentPDF(**await self.request('GET', f'{self.uri}/{str(id_)}/pdf/invoice', payload))
+
+    async def download_document_pdf(self, id_: int, dest: Union[str, os.PathLike, BinaryIO], **payload) -> DocumentPDF:
+        pdf = await self.get_document_pdf(id_, **payload)
+        download = partial(self.transport.download, pdf.url, size=pdf.size, authenticate=self._is_api_url(pdf.url))
+
+        if not isinstance(dest, (str, os.PathLike)):
+            self._finish_download(pdf, await download(dest))
+            return pdf
+
+        with self._open_part(dest, pdf.size) as file:
+            received = await download(file, offset=file.tell())
+
+        self._finish_download(pdf, received, dest)
+        return pdf
+
+    async def download_document_pdfs(
+            self,
+            ids: Iterable[int],
+            directory: Union[str, os.PathLike],
+            **payload
+    ) -> Dict[int, Union[DocumentPDF, Exception]]:
+        """
+        Downloads concurrently, with at most pool_maxsize of the transport in flight.
+        """
+
+        os.makedirs(directory, exist_ok=True)
+        ids = list(dict.fromkeys(ids))
+        slots = asyncio.Semaphore(self.transport.pool_maxsize)
+
+        async def download(id_: int) -> DocumentPDF:
+            async with slots:
+                return await self.download_document_pdf(id_, os.path.join(directory, f'{id_}.pdf'), **payload)
+
+        results = await asyncio.gather(*(download(id_) for id_ in ids), return_exceptions=True)
+        return dict(zip(ids, results))
+
+    async def create_document(self, **payload) -> Document:
+        self._validate_create_document(payload)
+
+        return self.parse(await self.request('POST', self.uri, payload=payload))
+
+    async def create_documents(
+            self,
+            payloads: Iterable[Dict[str, Any]],
+            concurrency: Optional[int] = None,
+            idempotency_keys: Optional[Sequence[Optional[str]]] = None,
+            idempotency_store: Optional[IdempotencyStore] = None
+    ) -> List[Union[Document, Exception]]:
+        results, pending, store = self._prepare_batch(payloads, idempotency_keys, idempotency_store)
+        slots = asyncio.Semaphore(concurrency or self.transport.pool_maxsize)
+
+        async def create(payload: Dict[str, Any], key: Optional[str]) -> Document:
+            async with slots:
+                response = await self.request('POST', self.uri, payload=payload)
+
+            if key is not None:
+                store.set(key, response)
+            return self.parse(response)
+
+        created = await asyncio.gather(*(create(payload, key) for _, payload, key in pending), return_exceptions=True)
+        for (index, _, _), result in zip(pending, created):
+            results[index] = result
+
+        return results
+
+    async def update_document(self, id_: int, **payload) -> Document:
+        self._validate_update_document(id_, payload)
+
+        return self.parse(await self.request('PUT', f'{self.uri}/{str(id_)}', payload))
+
+    async def update_from_model(self, document: Document) -> Document:
+        changes = self.model_changes(document)
+        if not changes:
+            return document
+
+        updated = await self.update_document(document.id, **changes)
+        document.clear_changes()
+
+        return updated
+
+    async def delete_document(self, id_: int) -> Document:
+        self.validate_id(id_)
+
+        response = await self.request('DELETE', f'{self.uri}/{str(id_)}')
+        self.forget(id_)
 
-        return Document(**self.request('DELETE', f'{self.uri}/{str(id_)}'))
+        return self.parse(response, remember=False)
@@ -1,13 +1,32 @@
-from typing import List
+import asyncio
+from typing import List, Optional, Dict, Any, Iterator, AsyncIterator, Iterable
 
-from finolog.services.api_service import FinologAPIService
+from finolog.services.api_service import FinologAPIService, AsyncFinologAPIService
+from finolog.deadline import Deadline, deadline_scope
+from finolog.identity_map import IdentityMap
+from finolog.transport import FinologTransport
 from finolog.types.requisite_types import Requisite
-from finolog.utils import validate_string_length
+from finolog.utils import BulkResult, chunk_ids
 
 
-class FinologRequisiteService(FinologAPIService):
-    def __init__(self, api_token: str, biz_id: int) -> None:
-        super().__init__(api_token)
+class BaseRequisiteService(FinologAPIService):
+    """
+    Payload validation shared by the sync and async requisite services.
+    """
+
+    entity = 'requisite'
+    model = Requisite
+
+    def __init__(
+            self,
+            api_token: str,
+            biz_id: int,
+            transport: Optional[FinologTransport] = None,
+            identity_map: Optional[IdentityMap] = None,
+            validate_payloads: bool = True,
+            trust_responses: bool = False
+    ) -> None:
+        super().__init__(api_token, transport, identity_map, validate_payloads, trust_responses)
 
         if not isinstance(biz_id, int):
             raise TypeError('biz_id must be a number')
@@ -15,6 +34,31 @@ class FinologRequisiteService(FinologAPIService):
         self.biz_id = biz_id
         self.uri = f'biz/{self.biz_id}/requisite'
 
+    def _prepare_get_requisites(self, payload: Dict[str, Any]) -> Dict[str, Any]:
+        return self.prepare('requisite.list', payload)
+
+    def _prepare_get_requisites_by_ids(self, chunks: List[List[int]], payload: Dict[str, Any]) -> List[Dict[str, Any]]:
+        return [self._prepare_get_requisites({**payload, 'ids': ','.join(map(str, chunk))}) for chunk in chunks]
+
+    def _validate_update_or_create_payload(self, payload):
+        self.prepare('requisite.write', payload)
+
+    def _written(self, response: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Drops the identity map copies that embed a written requisite, including its contractor,
+        whose list of requisites changed, and returns the response.
+        """
+
+        if self.identity_map is not None and isinstance(response, dict):
+            if isinstance(response.get('id'), int):
+                self.identity_map.evict_embedders(self.entity, response['id'])
+            if isinstance(response.get('contractor_id'), int):
+                self.identity_map.evict('contractor', response['contractor_id'])
+
+        return response
+
+
+class FinologRequisiteService(BaseRequisiteService):
     def get_requisites(self, **payload) -> List[Requisite]:
         """
         Returns a list of Contractor.
@@ -25,30 +69,58 @@ class FinologRequisiteService(FinologAPIService):
         is_bizzed: bool : Filter by counterparties that are business counterparties
         """
 
-        self.validate_payload(
-            payload=payload,
-            types={
-                'contractor_id': int,
-                'ids': str,
-                'is_bizzed': bool
-            }
-        )
-
-        if 'is_bizzed' in payload:
-            payload['is_bizzed'] = 'true' if payload['is_bizzed'] is True else 'false'
+        payload = self._prepare_get_requisites(payload)
 
         response = self.request('GET', self.uri, payload)
-        return [Requisite(**obj) for obj in response]
+        return [self.parse(obj) for obj in response]
 
-    def get_requisite(self, id_: int) -> Requisite:
-        self.validate_payload(
-            payload={'id': id_},
-            types={
-                'id': int
-            }
+    def iter_requisites(self, deadline: Optional[Deadline] = None, **payload) -> Iterator[Requisite]:
+        """
+        Iterates over requisites matching the filters, building models one at a time.
+        The requisite listing is not paginated, so it is fetched with a single request,
+        sent when the iteration starts.
+
+        deadline: Deadline : Time budget of the request
+        """
+
+        payload = self._prepare_get_requisites(payload)
+
+        with deadline_scope(deadline):
+            response = self.request('GET', self.uri, payload)
+
+        for obj in response:
+            yield self.parse(obj)
+
+    def get_requisites_by_ids(self, ids: Iterable[int], **payload) -> BulkResult:
+        """
+        Returns a BulkResult of Requisite keyed by id; ids that were not found are listed in `missing`.
+
+        Ids are split into chunks for the `ids` filter, and the chunks are fetched concurrently.
+
+        Payload:
+        contractor_id: int : Contractor ID
+        is_bizzed: bool : Filter by counterparties that are business counterparties
+        """
+
+        chunks = chunk_ids(ids)
+        payloads = self._prepare_get_requisites_by_ids(chunks, payload)
+
+        futures = [self.transport.submit(self.request, 'GET', self.uri, chunk_payload) for chunk_payload in payloads]
+        responses = (future.result() for future in futures)
+
+        return BulkResult.from_objects(
+            (id_ for chunk in chunks for id_ in chunk),
+            (self.parse(obj) for response in responses for obj in response)
         )
 
-        return Requisite(**self.request('GET', f'{self.uri}/{str(id_)}'))
+    def get_requisite(self, id_: int) -> Requisite:
+        self.validate_id(id_)
+
+        requisite = self.remembered(id_)
+        if requisite is not None:
+            return requisite
+
+        return self.parse(self.request('GET', f'{self.uri}/{str(id_)}'))
 
     def create_requisite(self, contractor_id: int, name: str, **payload) -> Requisite:
         """
@@ -80,7 +152,7 @@ class FinologRequisiteService(FinologAPIService):
 
         self._validate_update_or_create_payload(payload)
 
-        return Requisite(**self.request('POST', self.uri, payload=payload))
+        return self.parse(self._written(self.request('POST', self.uri, payload=payload)))
 
     def update_requisite(self, id_: int, **payload) -> Requisite:
         """
@@ -108,47 +180,99 @@ class FinologRequisiteService(FinologAPIService):
 
         self._validate_update_or_create_payload(payload)
 
-        return Requisite(**self.request('PUT', f'{self.uri}/{str(id_)}', payload))
+        return self.parse(self._written(self.request('PUT', f'{self.uri}/{str(id_)}', payload)))
 
-    def _validate_update_or_create_payload(self, payload):
-        self.validate_payload(
-            payload=payload,
-            types={
-                'contractor_id': int,
-                'name': str,
-                'description': str,
-                'full_name': str,
-                'inn': str,
-                'kpp': str,
-                'bank_account': str,
-                'bank_bic': str,
-                'address_postal_index': str,
-                'address_city': str,
-                'address_street': str,
-                'country_id': int,
-                'phone': str,
-                'email': str,
-                'web': str,
-                'bank_iban': str,
-                'bank_mfo': str
-            }
-        )
+    def update_from_model(self, requisite: Requisite) -> Requisite:
+        """
+        Sends only the changed fields of a Requisite (see TrackedModel) with update_requisite and returns
+        the updated Requisite. Returns requisite itself, without a request, if nothing changed.
+        Raises TypeError for views returned with trust_responses.
+        """
+
+        changes = self.model_changes(requisite)
+        if not changes:
+            return requisite
 
-        if 'inn' in payload:
-            validate_string_length('inn', payload['inn'], min_l=10, max_l=12)
-        if 'kpp' in payload:
-            validate_string_length('kpp', payload['kpp'], min_l=9, max_l=9)
-        if 'bank_account' in payload:
-            validate_string_length('bank_account', payload['bank_account'], min_l=20, max_l=28)
-        if 'bank_bic' in payload:
-            validate_string_length('bank_bic', payload['bank_bic'], min_l=9, max_l=9)
+        updated = self.update_requisite(requisite.id, **changes)
+        requisite.clear_changes()
+
+        return updated
 
     def delete_requisite(self, id_: int) -> Requisite:
-        self.validate_payload(
-            payload={'id': id_},
-            types={
-                'id': int
-            }
+        self.validate_id(id_)
+
+        response = self._written(self.request('DELETE', f'{self.uri}/{str(id_)}'))
+        self.forget(id_)
+
+        return self.parse(response, remember=False)
+
+
+class AsyncFinologRequisiteService(AsyncFinologAPIService, BaseRequisiteService):
+    """
+    Awaitable counterpart of FinologRequisiteService; see it for payload documentation.
+    """
+
+    async def get_requisites(self, **payload) -> List[Requisite]:
+        payload = self._prepare_get_requisites(payload)
+
+        return [self.parse(obj) for obj in await self.request('GET', self.uri, payload)]
+
+    async def iter_requisites(self, deadline: Optional[Deadline] = None, **payload) -> AsyncIterator[Requisite]:
+        payload = self._prepare_get_requisites(payload)
+
+        with deadline_scope(deadline):
+            response = await self.request('GET', self.uri, payload)
+
+        for obj in response:
+            yield self.parse(obj)
+
+    async def get_requisites_by_ids(self, ids: Iterable[int], **payload) -> BulkResult:
+        chunks = chunk_ids(ids)
+        payloads = self._prepare_get_requisites_by_ids(chunks, payload)
+
+        responses = await asyncio.gather(*(self.request('GET', self.uri, chunk_payload) for chunk_payload in payloads))
+
+        return BulkResult.from_objects(
+            (id_ for chunk in chunks for id_ in chunk),
+            (self.parse(obj) for response in responses for obj in response)
         )
 
-        return Requisite(**self.request('DELETE', f'{self.uri}/{str(id_)}'))
+    async def get_requisite(self, id_: int) -> Requisite:
+        self.validate_id(id_)
+
+        requisite = self.remembered(id_)
+        if requisite is not None:
+            return requisite
+
+        return self.parse(await self.request('GET', f'{self.uri}/{str(id_)}'))
+
+    async def create_requisite(self, contractor_id: int, name: str, **payload) -> Requisite:
+        payload['contractor_id'] = contractor_id
+        payload['name'] = name
+
+        self._validate_update_or_create_payload(payload)
+
+        return self.parse(self._written(await self.request('POST', self.uri, payload=payload)))
+
+    async def update_requisite(self, id_: int, **payload) -> Requisite:
+        self._validate_update_or_create_payload(payload)
+
+        return self.parse(self._written(await self.request('PUT', f'{self.uri}/{str(id_)}', payload)))
+
+    async def update_from_model(self, requisite: Requisite) -> Requisite:
+        changes = self.model_changes(requisite)
+        if not changes:
+            return requisite
+
+        updated = await self.update_requisite(requisite.id, **changes)
+        requisite.clear_changes()
+
+        return updated
+
+    async def delete_requisite(self, id_: int) -> Requisite:
+        self.validate_id(id_)
+
+        response = self._written(await self.request('DELETE', f'{self.uri}/{str(id_)}'))
+        self.forget(id_)
+
+        return self.parse(response, remember=False)
@@ -0,0 +1,105 @@
+import re
+from typing import List
+
+_STRUCTURE = re.compile(rb'["\[\]{},]')
+_STRING = re.compile(rb'["\\]')
+
+_QUOTE, _BACKSLASH, _COMMA = ord('"'), ord('\\'), ord(',')
+_OPENING, _CLOSING = frozenset(b'[{'), frozenset(b']}')
+
+
+class JSONArraySplitter:
+    """
+    Splits a JSON array arriving in chunks into the raw bytes of its elements.
+
+    Only string, bracket and comma positions are tracked, so elements can be handed to
+    any decoder as soon as they are complete. The buffer is trimmed after every element,
+    so it holds at most one element and one chunk.
+    """
+
+    def __init__(self) -> None:
+        self.buffer = bytearray()
+        self.depth = 0
+        self.in_string = False
+        self.done = False
+        # Start of the current element and position of the scan in the buffer
+        self.start = 0
+        self.pos = 0
+
+    def feed(self, chunk: bytes) -> List[bytes]:
+        """
+        Adds a chunk of the body and returns the elements completed by it.
+        """
+
+        if self.done:
+            return []
+
+        buffer = self.buffer
+        buffer += chunk
+        elements = []
+        pos = self.pos
+
+        while True:
+            if self.in_string:
+                match = _STRING.search(buffer, pos)
+                if match is None:
+                    pos = len(buffer)
+                    break
+
+                if buffer[match.start()] == _BACKSLASH:
+                    if match.end() == len(buffer):
+                        # The escaped character is in the next chunk
+                        pos = match.start()
+                        break
+                    pos = match.end() + 1
+                    continue
+
+                self.in_string = False
+                pos = match.end()
+                continue
+
+            match = _STRUCTURE.search(buffer, pos)
+            if match is None:
+                pos = len(buffer)
+                break
+
+            char = buffer[match.start()]
+            pos = match.end()
+
+            if char == _QUOTE:
+                self.in_string = True
+            elif char in _OPENING:
+                if self.depth == 0:
+                    if char != ord('['):
+                        raise ValueError('response is not a JSON array')
+                    self.start = pos
+                self.depth += 1
+            elif char in _CLOSING:
+                self.depth -= 1
+                if self.depth == 0:
+                    self._emit(match.start(), elements)
+                    self.done = True
+                    break
+            elif char == _COMMA and self.depth == 1:
+                self._emit(match.start(), elements)
+                self.start = pos
+
+        if self.start:
+            del buffer[:self.start]
+            pos -= self.start
+            self.start = 0
+        self.pos = pos
+
+        return elements
+
+    def _emit(self, end: int, elements: List[bytes]) -> None:
+        element = bytes(self.buffer[self.start:end]).strip()
+        if element:
+            elements.append(element)
+
+    def close(self) -> None:
+        """
+        Checks that the whole array was received.
+        """
+        if not self.done:
+            raise ValueError('incomplete JSON array in response')
@@ -0,0 +1,335 @@
+import json
+import sqlite3
+import threading
+import time
+from datetime import datetime, timezone
+from typing import Any, Dict, Iterable, List, NamedTuple, Optional, Sequence, Set, Tuple
+
+from finolog.columnar import ColumnSpec, column, INT, FLOAT, BOOL, STR, DATETIME, DATE
+from finolog.deadline import Deadline
+
+_SQL_TYPES = {INT: 'INTEGER', FLOAT: 'REAL', BOOL: 'INTEGER', STR: 'TEXT', DATETIME: 'TEXT', DATE: 'TEXT'}
+
+
+class MirrorTable(NamedTuple):
+    """
+    name: str : Table name
+    columns: Sequence[ColumnSpec] : Columns extracted for queries, besides id, updated_at, deleted_at,
+    synced_at and data (the decoded object as JSON)
+    """
+
+    name: str
+    columns: Sequence[ColumnSpec]
+
+
+CONTRACTOR_TABLE = MirrorTable('contractors', (
+    column('name', STR),
+    column('email', STR),
+    column('phone', STR),
+    column('person', STR),
+    column('group_id', INT),
+    column('is_bizzed', BOOL),
+    column('created_at', DATETIME),
+))
+
+REQUISITE_TABLE = MirrorTable('requisites', (
+    column('contractor_id', INT),
+    column('name', STR),
+    column('full_name', STR),
+    column('inn', STR),
+    column('kpp', STR),
+    column('bank_bic', STR),
+    column('bank_account', STR),
+    column('country_id', INT),
+    column('created_at', DATETIME),
+))
+
+DOCUMENT_TABLE = MirrorTable('documents', (
+    column('number', STR),
+    column('kind', STR),
+    column('type', STR),
+    column('status', STR),
+    column('date', DATE),
+    column('from_contractor_id', INT),
+    column('from_requisite_id', INT),
+    column('to_contractor_id', INT),
+    column('to_requisite_id', INT),
+    column('currency_id', INT, 'package.currency_id'),
+    column('total_price', FLOAT, 'package.total_price'),
+    column('total_vat', FLOAT, 'package.total_vat'),
+    column('base_total_price', FLOAT, 'package.base_total_price'),
+    column('created_at', DATETIME),
+))
+
+MIRROR_TABLES = (CONTRACTOR_TABLE, REQUISITE_TABLE, DOCUMENT_TABLE)
+
+
+class SyncStats(NamedTuple):
+    """
+    Result of syncing one table.
+
+    inserted: int : Records seen for the first time
+    updated: int : Records whose updated_at or deleted_at changed, including ones that reappeared
+    unchanged: int : Records skipped because the stored copy is current
+    deleted: int : Records that disappeared from the API and were marked deleted
+    watermark: str : Latest updated_at in the table, for information; syncs do not start from it
+    """
+
+    table: str
+    inserted: int
+    updated: int
+    unchanged: int
+    deleted: int
+    watermark: Optional[str]
+
+
+def _now() -> str:
+    return datetime.now(timezone.utc).strftime('%Y-%m-%d %H:%M:%S')
+
+
+class _TableSync:
+    """
+    Collects the rows of one walk over a listing for a mirror table. Records whose updated_at and
+    deleted_at match the stored copy are skipped; write stores the rest and marks the rows not seen
+    in the walk deleted.
+    """
+
+    def __init__(self, db: sqlite3.Connection, table: MirrorTable) -> None:
+        self.db = db
+        self.table = table
+        self.known: Dict[int, Tuple[Optional[str], Optional[str]]] = {
+            id_: (updated_at, deleted_at)
+            for id_, updated_at, deleted_at in db.execute(f'SELECT id, updated_at, deleted_at FROM {table.name}')
+        }
+        self.seen: Set[int] = set()
+        self.pending: List[tuple] = []
+        self.inserted = self.updated = self.unchanged = 0
+
+        names = ['id', 'updated_at', 'deleted_at', 'synced_at', 'data'] + [spec.name for spec in table.columns]
+        self.insert = (
+            f'INSERT OR REPLACE INTO {table.name} ({", ".join(names)}) VALUES ({", ".join("?" * len(names))})'
+        )
+        self.synced_at = time.time()
+
+    def add(self, obj: Dict[str, Any], data: Optional[Dict[str, Any]] = None) -> None:
+        """
+        Records a decoded object; data is the object to store as JSON, obj itself by default.
+        """
+
+        id_ = obj['id']
+        if id_ in self.seen:
+            return
+        self.seen.add(id_)
+
+        state = (obj.get('updated_at'), obj.get('deleted_at'))
+        current = self.known.get(id_)
+        if current == state:
+            self.unchanged += 1
+            return
+
+        if current is None:
+            self.inserted += 1
+        else:
+            self.updated += 1
+
+        values = [id_, state[0], state[1], self.synced_at, json.dumps(obj if data is None else data)]
+        for spec in self.table.columns:
+            value = obj
+            for key in spec.path:
+                value = value.get(key) if isinstance(value, dict) else None
+            values.append(int(value) if spec.kind == BOOL and value is not None else value)
+
+        self.pending.append(tuple(values))
+
+    def write(self) -> SyncStats:
+        """
+        Writes the collected rows. Call inside a transaction.
+        """
+
+        self.db.executemany(self.insert, self.pending)
+        self.pending.clear()
+
+        gone = [
+            (_now(), self.synced_at, id_) for id_, (_, deleted_at) in self.known.items()
+            if deleted_at is None and id_ not in self.seen
+        ]
+        self.db.executemany(f'UPDATE {self.table.name} SET deleted_at = ?, synced_at = ? WHERE id = ?', gone)
+
+        watermark = self.db.execute(f'SELECT max(updated_at) FROM {self.table.name}').fetchone()[0]
+        self.db.execute(
+            'INSERT OR REPLACE INTO sync_state (name, watermark, synced_at) VALUES (?, ?, ?)',
+            (self.table.name, watermark, self.synced_at)
+        )
+
+        return SyncStats(self.table.name, self.inserted, self.updated, self.unchanged, len(gone), watermark)
+
+
+class SQLiteMirror:
+    """
+    Local SQLite replica of the contractors, requisites and documents of one business, for
+    reporting queries that would otherwise scan the API.
+
+    Every sync walks the full listings: the list endpoints cannot filter by updated_at, so the
+    watermark recorded per table is for information only. Records are compared with the stored
+    copies by updated_at and deleted_at, and only changed ones are written; the first sync is a
+    bulk load. Records that no longer appear in the listings are kept as tombstones: their
+    deleted_at is set to the time of the sync.
+
+    The listings are fetched first and the changed rows, held in memory meanwhile, are then
+    written in one short transaction per table group, so the database is not locked during the
+    walk, readers see a table either before or after a sync, and a failed walk changes nothing.
+
+    Requisites are read from the contractor listing with_='requisites'. Besides the extracted
+    columns, every row keeps the decoded object in data, for use with SQLite JSON functions.
+    Queries use their own connection, so they are not blocked by a running sync.
+
+    path: str : Path of the database file
+    """
+
+    def __init__(self, path: str) -> None:
+        self._lock = threading.Lock()
+        self._read_lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._db.execute('PRAGMA journal_mode=WAL')
+        self._db.execute(
+            'CREATE TABLE IF NOT EXISTS sync_state '
+            '(name TEXT PRIMARY KEY, watermark TEXT, synced_at REAL NOT NULL)'
+        )
+        self._db.execute('CREATE TABLE IF NOT EXISTS sync_biz (biz_id INTEGER NOT NULL)')
+
+        for table in MIRROR_TABLES:
+            columns = ''.join(f', {spec.name} {_SQL_TYPES[spec.kind]}' for spec in table.columns)
+            self._db.execute(
+                f'CREATE TABLE IF NOT EXISTS {table.name} (id INTEGER PRIMARY KEY, updated_at TEXT, '
+                f'deleted_at TEXT, synced_at REAL NOT NULL, data TEXT NOT NULL{columns})'
+            )
+            self._db.execute(f'CREATE INDEX IF NOT EXISTS {table.name}_updated_at ON {table.name} (updated_at)')
+
+        self._db.execute('CREATE INDEX IF NOT EXISTS requisites_inn ON requisites (inn)')
+        self._db.execute('CREATE INDEX IF NOT EXISTS requisites_contractor_id ON requisites (contractor_id)')
+        self._db.execute('CREATE INDEX IF NOT EXISTS documents_date ON documents (date)')
+
+        self._reader = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+
+    def _check_biz(self, biz_id: int) -> None:
+        row = self._db.execute('SELECT biz_id FROM sync_biz').fetchone()
+        if row is None:
+            self._db.execute('INSERT INTO sync_biz (biz_id) VALUES (?)', (biz_id,))
+        elif row[0] != biz_id:
+            raise ValueError(f'the mirror holds biz {row[0]}, not {biz_id}')
+
+    def _begin(self, tables: Sequence[MirrorTable]) -> List[_TableSync]:
+        return [_TableSync(self._db, table) for table in tables]
+
+    def _commit(self, syncs: Sequence[_TableSync]) -> List[SyncStats]:
+        self._db.execute('BEGIN IMMEDIATE')
+        try:
+            stats = [sync.write() for sync in syncs]
+        except BaseException:
+            self._db.execute('ROLLBACK')
+            raise
+        self._db.execute('COMMIT')
+        return stats
+
+    @staticmethod
+    def _add_contractor(contractors: _TableSync, requisites: _TableSync, obj: Dict[str, Any]) -> None:
+        contractors.add(obj, {key: value for key, value in obj.items() if key != 'requisites'})
+        for requisite in obj.get('requisites') or ():
+            requisites.add(requisite)
+
+    def sync(
+            self,
+            client,
+            prefetch: int = 0,
+            deadline: Optional[Deadline] = None,
+            stream: bool = False
+    ) -> Dict[str, SyncStats]:
+        """
+        Brings the mirror in step with the API. Returns SyncStats by table name.
+
+        client: FinologClient : Client of the business to mirror
+        prefetch: int : See FinologContractorService.iter_contractors
+        deadline: Deadline : Time budget of the whole sync
+        stream: bool : See FinologContractorService.iter_contractors
+        """
+
+        contractor, document = client.contractor, client.document
+        result = dict()
+
+        with self._lock:
+            self._check_biz(contractor.biz_id)
+
+            syncs = self._begin((CONTRACTOR_TABLE, REQUISITE_TABLE))
+            payload = contractor.prepare('contractor.list', {'with_': 'requisites'})
+            for obj in contractor.paginate(contractor.uri, payload, prefetch, deadline, stream):
+                self._add_contractor(*syncs, obj)
+            result.update((stats.table, stats) for stats in self._commit(syncs))
+
+            syncs = self._begin((DOCUMENT_TABLE,))
+            payload = document.prepare('document.list', {})
+            for obj in document.paginate(document.uri, payload, prefetch, deadline, stream):
+                syncs[0].add(obj)
+            result.update((stats.table, stats) for stats in self._commit(syncs))
+
+        return result
+
+    async def async_sync(
+            self,
+            client,
+            prefetch: int = 0,
+            deadline: Optional[Deadline] = None,
+            stream: bool = False
+    ) -> Dict[str, SyncStats]:
+        """
+        sync for an AsyncFinologClient. Database writes run on the event loop thread.
+        Raises RuntimeError if another sync of the mirror is running.
+        """
+
+        contractor, document = client.contractor, client.document
+        result = dict()
+
+        # Waiting for the lock would block the event loop
+        if not self._lock.acquire(blocking=False):
+            raise RuntimeError('the mirror is already being synced')
+
+        try:
+            self._check_biz(contractor.biz_id)
+
+            syncs = self._begin((CONTRACTOR_TABLE, REQUISITE_TABLE))
+            payload = contractor.prepare('contractor.list', {'with_': 'requisites'})
+            async for obj in contractor.paginate(contractor.uri, payload, prefetch, deadline, stream):
+                self._add_contractor(*syncs, obj)
+            result.update((stats.table, stats) for stats in self._commit(syncs))
+
+            syncs = self._begin((DOCUMENT_TABLE,))
+            payload = document.prepare('document.list', {})
+            async for obj in document.paginate(document.uri, payload, prefetch, deadline, stream):
+                syncs[0].add(obj)
+            result.update((stats.table, stats) for stats in self._commit(syncs))
+        finally:
+            self._lock.release()
+
+        return result
+
+    def watermark(self, table: str) -> Optional[str]:
+        """
+        Returns the latest updated_at of a table as of the last sync; informational, see SQLiteMirror.
+        """
+
+        with self._read_lock:
+            row = self._reader.execute('SELECT watermark FROM sync_state WHERE name = ?', (table,)).fetchone()
+
+        return None if row is None else row[0]
+
+    def query(self, sql: str, parameters: Iterable[Any] = ()) -> List[tuple]:
+        """
+        Runs a read query against the mirror, e.g.
+        SELECT currency_id, sum(total_price) FROM documents WHERE deleted_at IS NULL GROUP BY currency_id
+        """
+
+        with self._read_lock:
+            return self._reader.execute(sql, tuple(parameters)).fetchall()
+
+    def close(self) -> None:
+        self._reader.close()
+        self._db.close()
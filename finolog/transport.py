@@ -0,0 +1,821 @@
+import asyncio
+import contextvars
+import json
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, Future, Executor, wait, FIRST_COMPLETED
+from functools import partial
+from typing import Optional, Union, Tuple, Dict, Hashable, Callable, Any, Iterator, AsyncIterator, BinaryIO, TYPE_CHECKING
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from finolog.deadline import Deadline, current_deadline
+from finolog.decoders import Decoder, default_decoder
+from finolog.exceptions import APIError, RateLimitError, DeadlineExceeded, DownloadError
+from finolog.ratelimit import RateLimiter, AsyncRateLimiter, parse_retry_after
+from finolog.retry import RetryPolicy, HedgePolicy
+from finolog.streaming import JSONArraySplitter
+
+if TYPE_CHECKING:
+    from finolog.cache import ResponseCache
+
+Timeout = Union[float, Tuple[float, float]]
+
+
+def request_key(method: str, url: str, payload) -> Tuple[str, str, str]:
+    return method, url, json.dumps(payload, sort_keys=True, default=str)
+
+
+def api_error(status_code: int, content: bytes, retry_after: Optional[str] = None) -> APIError:
+    try:
+        body = json.loads(content)
+    except ValueError:
+        body = content.decode(errors='replace')
+
+    error_class = RateLimitError if status_code == 429 else APIError
+    return error_class(status_code, body, parse_retry_after(retry_after))
+
+
+def _rewind(file: BinaryIO, received: int) -> int:
+    """
+    Discards the received bytes of the body, which precede the position of file, for a download
+    that has to start over. Only then does file need to be seekable.
+    """
+
+    if not file.seekable():
+        raise DownloadError('the server ignored the Range request and the file cannot be rewound')
+
+    file.seek(file.tell() - received)
+    file.truncate()
+    return 0
+
+
+def submit(executor: Executor, fn: Callable, *args) -> Future:
+    """
+    Submits fn to executor in a copy of the current context, so an active Deadline applies in the worker.
+    """
+    return executor.submit(contextvars.copy_context().run, fn, *args)
+
+
+class SingleFlight:
+    """
+    Runs a call once per key at a time: concurrent callers with the same key
+    wait for the first caller and share its result or exception.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._calls: Dict[Hashable, Future] = dict()
+
+    def do(self, key: Hashable, fn: Callable[[], Any], deadline: Optional[Deadline] = None) -> Any:
+        """
+        deadline: Deadline : Budget of this caller; a waiting caller gives up with DeadlineExceeded
+        when it runs out, even if the first caller has a longer one
+        """
+
+        with self._lock:
+            future = self._calls.get(key)
+            leader = future is None
+            if leader:
+                future = self._calls[key] = Future()
+
+        if not leader:
+            if deadline is not None and not wait((future,), deadline.remaining()).done:
+                raise DeadlineExceeded(f'deadline of {deadline.seconds}s exceeded')
+            return future.result()
+
+        try:
+            future.set_result(fn())
+        except BaseException as e:
+            future.set_exception(e)
+        finally:
+            with self._lock:
+                del self._calls[key]
+
+        return future.result()
+
+
+class AsyncSingleFlight:
+    """
+    Asyncio counterpart of SingleFlight.
+    """
+
+    def __init__(self) -> None:
+        self._calls: Dict[Hashable, asyncio.Future] = dict()
+
+    async def do(self, key: Hashable, fn: Callable[[], Any], deadline: Optional[Deadline] = None) -> Any:
+        future = self._calls.get(key)
+        if future is None:
+            future = self._calls[key] = asyncio.ensure_future(fn())
+            future.add_done_callback(lambda _: self._calls.pop(key, None))
+        elif deadline is not None:
+            done, _ = await asyncio.wait((future,), timeout=deadline.remaining())
+            if not done:
+                raise DeadlineExceeded(f'deadline of {deadline.seconds}s exceeded')
+
+        return await asyncio.shield(future)
+
+
+class FinologTransport:
+    """
+    HTTP transport shared by all services of a client.
+
+    Holds a single requests.Session, so every service reuses the same
+    connection pool and TLS sessions to api.finolog.ru.
+
+    pool_connections: int : Number of per-host pools to cache; at least 2 keeps the API pool alongside file hosts
+    pool_maxsize: int : Maximum number of connections kept per host
+    pool_block: bool : Block when no free connection is available instead of opening a throwaway one
+    keep_alive: bool : Reuse connections between requests
+    timeout: float | tuple : Default (connect, read) timeout in seconds
+    coalesce_reads: bool : Let concurrent identical GET requests share one HTTP call and its decoded result
+    cache: ResponseCache : Cache of GET responses, invalidated by writes sent through this transport
+    rate_limiter: RateLimiter : Throttling of all requests sent through this transport
+    retry_policy: RetryPolicy : Retries of failed requests; with a rate_limiter, 429 responses are
+    sent again by the limiter only (see RateLimiter.max_throttle_retries)
+    hedge_policy: HedgePolicy : Duplicate slow GET requests and take the first response
+    decoder: Callable[[bytes], Any] : Decoder of response bodies, see finolog.decoders;
+    orjson or msgspec when installed, the json module otherwise
+    """
+
+    DEFAULT_TIMEOUT = (5.0, 30.0)
+    NETWORK_ERRORS = (requests.ConnectionError, requests.Timeout)
+    STREAM_CHUNK_SIZE = 64 * 1024
+
+    def __init__(
+            self,
+            api_token: str,
+            *,
+            pool_connections: int = 2,
+            pool_maxsize: int = 10,
+            pool_block: bool = False,
+            keep_alive: bool = True,
+            timeout: Optional[Timeout] = DEFAULT_TIMEOUT,
+            coalesce_reads: bool = False,
+            cache: Optional['ResponseCache'] = None,
+            rate_limiter: Optional[RateLimiter] = None,
+            retry_policy: Optional[RetryPolicy] = None,
+            hedge_policy: Optional[HedgePolicy] = None,
+            decoder: Optional[Decoder] = None
+    ) -> None:
+        if pool_maxsize < 1:
+            raise ValueError('pool_maxsize must be greater than 0')
+
+        self.pool_maxsize = pool_maxsize
+        self.timeout = timeout
+        self.single_flight = SingleFlight() if coalesce_reads else None
+        self.cache = cache
+        self.rate_limiter = rate_limiter
+        self.retry_policy = retry_policy
+        self.hedge_policy = hedge_policy
+        self.decoder = default_decoder() if decoder is None else decoder
+        self._executor = None
+        self._hedge_executor = None
+
+        self.session = requests.Session()
+        self.session.headers.update({
+            'Api-Token': api_token
+        })
+
+        if not keep_alive:
+            self.session.headers['Connection'] = 'close'
+
+        adapter = HTTPAdapter(
+            pool_connections=pool_connections,
+            pool_maxsize=pool_maxsize,
+            pool_block=pool_block
+        )
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
+
+    def request(self, method: str, url: str, payload=None, *, timeout: Optional[Timeout] = None):
+        """
+        Sends a request and returns the decoded response.
+
+        timeout: float | tuple : Timeout of this call; capped by the active Deadline, if any
+        """
+
+        if payload is None:
+            payload = {}
+
+        deadline = current_deadline()
+        if deadline is None:
+            return self._request(method, url, payload, timeout)
+
+        deadline.check()
+        try:
+            return self._request(method, url, payload, timeout)
+        except self.NETWORK_ERRORS as e:
+            if deadline.expired:
+                raise DeadlineExceeded(f'deadline of {deadline.seconds}s exceeded') from e
+            raise
+
+    def stream(self, method: str, url: str, payload=None, *, timeout: Optional[Timeout] = None) -> Iterator[Any]:
+        """
+        Sends a request answered with a JSON array and returns an iterator decoding its elements
+        while the body is received, so only one element is held in memory at a time.
+
+        The request is sent, and retried, before this method returns; the active Deadline covers
+        that part. Streamed requests bypass the cache and read coalescing.
+        """
+
+        if payload is None:
+            payload = {}
+
+        deadline = current_deadline()
+        if deadline is None:
+            return self._elements(self._send(method, url, payload, timeout, stream=True))
+
+        deadline.check()
+        try:
+            return self._elements(self._send(method, url, payload, timeout, stream=True))
+        except self.NETWORK_ERRORS as e:
+            if deadline.expired:
+                raise DeadlineExceeded(f'deadline of {deadline.seconds}s exceeded') from e
+            raise
+
+    def _elements(self, response: requests.Response) -> Iterator[Any]:
+        splitter = JSONArraySplitter()
+        try:
+            for chunk in response.iter_content(self.STREAM_CHUNK_SIZE):
+                for element in splitter.feed(chunk):
+                    yield self.decoder(element)
+            splitter.close()
+        finally:
+            response.close()
+
+    def _request(self, method: str, url: str, payload, timeout: Optional[Timeout]):
+        if self.cache is None:
+            return self._dispatch(method, url, payload, timeout)
+
+        cached = self.cache.get(method, url, payload)
+        if cached is not None:
+            return cached
+
+        generation = self.cache.generation
+        try:
+            response = self._dispatch(method, url, payload, timeout)
+        finally:
+            if method != 'GET':
+                self.cache.invalidate_for_write(url)
+
+        self.cache.set(method, url, payload, response, generation)
+
+        return response
+
+    def _dispatch(self, method: str, url: str, payload, timeout: Optional[Timeout]):
+        if method == 'GET' and self.single_flight is not None:
+            return self.single_flight.do(
+                request_key(method, url, payload),
+                lambda: self._send(method, url, payload, timeout),
+                current_deadline()
+            )
+
+        return self._send(method, url, payload, timeout)
+
+    def _send(self, method: str, url: str, payload, timeout: Optional[Timeout], stream: bool = False):
+        timeout = self.timeout if timeout is None else timeout
+        if stream:
+            send = partial(self._attempt, stream=True)
+        elif method == 'GET' and self.hedge_policy is not None:
+            send = self._hedged
+        else:
+            send = self._attempt
+
+        if self.retry_policy is None:
+            return send(method, url, payload, timeout)
+
+        retries = 0
+        while True:
+            try:
+                return send(method, url, payload, timeout)
+            except (APIError, *self.NETWORK_ERRORS) as e:
+                status = e.status_code if isinstance(e, APIError) else None
+                # A 429 left over by the rate limiter has used up its throttle retries already
+                if status == 429 and self.rate_limiter is not None:
+                    raise
+                if not self.retry_policy.should_retry(method, retries, status):
+                    raise
+
+                delay = self.retry_policy.delay(retries, getattr(e, 'retry_after', None))
+                deadline = current_deadline()
+                if deadline is not None and delay >= deadline.remaining():
+                    raise
+
+                time.sleep(delay)
+                retries += 1
+
+    def _hedged(self, method: str, url: str, payload, timeout: Optional[Timeout]):
+        threshold = self.hedge_policy.threshold(url)
+        started_at = time.monotonic()
+
+        if threshold is None:
+            response = self._attempt(method, url, payload, timeout)
+            self.hedge_policy.record(url, time.monotonic() - started_at)
+            return response
+
+        futures = {submit(self.hedge_executor, self._attempt, method, url, payload, timeout)}
+        pending = set(futures)
+        error = None
+
+        while pending:
+            can_hedge = len(futures) <= self.hedge_policy.max_hedges
+            done, pending = wait(pending, timeout=threshold if can_hedge else None, return_when=FIRST_COMPLETED)
+
+            if not done:
+                hedge = submit(self.hedge_executor, self._attempt, method, url, payload, timeout)
+                futures.add(hedge)
+                pending.add(hedge)
+                continue
+
+            for future in done:
+                if future.exception() is None:
+                    for other in pending:
+                        other.cancel()
+                    self.hedge_policy.record(url, time.monotonic() - started_at)
+                    return future.result()
+                error = future.exception()
+
+        raise error
+
+    def _attempt(self, method: str, url: str, payload, timeout: Optional[Timeout], stream: bool = False):
+        """
+        Sends the request once and returns the decoded response, or the open response if stream is set.
+        """
+
+        deadline = current_deadline()
+        if self.rate_limiter is None:
+            if deadline is not None:
+                timeout = deadline.limit(timeout)
+            return self._result(self.session.request(method, url, json=payload, timeout=timeout, stream=stream), stream)
+
+        throttle_retries = 0
+        while True:
+            # The limiter may pause for a Retry-After, so the budget is checked after it and caps the wait
+            if not self.rate_limiter.acquire(None if deadline is None else deadline.remaining()):
+                raise DeadlineExceeded(f'deadline of {deadline.seconds}s exceeded')
+            try:
+                attempt_timeout = timeout if deadline is None else deadline.limit(timeout)
+                response = self.session.request(method, url, json=payload, timeout=attempt_timeout, stream=stream)
+            except BaseException:
+                self.rate_limiter.release()
+                raise
+
+            retry_after = parse_retry_after(response.headers.get('Retry-After'))
+            self.rate_limiter.release(response.status_code, retry_after)
+
+            if response.status_code != 429 or throttle_retries >= self.rate_limiter.max_throttle_retries:
+                return self._result(response, stream)
+
+            response.close()
+            throttle_retries += 1
+
+    def _result(self, response: requests.Response, stream: bool):
+        if stream and response.status_code < 400:
+            return response
+
+        return self._decode(response)
+
+    def _decode(self, response: requests.Response):
+        if response.status_code >= 400:
+            raise api_error(response.status_code, response.content, response.headers.get('Retry-After'))
+
+        # Decoded straight from the body bytes, skipping the charset detection of response.json()
+        return self.decoder(response.content)
+
+    def download(
+            self,
+            url: str,
+            file: BinaryIO,
+            *,
+            offset: int = 0,
+            size: Optional[int] = None,
+            authenticate: bool = False,
+            max_resumes: int = 3,
+            timeout: Optional[Timeout] = None
+    ) -> int:
+        """
+        Streams the body of url into a binary file in chunks and returns the number of bytes of the body
+        the file holds. Connection errors and bodies shorter than size are resumed with a Range request.
+
+        offset: int : Bytes of the body already in the file before its current position, requested with Range
+        size: int : Expected body size, used to detect truncated transfers
+        authenticate: bool : Send the API token; off by default, as file URLs may point to other hosts
+        max_resumes: int : Times an interrupted transfer is resumed
+        """
+
+        timeout = self.timeout if timeout is None else timeout
+        headers = {} if authenticate else {'Api-Token': None}
+        resumes = 0
+
+        while True:
+            if offset:
+                headers['Range'] = f'bytes={offset}-'
+
+            try:
+                with self.session.get(url, headers=headers, stream=True, timeout=timeout) as response:
+                    if response.status_code == 416 and size is not None and offset >= size:
+                        return offset
+                    if response.status_code >= 400:
+                        raise api_error(response.status_code, response.content, response.headers.get('Retry-After'))
+
+                    if offset and response.status_code != 206:
+                        # Range not supported: start over
+                        offset = _rewind(file, offset)
+
+                    for chunk in response.iter_content(self.STREAM_CHUNK_SIZE):
+                        file.write(chunk)
+                        offset += len(chunk)
+            except (*self.NETWORK_ERRORS, requests.exceptions.ChunkedEncodingError):
+                if resumes >= max_resumes:
+                    raise
+            else:
+                if size is None or offset >= size or resumes >= max_resumes:
+                    return offset
+
+            resumes += 1
+
+    @property
+    def executor(self) -> ThreadPoolExecutor:
+        """
+        Worker pool for concurrent requests, sized to the connection pool.
+        """
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=self.pool_maxsize, thread_name_prefix='finolog')
+        return self._executor
+
+    def submit(self, fn: Callable, *args) -> Future:
+        """
+        Runs fn on the worker pool in a copy of the current context.
+        """
+        return submit(self.executor, fn, *args)
+
+    @property
+    def hedge_executor(self) -> ThreadPoolExecutor:
+        """
+        Separate worker pool for hedged attempts, so hedging never waits on the pool it may be called from.
+        """
+        if self._hedge_executor is None:
+            self._hedge_executor = ThreadPoolExecutor(
+                max_workers=self.pool_maxsize * (self.hedge_policy.max_hedges + 1),
+                thread_name_prefix='finolog-hedge'
+            )
+        return self._hedge_executor
+
+    def close(self) -> None:
+        for executor in (self._executor, self._hedge_executor):
+            if executor is not None:
+                executor.shutdown(wait=False)
+        self._executor = self._hedge_executor = None
+        self.session.close()
+
+    def __enter__(self) -> 'FinologTransport':
+        return self
+
+    def __exit__(self, *args) -> None:
+        self.close()
+
+
+class AsyncFinologTransport:
+    """
+    Non-blocking HTTP transport for AsyncFinologClient, backed by aiohttp.
+
+    Accepts the same options as FinologTransport except pool_block: aiohttp always waits
+    for a free connection. The aiohttp session is opened lazily on the first request,
+    so the transport can be created outside of a running loop.
+    """
+
+    DEFAULT_TIMEOUT = FinologTransport.DEFAULT_TIMEOUT
+
+    def __init__(
+            self,
+            api_token: str,
+            *,
+            pool_connections: int = 2,
+            pool_maxsize: int = 100,
+            keep_alive: bool = True,
+            timeout: Optional[Timeout] = DEFAULT_TIMEOUT,
+            coalesce_reads: bool = False,
+            cache: Optional['ResponseCache'] = None,
+            rate_limiter: Optional[AsyncRateLimiter] = None,
+            retry_policy: Optional[RetryPolicy] = None,
+            hedge_policy: Optional[HedgePolicy] = None,
+            decoder: Optional[Decoder] = None
+    ) -> None:
+        try:
+            import aiohttp
+        except ImportError:
+            raise ImportError('aiohttp is required for the async client: pip install finolog-sdk[async]')
+
+        if pool_maxsize < 1:
+            raise ValueError('pool_maxsize must be greater than 0')
+
+        self._aiohttp = aiohttp
+        self.api_token = api_token
+        self.pool_connections = pool_connections
+        self.pool_maxsize = pool_maxsize
+        self.keep_alive = keep_alive
+        self.timeout = timeout
+        self.single_flight = AsyncSingleFlight() if coalesce_reads else None
+        self.cache = cache
+        self.rate_limiter = rate_limiter
+        self.retry_policy = retry_policy
+        self.hedge_policy = hedge_policy
+        self.decoder = default_decoder() if decoder is None else decoder
+        self.network_errors = (aiohttp.ClientError, asyncio.TimeoutError)
+
+        self.session = None
+
+    def _client_timeout(self, timeout: Optional[Timeout]):
+        if timeout is None:
+            return self._aiohttp.ClientTimeout(total=None)
+        if isinstance(timeout, tuple):
+            connect, read = timeout
+            return self._aiohttp.ClientTimeout(sock_connect=connect, sock_read=read)
+        return self._aiohttp.ClientTimeout(total=timeout)
+
+    def _get_session(self):
+        if self.session is None or self.session.closed:
+            connector = self._aiohttp.TCPConnector(
+                limit=self.pool_maxsize * self.pool_connections,
+                limit_per_host=self.pool_maxsize,
+                force_close=not self.keep_alive
+            )
+            self.session = self._aiohttp.ClientSession(
+                connector=connector,
+                timeout=self._client_timeout(self.timeout)
+            )
+        return self.session
+
+    async def request(self, method: str, url: str, payload=None, *, timeout: Optional[Timeout] = None):
+        if payload is None:
+            payload = {}
+
+        deadline = current_deadline()
+        if deadline is None:
+            return await self._request(method, url, payload, timeout)
+
+        deadline.check()
+        try:
+            return await asyncio.wait_for(self._request(method, url, payload, timeout), deadline.remaining())
+        except asyncio.TimeoutError as e:
+            if deadline.expired:
+                raise DeadlineExceeded(f'deadline of {deadline.seconds}s exceeded') from e
+            raise
+
+    async def stream(
+            self,
+            method: str,
+            url: str,
+            payload=None,
+            *,
+            timeout: Optional[Timeout] = None
+    ) -> AsyncIterator[Any]:
+        """
+        Awaitable counterpart of FinologTransport.stream: sends the request and returns
+        an async iterator over the elements of the JSON array in the response.
+        """
+
+        if payload is None:
+            payload = {}
+
+        deadline = current_deadline()
+        if deadline is None:
+            return self._elements(await self._send(method, url, payload, timeout, stream=True))
+
+        deadline.check()
+        try:
+            response = await asyncio.wait_for(
+                self._send(method, url, payload, timeout, stream=True), deadline.remaining()
+            )
+        except asyncio.TimeoutError as e:
+            if deadline.expired:
+                raise DeadlineExceeded(f'deadline of {deadline.seconds}s exceeded') from e
+            raise
+
+        return self._elements(response)
+
+    async def _elements(self, response) -> AsyncIterator[Any]:
+        splitter = JSONArraySplitter()
+        try:
+            async for chunk in response.content.iter_chunked(FinologTransport.STREAM_CHUNK_SIZE):
+                for element in splitter.feed(chunk):
+                    yield self.decoder(element)
+            splitter.close()
+        finally:
+            response.release()
+
+    async def _request(self, method: str, url: str, payload, timeout: Optional[Timeout]):
+        if self.cache is None:
+            return await self._dispatch(method, url, payload, timeout)
+
+        cached = self.cache.get(method, url, payload)
+        if cached is not None:
+            return cached
+
+        generation = self.cache.generation
+        try:
+            response = await self._dispatch(method, url, payload, timeout)
+        finally:
+            if method != 'GET':
+                self.cache.invalidate_for_write(url)
+
+        self.cache.set(method, url, payload, response, generation)
+
+        return response
+
+    async def _dispatch(self, method: str, url: str, payload, timeout: Optional[Timeout]):
+        if method == 'GET' and self.single_flight is not None:
+            return await self.single_flight.do(
+                request_key(method, url, payload),
+                lambda: self._send(method, url, payload, timeout),
+                current_deadline()
+            )
+
+        return await self._send(method, url, payload, timeout)
+
+    async def _send(self, method: str, url: str, payload, timeout: Optional[Timeout], stream: bool = False):
+        kwargs = {'json': payload, 'headers': {'Api-Token': self.api_token}}
+        if timeout is not None:
+            kwargs['timeout'] = self._client_timeout(timeout)
+
+        if stream:
+            send = partial(self._attempt, stream=True)
+        elif method == 'GET' and self.hedge_policy is not None:
+            send = self._hedged
+        else:
+            send = self._attempt
+
+        if self.retry_policy is None:
+            return await send(method, url, kwargs)
+
+        retries = 0
+        while True:
+            try:
+                return await send(method, url, kwargs)
+            except (APIError, *self.network_errors) as e:
+                status = e.status_code if isinstance(e, APIError) else None
+                # A 429 left over by the rate limiter has used up its throttle retries already
+                if status == 429 and self.rate_limiter is not None:
+                    raise
+                if not self.retry_policy.should_retry(method, retries, status):
+                    raise
+
+                delay = self.retry_policy.delay(retries, getattr(e, 'retry_after', None))
+                deadline = current_deadline()
+                if deadline is not None and delay >= deadline.remaining():
+                    raise
+
+                await asyncio.sleep(delay)
+                retries += 1
+
+    async def _hedged(self, method: str, url: str, kwargs):
+        threshold = self.hedge_policy.threshold(url)
+        started_at = time.monotonic()
+
+        if threshold is None:
+            response = await self._attempt(method, url, kwargs)
+            self.hedge_policy.record(url, time.monotonic() - started_at)
+            return response
+
+        tasks = {asyncio.ensure_future(self._attempt(method, url, kwargs))}
+        pending = set(tasks)
+        error = None
+
+        try:
+            while pending:
+                can_hedge = len(tasks) <= self.hedge_policy.max_hedges
+                done, pending = await asyncio.wait(
+                    pending, timeout=threshold if can_hedge else None, return_when=asyncio.FIRST_COMPLETED
+                )
+
+                if not done:
+                    hedge = asyncio.ensure_future(self._attempt(method, url, kwargs))
+                    tasks.add(hedge)
+                    pending.add(hedge)
+                    continue
+
+                for task in done:
+                    if task.exception() is None:
+                        self.hedge_policy.record(url, time.monotonic() - started_at)
+                        return task.result()
+                    error = task.exception()
+        finally:
+            for task in pending:
+                task.cancel()
+
+        raise error
+
+    async def _attempt(self, method: str, url: str, kwargs, stream: bool = False):
+        fetch = self._open if stream else self._fetch
+
+        if self.rate_limiter is None:
+            status, body, headers = await fetch(method, url, kwargs)
+            return self._result(status, body, headers, stream)
+
+        deadline = current_deadline()
+        throttle_retries = 0
+        while True:
+            if not await self.rate_limiter.acquire(None if deadline is None else deadline.remaining()):
+                raise DeadlineExceeded(f'deadline of {deadline.seconds}s exceeded')
+            try:
+                status, body, headers = await fetch(method, url, kwargs)
+            except BaseException:
+                await self.rate_limiter.release()
+                raise
+
+            await self.rate_limiter.release(status, parse_retry_after(headers.get('Retry-After')))
+
+            if status != 429 or throttle_retries >= self.rate_limiter.max_throttle_retries:
+                return self._result(status, body, headers, stream)
+
+            throttle_retries += 1
+
+    async def _fetch(self, method: str, url: str, kwargs):
+        async with self._get_session().request(method, url, **kwargs) as response:
+            return response.status, await response.read(), response.headers
+
+    async def _open(self, method: str, url: str, kwargs):
+        """
+        Like _fetch, but successful responses are returned open instead of their content.
+        """
+
+        response = await self._get_session().request(method, url, **kwargs)
+        if response.status < 400:
+            return response.status, response, response.headers
+
+        try:
+            return response.status, await response.read(), response.headers
+        finally:
+            response.release()
+
+    def _result(self, status: int, body, headers, stream: bool):
+        if stream and status < 400:
+            return body
+
+        return self._decode(status, body, headers)
+
+    def _decode(self, status: int, content: bytes, headers):
+        if status >= 400:
+            raise api_error(status, content, headers.get('Retry-After'))
+
+        return self.decoder(content)
+
+    async def download(
+            self,
+            url: str,
+            file: BinaryIO,
+            *,
+            offset: int = 0,
+            size: Optional[int] = None,
+            authenticate: bool = False,
+            max_resumes: int = 3,
+            timeout: Optional[Timeout] = None
+    ) -> int:
+        """
+        Awaitable counterpart of FinologTransport.download. Chunks are written to file from the event loop.
+        """
+
+        headers = {'Api-Token': self.api_token} if authenticate else {}
+        kwargs = {'headers': headers}
+        if timeout is not None:
+            kwargs['timeout'] = self._client_timeout(timeout)
+
+        resumes = 0
+
+        while True:
+            if offset:
+                headers['Range'] = f'bytes={offset}-'
+
+            try:
+                async with self._get_session().get(url, **kwargs) as response:
+                    if response.status == 416 and size is not None and offset >= size:
+                        return offset
+                    if response.status >= 400:
+                        raise api_error(response.status, await response.read(), response.headers.get('Retry-After'))
+
+                    if offset and response.status != 206:
+                        offset = _rewind(file, offset)
+
+                    async for chunk in response.content.iter_chunked(FinologTransport.STREAM_CHUNK_SIZE):
+                        file.write(chunk)
+                        offset += len(chunk)
+            except self.network_errors:
+                if resumes >= max_resumes:
+                    raise
+            else:
+                if size is None or offset >= size or resumes >= max_resumes:
+                    return offset
+
+            resumes += 1
+
+    async def close(self) -> None:
+        if self.session is not None:
+            await self.session.close()
+
+    async def __aenter__(self) -> 'AsyncFinologTransport':
+        return self
+
+    async def __aexit__(self, *args) -> None:
+        await self.close()
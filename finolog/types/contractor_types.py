@@ -4,6 +4,7 @@ from typing import List, Optional
 from pydantic import BaseModel, Field
 
 from finolog.types.requisite_types import Requisite
+from finolog.types.tracking import TrackedModel
 
 
 class ContractorSummary(BaseModel):
@@ -18,7 +19,7 @@ class ContractorSummary(BaseModel):
     contractor_id: int
 
 
-class Contractor(BaseModel):
+class Contractor(TrackedModel):
     id: int
     biz_id: int
     name: str
@@ -3,6 +3,8 @@ from typing import Any, List, Optional
 
 from pydantic import BaseModel, Field
 
+from finolog.types.tracking import TrackedModel
+
 
 class DocumentItemItem(BaseModel):
     id: int
@@ -154,7 +156,7 @@ class DocumentToContractor(BaseModel):
     summary: List[DocumentSummary]
 
 
-class Document(BaseModel):
+class Document(TrackedModel):
     id: int
     biz_id: int
     kind: str
@@ -1,10 +1,10 @@
 from datetime import datetime
 from typing import Any, Optional
 
-from pydantic import BaseModel
+from finolog.types.tracking import TrackedModel
 
 
-class Requisite(BaseModel):
+class Requisite(TrackedModel):
     id: int
     contractor_id: int
     name: str
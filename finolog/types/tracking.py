@@ -0,0 +1,43 @@
+from typing import Any, Dict, Set
+
+from pydantic import BaseModel, PrivateAttr
+
+
+class TrackedModel(BaseModel):
+    """
+    Model recording which of its fields were assigned since it was received, so that updates
+    can send just those fields with the update_from_model method of its service.
+
+    A field counts as changed while its value differs from the received one; setting it back
+    clears the change. Only assignments to top-level fields are tracked, not changes made
+    inside nested models or lists; nested tracked models, e.g. the requisites of a contractor,
+    record their own changes.
+    """
+
+    _originals: Dict[str, Any] = PrivateAttr(default_factory=dict)
+
+    def __setattr__(self, name: str, value: Any) -> None:
+        if name in self.__fields__ and name not in self._originals:
+            self._originals[name] = getattr(self, name)
+        super().__setattr__(name, value)
+
+    def copy(self, **kwargs) -> 'TrackedModel':
+        copied = super().copy(**kwargs)
+        copied._originals = dict(self._originals)
+        return copied
+
+    @property
+    def changed_fields(self) -> Set[str]:
+        return {name for name, original in self._originals.items() if getattr(self, name) != original}
+
+    def changes(self) -> Dict[str, Any]:
+        """
+        Returns the changed fields with their current values.
+        """
+        return {name: getattr(self, name) for name in self.changed_fields}
+
+    def clear_changes(self) -> None:
+        """
+        Takes the current values as the received ones, e.g. after they were saved.
+        """
+        self._originals.clear()
@@ -0,0 +1,184 @@
+import threading
+from collections import namedtuple
+from datetime import date, datetime
+from functools import lru_cache
+from typing import Any, Callable, Dict, Optional, Type, Tuple, List
+
+from pydantic import BaseModel
+from pydantic.datetime_parse import parse_date, parse_datetime
+from pydantic.fields import SHAPE_LIST, SHAPE_SINGLETON
+
+_MISSING = object()
+
+
+class ModelView:
+    """
+    Read-only view over a decoded response object, typed after a pydantic model.
+
+    Fields are converted only when they are read, and the result is kept: datetime and date
+    strings are parsed, nested objects become views of their own, everything else is returned
+    as decoded. Nothing is validated, so views are only meant for responses of a trusted API.
+
+    Use to_model() to get the validated pydantic model back.
+    """
+
+    __slots__ = ('_data', '_values')
+    __model__: Type[BaseModel] = BaseModel
+
+    def __init__(self, data: Dict[str, Any]) -> None:
+        self._data = data
+        self._values: Dict[str, Any] = dict()
+
+    def to_model(self) -> BaseModel:
+        return self.__model__(**self._data)
+
+    def dict(self) -> Dict[str, Any]:
+        """
+        Returns all fields converted, with nested views as dicts, like BaseModel.dict().
+        """
+        return {name: _to_dict(getattr(self, name)) for name in self.__model__.__fields__}
+
+    def __eq__(self, other: Any) -> bool:
+        if isinstance(other, ModelView):
+            return self.__model__ is other.__model__ and self._data == other._data
+        return NotImplemented
+
+    def __hash__(self) -> int:
+        # Equal views hold equal data, so they share the id
+        return hash((self.__model__, self._data.get('id')))
+
+    def __repr__(self) -> str:
+        return f'{self.__class__.__name__}(id={self._data.get("id")!r})'
+
+
+def _to_dict(value: Any) -> Any:
+    if isinstance(value, ModelView):
+        return value.dict()
+    if isinstance(value, list):
+        return [_to_dict(v) for v in value]
+    return value
+
+
+def _converter(field) -> Optional[Callable[[Any], Any]]:
+    """
+    Returns the function converting a decoded value of the field, or None if it is used as is.
+    """
+
+    type_ = field.type_
+    if isinstance(type_, type) and issubclass(type_, BaseModel):
+        convert = view_class(type_)
+    elif type_ is datetime:
+        convert = parse_datetime
+    elif type_ is date:
+        convert = parse_date
+    else:
+        return None
+
+    if field.shape == SHAPE_SINGLETON:
+        return convert
+    if field.shape == SHAPE_LIST:
+        return lambda values: [convert(v) for v in values]
+    return None
+
+
+def _field_property(name: str, key: str, field) -> property:
+    convert = _converter(field)
+
+    def get(self: ModelView) -> Any:
+        values = self._values
+        value = values.get(name, _MISSING)
+        if value is not _MISSING:
+            return value
+
+        value = self._data.get(key, _MISSING)
+        if value is _MISSING:
+            value = field.get_default()
+        elif value is not None and convert is not None:
+            value = convert(value)
+
+        values[name] = value
+        return value
+
+    return property(get)
+
+
+_view_classes: Dict[Type[BaseModel], Type[ModelView]] = dict()
+_view_classes_lock = threading.RLock()
+
+
+def view_class(model: Type[BaseModel]) -> Type[ModelView]:
+    """
+    Returns the ModelView subclass of a model, building it on first use.
+    """
+
+    cls = _view_classes.get(model)
+    if cls is not None:
+        return cls
+
+    with _view_classes_lock:
+        cls = _view_classes.get(model)
+        if cls is None:
+            namespace = {name: _field_property(name, field.alias, field) for name, field in model.__fields__.items()}
+            cls = type(f'{model.__name__}View', (ModelView,), {**namespace, '__slots__': (), '__model__': model})
+            _view_classes[model] = cls
+
+    return cls
+
+
+def view(model: Type[BaseModel], data: Dict[str, Any]) -> ModelView:
+    return view_class(model)(data)
+
+
+class Projection:
+    """
+    Builds narrow records holding only the requested fields of a decoded object.
+
+    Fields are given as dotted paths into the model, e.g. 'package.total_price', and become
+    attributes of a namedtuple with dots replaced by underscores (package_total_price).
+    Values are converted like ModelView fields; nested objects that are not requested are never touched.
+    """
+
+    def __init__(self, model: Type[BaseModel], fields: Tuple[str, ...]) -> None:
+        self.model = model
+        self.fields = fields
+        self.getters = [self._getter(model, path) for path in fields]
+        self.record = namedtuple(f'{model.__name__}Record', [path.replace('.', '_') for path in fields])
+
+    @staticmethod
+    def _getter(model: Type[BaseModel], path: str) -> Callable[[Dict[str, Any]], Any]:
+        keys: List[str] = []
+        field = None
+
+        for part in path.split('.'):
+            if field is not None:
+                if not (field.shape == SHAPE_SINGLETON and isinstance(field.type_, type)
+                        and issubclass(field.type_, BaseModel)):
+                    raise ValueError(f'{path}: {field.name} has no fields to select')
+                model = field.type_
+
+            field = model.__fields__.get(part)
+            if field is None:
+                raise ValueError(f'{path}: unknown field {part} of {model.__name__}')
+            keys.append(field.alias)
+
+        convert = _converter(field)
+        *parents, last = keys
+
+        def get(obj: Dict[str, Any]) -> Any:
+            for key in parents:
+                obj = obj.get(key)
+                if obj is None:
+                    return None
+
+            value = obj.get(last)
+            return value if value is None or convert is None else convert(value)
+
+        return get
+
+    def __call__(self, obj: Dict[str, Any]) -> tuple:
+        return self.record._make([get(obj) for get in self.getters])
+
+
+@lru_cache(maxsize=128)
+def projection(model: Type[BaseModel], fields: Tuple[str, ...]) -> Projection:
+    return Projection(model, fields)
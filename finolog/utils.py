@@ -1,3 +1,5 @@
+from typing import Any, Iterable, List
+
 from finolog.exceptions import ErrorDetail, ValidationError
 
 
@@ -6,3 +8,48 @@ def validate_string_length(field_name: str, value: str, *, min_l: int = 0, max_l
     if _len < min_l or _len > max_l:
         raise ValidationError([ErrorDetail(f'must be between {min_l} and {max_l} characters long', field_name)])
     return True
+
+
+class BulkResult(dict):
+    """
+    A dict of fetched objects keyed by id that additionally reports requested ids which were not found.
+    """
+
+    def __init__(self, *args, missing=(), **kwargs):
+        super().__init__(*args, **kwargs)
+        self.missing = list(missing)
+
+    @classmethod
+    def from_objects(cls, requested: Iterable[int], objects: Iterable[Any]) -> 'BulkResult':
+        result = cls((obj.id, obj) for obj in objects)
+        result.missing = [id_ for id_ in requested if id_ not in result]
+        return result
+
+    def __repr__(self):
+        return f'BulkResult({super().__repr__()}, missing={self.missing!r})'
+
+
+def chunk_ids(ids: Iterable[int], *, max_ids: int = 100, max_length: int = 1500) -> List[List[int]]:
+    """
+    Splits ids into deduplicated chunks, each small enough for one comma-separated `ids` filter.
+    """
+
+    chunks = list()
+    chunk, length = list(), 0
+
+    for id_ in dict.fromkeys(ids):
+        if not isinstance(id_, int):
+            raise ValidationError([ErrorDetail(f'must be of type {int}', 'ids')])
+
+        id_length = len(str(id_)) + 1
+        if chunk and (len(chunk) >= max_ids or length + id_length > max_length):
+            chunks.append(chunk)
+            chunk, length = list(), 0
+
+        chunk.append(id_)
+        length += id_length
+
+    if chunk:
+        chunks.append(chunk)
+
+    return chunks
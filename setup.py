@@ -50,6 +50,11 @@ setup(
     download_url="https://github.com/RTHeLL/finolog-sdk/archive/master.zip",
     packages=find_packages(exclude=['tests']),
     install_requires=requirements(),
+    extras_require={
+        'async': ['aiohttp>=3.8'],
+        'speedups': ['orjson>=3.6'],
+        'analytics': ['numpy>=1.20', 'pyarrow>=8'],
+    },
     setup_requires=['wheel'],
     classifiers=[
         "License :: OSI Approved :: Apache Software License",
@@ -58,7 +63,6 @@ setup(
         "Development Status :: 3 - Alpha",
         "Programming Language :: Python",
         "Programming Language :: Python :: 3",
-        "Programming Language :: Python :: 3.6",
         "Programming Language :: Python :: 3.7",
         "Programming Language :: Python :: 3.8",
         "Programming Language :: Python :: 3.9",
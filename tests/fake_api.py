@@ -0,0 +1,72 @@
+import json
+import threading
+from urllib.parse import urlparse
+
+import requests
+from requests.adapters import BaseAdapter
+
+TIMESTAMP = '2023-02-10 10:00:00'
+
+
+def requisite(id_, contractor_id=1, inn=None):
+    return dict(
+        id=id_, contractor_id=contractor_id, name=f'Requisite {id_}', description=None, full_name=None, inn=inn,
+        kpp=None, bank_name=None, bank_bic=None, bank_ks=None, bank_account=None, address_postal_index=None,
+        address_city=None, address_street=None, created_at=TIMESTAMP, updated_at=TIMESTAMP, created_by_id=1,
+        updated_by_id=1, deleted_at=None, deleted_by_id=None, email=None, web=None, phone=None, is_bizzed=False,
+        bank_iban=None, bank_mfo=None, country_id=1, biz_id=1
+    )
+
+
+def contractor(id_, name=None, requisites=None):
+    obj = dict(
+        id=id_, biz_id=1, name=name or f'Contractor {id_}', email=f'c{id_}@example.com', phone=None, person=None,
+        description=None, created_at=TIMESTAMP, updated_at=TIMESTAMP, created_by_id=1, updated_by_id=1,
+        deleted_at=None, deleted_by_id=None, alien_id=None, is_bizzed=False, group_id=None, autoeditor_id=None,
+        summary=[]
+    )
+    if requisites is not None:
+        obj['requisites'] = requisites
+    return obj
+
+
+class FakeAPI(BaseAdapter):
+    """
+    requests adapter answering with handler(method, path, payload) -> (status, data) or
+    (status, data, headers); exceptions raised by the handler are raised by send. Paths are relative to the API root, e.g. 'biz/1/contractor'. Sent requests are kept in calls.
+    """
+
+    def __init__(self, handler):
+        super().__init__()
+        self.handler = handler
+        self.calls = []
+        self._lock = threading.Lock()
+
+    def send(self, request, stream=False, timeout=None, **kwargs):
+        path = urlparse(request.url).path.replace('/v1/', '', 1)
+        payload = json.loads(request.body) if request.body else {}
+        with self._lock:
+            self.calls.append((request.method, path, payload))
+
+        status, data, *headers = self.handler(request.method, path, payload)
+
+        response = requests.Response()
+        response.status_code = status
+        response.headers.update(*headers)
+        response._content = json.dumps(data).encode()
+        response.url = request.url
+        response.request = request
+        return response
+
+    def close(self):
+        pass
+
+
+def install(transport, handler):
+    """
+    Routes the requests of a FinologTransport to a FakeAPI and returns it.
+    """
+
+    adapter = FakeAPI(handler)
+    transport.session.mount('https://', adapter)
+    return adapter
@@ -0,0 +1,29 @@
+from datetime import date
+from unittest import TestCase
+
+import finolog.analytics as analytics
+from finolog.analytics import ContractorBalances
+
+
+def summary(balance, date_, currency_id=1):
+    return dict(date=date_, currency_id=currency_id, balance=balance, incoming=0, outcoming=0,
+                base_balance=balance, base_incoming=0, base_outcoming=0)
+
+
+class AgingTest(TestCase):
+    def setUp(self):
+        self.balances = ContractorBalances().extend([
+            {'id': 1, 'name': 'Acme', 'summary': [summary(10, '2023-01-01'), summary(20, '2022-12-01')]},
+            {'id': 2, 'name': 'Beta', 'summary': [summary(40, '2022-08-01', 2), summary(80, None)]},
+        ])
+        self.expected = {'0-30': {1: 10.0}, '31-60': {1: 20.0}, '61-90': {}, '90+': {2: 40.0}}
+
+    def test_null_dates_are_left_out(self):
+        self.assertEqual(self.balances.aging(date(2023, 1, 1)), self.expected)
+
+    def test_pure_python_matches(self):
+        numpy, analytics._numpy = analytics._numpy, lambda: None
+        try:
+            self.assertEqual(self.balances.aging(date(2023, 1, 1)), self.expected)
+        finally:
+            analytics._numpy = numpy
@@ -0,0 +1,61 @@
+from unittest import TestCase
+
+from finolog.client import FinologClient
+from finolog.exceptions import ValidationError
+from finolog.utils import chunk_ids
+
+from tests.fake_api import contractor, install, requisite
+
+
+class ChunkIdsTest(TestCase):
+    def test_deduplicates_in_order(self):
+        self.assertEqual(chunk_ids([3, 1, 3, 2, 1]), [[3, 1, 2]])
+
+    def test_max_ids(self):
+        self.assertEqual(chunk_ids(range(5), max_ids=2), [[0, 1], [2, 3], [4]])
+
+    def test_max_length(self):
+        chunks = chunk_ids(range(1000, 1100), max_length=50)
+
+        self.assertEqual([id_ for chunk in chunks for id_ in chunk], list(range(1000, 1100)))
+        self.assertTrue(all(len(','.join(map(str, chunk))) <= 50 for chunk in chunks))
+
+    def test_empty(self):
+        self.assertEqual(chunk_ids([]), [])
+
+    def test_rejects_non_int(self):
+        with self.assertRaises(ValidationError):
+            chunk_ids([1, '2'])
+
+
+class GetByIdsTest(TestCase):
+    def setUp(self):
+        self.client = FinologClient('token', 1, retry_policy=None)
+        self.api = install(self.client.transport, self.handle)
+
+    def handle(self, method, path, payload):
+        ids = [int(id_) for id_ in payload['ids'].split(',')]
+        if path == 'biz/1/contractor':
+            return 200, [contractor(id_) for id_ in ids if id_ % 10]
+        if path == 'biz/1/requisite':
+            return 200, [requisite(id_) for id_ in ids if id_ % 10]
+        raise AssertionError((method, path))
+
+    def test_contractors_by_ids(self):
+        result = self.client.contractor.get_contractors_by_ids(list(range(1, 251)) + [5], with_='requisites')
+
+        self.assertEqual(len(result), 225)
+        self.assertEqual(result[5].id, 5)
+        self.assertEqual(result.missing, list(range(10, 251, 10)))
+        self.assertEqual(len(self.api.calls), 3)
+        self.assertTrue(all(payload['with'] == 'requisites' for _, _, payload in self.api.calls))
+
+    def test_requisites_by_ids(self):
+        result = self.client.requisite.get_requisites_by_ids([1, 2, 10])
+
+        self.assertEqual(sorted(result), [1, 2])
+        self.assertEqual(result.missing, [10])
+
+    def test_no_ids_sends_nothing(self):
+        self.assertEqual(self.client.contractor.get_contractors_by_ids([]), {})
+        self.assertEqual(self.api.calls, [])
@@ -0,0 +1,108 @@
+import os
+import tempfile
+from unittest import TestCase
+
+from finolog.cache import LRUCacheBackend, ResponseCache, SQLiteCacheBackend
+
+BIZ = 'https://api.finolog.ru/v1/biz/1'
+
+
+class InvalidatedUrlsTest(TestCase):
+    def urls(self, url):
+        return list(ResponseCache._invalidated_urls(url))
+
+    def test_entity(self):
+        self.assertEqual(self.urls(f'{BIZ}/contractor/5'), [
+            (f'{BIZ}/contractor/5', True),
+            (f'{BIZ}/contractor', False),
+            (f'{BIZ}/orders/document', True),
+        ])
+
+    def test_collection(self):
+        self.assertEqual(self.urls(f'{BIZ}/contractor'), [
+            (f'{BIZ}/contractor', False),
+            (f'{BIZ}/orders/document', True),
+        ])
+
+    def test_embedding_collections(self):
+        self.assertEqual(self.urls(f'{BIZ}/requisite/3'), [
+            (f'{BIZ}/requisite/3', True),
+            (f'{BIZ}/requisite', False),
+            (f'{BIZ}/contractor', True),
+            (f'{BIZ}/orders/document', True),
+        ])
+
+    def test_not_embedded(self):
+        self.assertEqual(self.urls(f'{BIZ}/orders/document/7'), [
+            (f'{BIZ}/orders/document/7', True),
+            (f'{BIZ}/orders/document', False),
+        ])
+
+
+class BackendTestMixin:
+    def fill(self):
+        for key, url in (
+            ('list', f'{BIZ}/contractor'),
+            ('list-2', f'{BIZ}/contractor'),
+            ('one', f'{BIZ}/contractor/1'),
+            ('pdf', f'{BIZ}/contractor/1/pdf'),
+            ('other', f'{BIZ}/contractor/10'),
+            ('document', f'{BIZ}/orders/document'),
+        ):
+            self.backend.set(key, url, key, 60)
+
+    def present(self):
+        return {key for key in ('list', 'list-2', 'one', 'pdf', 'other', 'document') if self.backend.get(key)}
+
+    def test_invalidate_subtree(self):
+        self.fill()
+        self.backend.invalidate(f'{BIZ}/contractor/1')
+        self.assertEqual(self.present(), {'list', 'list-2', 'other', 'document'})
+
+        self.backend.invalidate(f'{BIZ}/contractor')
+        self.assertEqual(self.present(), {'document'})
+
+    def test_invalidate_url_only(self):
+        self.fill()
+        self.backend.invalidate(f'{BIZ}/contractor', subtree=False)
+        self.assertEqual(self.present(), {'one', 'pdf', 'other', 'document'})
+
+    def test_expired(self):
+        self.backend.set('old', f'{BIZ}/country', 'old', -1)
+        self.assertIsNone(self.backend.get('old'))
+
+
+class LRUCacheBackendTest(BackendTestMixin, TestCase):
+    def setUp(self):
+        self.backend = LRUCacheBackend()
+
+    def test_index_follows_eviction(self):
+        self.backend = LRUCacheBackend(maxsize=2)
+        self.fill()
+        self.backend.invalidate(BIZ)
+
+        self.assertEqual(self.present(), set())
+        self.assertEqual((self.backend._keys, self.backend._children), ({}, {}))
+
+
+class SQLiteCacheBackendTest(BackendTestMixin, TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.backend = SQLiteCacheBackend(os.path.join(self.directory.name, 'cache.db'))
+
+    def tearDown(self):
+        self.backend.close()
+        self.directory.cleanup()
+
+    def count(self):
+        return self.backend._db.execute('SELECT COUNT(*) FROM response_cache').fetchone()[0]
+
+    def test_expired_rows_are_deleted(self):
+        self.backend.set('a', f'{BIZ}/country', 'a', -1)
+        self.backend.set('b', f'{BIZ}/country', 'b', -1)
+        self.assertIsNone(self.backend.get('a'))
+        self.assertEqual(self.count(), 1)
+
+        self.backend.set('c', f'{BIZ}/country', 'c', 60)
+        self.assertEqual(self.count(), 1)
+        self.assertEqual(self.backend.get('c'), 'c')
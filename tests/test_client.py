@@ -0,0 +1,63 @@
+import asyncio
+import inspect
+from unittest import TestCase
+
+from finolog.client import AsyncFinologClient, FinologClient
+
+from tests.fake_api import contractor, requisite
+
+SERVICES = ('contractor', 'document', 'requisite', 'country')
+
+
+def public_methods(service):
+    return {name for name in dir(service) if not name.startswith('_') and callable(getattr(service, name))}
+
+
+class AsyncParityTest(TestCase):
+    def setUp(self):
+        self.client = FinologClient('token', 1)
+        self.async_client = AsyncFinologClient('token', 1)
+
+    def test_same_methods(self):
+        for name in SERVICES:
+            service, async_service = getattr(self.client, name), getattr(self.async_client, name)
+
+            self.assertEqual(public_methods(service), public_methods(async_service), name)
+            for method in public_methods(service):
+                # Methods sending requests are awaitable in the async client
+                if method in vars(type(service)) and not method.startswith('iter_'):
+                    self.assertTrue(inspect.iscoroutinefunction(getattr(async_service, method)), f'{name}.{method}')
+
+    def test_same_requests_and_results(self):
+        data = contractor(1, 'Acme', [requisite(11, 1)])
+        calls = []
+
+        def request(method, url, payload=None, **kwargs):
+            calls.append((method, url, payload))
+            return [data] if (method, url[-10:]) == ('GET', 'contractor') else data
+
+        async def async_request(method, url, payload=None, **kwargs):
+            return request(method, url, payload)
+
+        service, async_service = self.client.contractor, self.async_client.contractor
+        self.async_client.transport.request = async_request
+
+        async def main():
+            return [
+                await async_service.get_contractor(1),
+                await async_service.get_contractors(query='Acme', with_='requisites'),
+                await async_service.create_contractor(name='Acme')
+            ]
+
+        async_results = asyncio.run(main())
+        async_calls, calls[:] = list(calls), []
+
+        self.client.transport.request = request
+        results = [
+            service.get_contractor(1),
+            service.get_contractors(query='Acme', with_='requisites'),
+            service.create_contractor(name='Acme')
+        ]
+
+        self.assertEqual(async_results, results)
+        self.assertEqual(async_calls, calls)
@@ -0,0 +1,34 @@
+from datetime import date
+from unittest import TestCase
+
+from finolog.columnar import DATE, DocumentExport
+
+
+class DocumentExportTest(TestCase):
+    def setUp(self):
+        item = dict(id=7, item_id=1, item_name='Service', item_type='service', count=2, price=10.5,
+                    price_currency_id=1, vat=0, project_id=None)
+        self.export = DocumentExport().extend([
+            dict(id=1, number='1', date='2023-01-31', package=dict(currency_id=1, total_price=21, items=[item])),
+            dict(id=2, number='2', date=None, package=None),
+        ])
+
+    def test_dates_are_date_columns(self):
+        self.assertEqual(self.export.documents['date'].spec.kind, DATE)
+        self.assertEqual(self.export.documents['date'].to_list(), [date(2023, 1, 31), None])
+        self.assertEqual(self.export.items['document_date'].to_list(), [date(2023, 1, 31)])
+
+    def test_date_to_numpy(self):
+        dates = self.export.documents.to_numpy()['date']
+        self.assertEqual(str(dates.dtype), 'datetime64[D]')
+        self.assertEqual(str(dates[0]), '2023-01-31')
+
+    def test_export_keeps_growing_after_conversion(self):
+        documents = self.export.documents.to_numpy()
+        batch = self.export.documents.to_arrow()
+
+        self.export.extend([dict(id=3, number='3', date='2023-02-01', package=None)])
+
+        self.assertEqual(documents['id'].tolist(), [1, 2])
+        self.assertEqual(batch.num_rows, 2)
+        self.assertEqual(self.export.documents['id'].to_list(), [1, 2, 3])
@@ -0,0 +1,138 @@
+import asyncio
+from unittest import TestCase
+
+from finolog.client import AsyncFinologClient, FinologClient
+from finolog.exceptions import APIError, ValidationError
+from finolog.identity_map import IdentityMap
+from finolog.services.api_service import FinologAPIService
+from finolog.transport import api_error
+
+from tests.fake_api import contractor, install, requisite
+
+
+class GetOrCreateManyByInnTest(TestCase):
+    def setUp(self):
+        self.existing = [contractor(1, requisites=[requisite(11, 1, inn='7700000001')])]
+        self.created = dict()
+        self.fail_requisites = False
+
+        self.client = FinologClient('token', 1, retry_policy=None)
+        self.api = install(self.client.transport, self.handle)
+
+    def handle(self, method, path, payload):
+        if method == 'GET' and path == 'biz/1/contractor':
+            return 200, self.existing + list(self.created.values())
+        if method == 'POST' and path == 'biz/1/contractor':
+            id_ = 100 + len(self.api.calls)
+            self.created[id_] = contractor(id_, payload['name'])
+            return 200, self.created[id_]
+        if method == 'POST' and path == 'biz/1/requisite':
+            if self.fail_requisites:
+                return 500, {'message': 'requisite failed'}
+            obj = requisite(200 + payload['contractor_id'], payload['contractor_id'], payload['inn'])
+            self.created[payload['contractor_id']]['requisites'] = [obj]
+            return 200, obj
+        if method == 'DELETE' and path.startswith('biz/1/contractor/'):
+            return 200, self.created.pop(int(path.rsplit('/', 1)[1]))
+        raise AssertionError((method, path))
+
+    def get_or_create_many(self, records):
+        return self.client.contractor.get_or_create_many_by_inn(records)
+
+    def test_finds_existing_and_creates_missing(self):
+        results = self.get_or_create_many([
+            {'inn': '7700000001', 'name': 'Existing'},
+            {'inn': '7700000002', 'name': 'New'},
+            {'inn': '12', 'name': 'Invalid'},
+        ])
+
+        existing, created = results['7700000001']
+        self.assertEqual((existing.id, created), (1, False))
+
+        new, created = results['7700000002']
+        self.assertTrue(created)
+        self.assertEqual(new.requisites[0].inn, '7700000002')
+
+        error, created = results['12']
+        self.assertIsInstance(error, ValidationError)
+        self.assertFalse(created)
+
+        self.assertEqual([call[0] for call in self.api.calls].count('GET'), 1)
+
+    def test_failed_requisite_deletes_contractor(self):
+        self.fail_requisites = True
+
+        error, created = self.get_or_create_many([{'inn': '7700000002', 'name': 'New'}])['7700000002']
+
+        self.assertIsInstance(error, APIError)
+        self.assertFalse(created)
+        self.assertEqual(self.created, {})
+        self.assertEqual(self.api.calls[-1][0], 'DELETE')
+
+        # A second run does not find a half-created contractor and creates it once
+        self.fail_requisites = False
+        new, created = self.get_or_create_many([{'inn': '7700000002', 'name': 'New'}])['7700000002']
+
+        self.assertTrue(created)
+        self.assertEqual(list(self.created), [new.id])
+
+
+class AsyncGetOrCreateManyByInnTest(GetOrCreateManyByInnTest):
+    def setUp(self):
+        super().setUp()
+        self.async_client = AsyncFinologClient('token', 1, retry_policy=None)
+        self.async_client.transport.request = self.request
+
+    async def request(self, method, url, payload=None, **kwargs):
+        path = url[len(FinologAPIService.BASE_URI):]
+        self.api.calls.append((method, path, payload))
+
+        status, data = self.handle(method, path, payload)
+        if status >= 400:
+            raise api_error(status, str(data).encode())
+        return data
+
+    def get_or_create_many(self, records):
+        return asyncio.run(self.async_client.contractor.get_or_create_many_by_inn(records))
+
+
+class LoadDirectoryTest(TestCase):
+    def setUp(self):
+        self.client = FinologClient('token', 1, retry_policy=None)
+        self.api = install(self.client.transport, lambda method, path, payload: (200, [
+            contractor(1, 'Acme', [requisite(11, 1, inn='7700000001')])
+        ]))
+
+    def test_adds_requisites(self):
+        directory = self.client.contractor.load_directory()
+
+        self.assertEqual([entry.id for entry in directory.by_inn('7700000001')], [1])
+        self.assertEqual(self.api.calls[0][2]['with'], 'requisites')
+
+    def test_keeps_requested_entities(self):
+        self.client.contractor.load_directory(with_='debts')
+        self.client.contractor.load_directory(with_='requisites,debts')
+
+        self.assertEqual([call[2]['with'] for call in self.api.calls], ['debts,requisites', 'requisites,debts'])
+
+
+class EmbeddedRequisiteTest(TestCase):
+    def setUp(self):
+        self.stored = contractor(1, requisites=[requisite(11, 1, inn='7700000001')])
+        self.client = FinologClient('token', 1, retry_policy=None, identity_map=IdentityMap())
+        self.api = install(self.client.transport, self.handle)
+
+    def handle(self, method, path, payload):
+        if method == 'GET' and path == 'biz/1/contractor/1':
+            return 200, self.stored
+        if method == 'PUT' and path == 'biz/1/requisite/11':
+            updated = dict(self.stored['requisites'][0], **payload, updated_at='2023-02-11 10:00:00')
+            self.stored = dict(self.stored, requisites=[updated])
+            return 200, updated
+        raise AssertionError((method, path))
+
+    def test_requisite_write_refreshes_contractor(self):
+        self.assertIsNone(self.client.contractor.get_contractor(1).requisites[0].kpp)
+        self.client.requisite.update_requisite(11, kpp='770101001')
+
+        self.assertEqual(self.client.contractor.get_contractor(1).requisites[0].kpp, '770101001')
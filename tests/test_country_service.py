@@ -0,0 +1,51 @@
+import asyncio
+from unittest import TestCase
+
+from finolog.client import AsyncFinologClient
+from finolog.services.country_service import CountryCache
+
+COUNTRIES = [dict(id=1, code='RU', default_currency_id=1, name='Russia'), dict(id=2, code='kz', default_currency_id=3, name='Kazakhstan')]
+
+
+class AsyncCountryServiceTest(TestCase):
+    def setUp(self):
+        self.calls = 0
+
+    async def request(self, method, url, payload=None, **kwargs):
+        self.calls += 1
+        await asyncio.sleep(0.05)
+        return COUNTRIES
+
+    def service(self):
+        service = AsyncFinologClient('token', 1).country
+        service.cache = CountryCache()
+        service.request = self.request
+        return service
+
+    def test_concurrent_first_calls_load_once(self):
+        service = self.service()
+
+        async def lookups():
+            return await asyncio.gather(service.get_country(2), service.get_country_by_code('ru'), service.get_countries())
+
+        kz, ru, countries = asyncio.run(lookups())
+
+        self.assertEqual((kz.code, ru.id, len(countries)), ('kz', 1, 2))
+        self.assertEqual(self.calls, 1)
+
+    def test_cache_shared_by_event_loops(self):
+        service = self.service()
+
+        asyncio.run(service.get_countries(refresh=True))
+        asyncio.run(service.get_countries(refresh=True))
+
+        self.assertEqual(self.calls, 2)
+
+    def test_not_blocked_by_sync_load(self):
+        service = self.service()
+
+        with service.cache.lock:
+            # A sync service holding the loader lock must not block the event loop
+            countries = asyncio.run(service.get_countries(refresh=True))
+
+        self.assertEqual((len(countries), self.calls), (2, 1))
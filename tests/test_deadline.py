@@ -0,0 +1,79 @@
+import asyncio
+import threading
+import time
+from unittest import TestCase
+
+from finolog.deadline import Deadline, current_deadline
+from finolog.exceptions import DeadlineExceeded
+from finolog.ratelimit import RateLimiter
+from finolog.transport import SingleFlight
+
+
+class DeadlineTest(TestCase):
+    def test_nested_deadlines(self):
+        with Deadline(10) as outer:
+            with Deadline(1) as inner:
+                self.assertIs(current_deadline(), inner)
+            self.assertIs(current_deadline(), outer)
+        self.assertIsNone(current_deadline())
+
+    def test_shared_by_tasks(self):
+        deadline = Deadline(5)
+
+        async def task(delay):
+            with deadline:
+                await asyncio.sleep(delay)
+                self.assertIs(current_deadline(), deadline)
+            self.assertIsNone(current_deadline())
+
+        async def fan_out():
+            await asyncio.gather(task(0.02), task(0.01))
+
+        asyncio.run(fan_out())
+
+    def test_shared_by_threads(self):
+        deadline = Deadline(5)
+        errors = []
+
+        def worker(delay):
+            try:
+                with deadline:
+                    time.sleep(delay)
+            except Exception as e:
+                errors.append(e)
+
+        threads = [threading.Thread(target=worker, args=(delay,)) for delay in (0.03, 0.01, 0.02)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(errors, [])
+
+
+class DeadlineWaitTest(TestCase):
+    def test_rate_limiter_pause_is_capped(self):
+        limiter = RateLimiter()
+        limiter.paused_until = time.monotonic() + 3
+
+        started_at = time.monotonic()
+        self.assertFalse(limiter.acquire(timeout=0.2))
+        self.assertLess(time.monotonic() - started_at, 0.1)
+        self.assertEqual(limiter.in_flight, 0)
+
+        limiter.paused_until = 0
+        self.assertTrue(limiter.acquire(timeout=0.2))
+        self.assertEqual(limiter.in_flight, 1)
+
+    def test_single_flight_follower_uses_own_deadline(self):
+        flight = SingleFlight()
+        leader = threading.Thread(target=flight.do, args=('key', lambda: time.sleep(1) or 'result'))
+        leader.start()
+        time.sleep(0.05)
+
+        started_at = time.monotonic()
+        with self.assertRaises(DeadlineExceeded):
+            flight.do('key', lambda: 'other', Deadline(0.2))
+        self.assertLess(time.monotonic() - started_at, 0.5)
+
+        leader.join()
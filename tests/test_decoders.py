@@ -0,0 +1,38 @@
+import json
+import sys
+from unittest import TestCase, mock
+
+from finolog.client import FinologClient
+from finolog.decoders import default_decoder, json_decoder, orjson_decoder
+
+from tests.fake_api import contractor, install
+
+
+class DecoderTest(TestCase):
+    def test_json_decoder(self):
+        self.assertEqual(json_decoder('{"name": "Тест"}'.encode()), {'name': 'Тест'})
+
+    def test_default_decoder(self):
+        body = json.dumps([contractor(1, 'Acme')]).encode()
+
+        self.assertEqual(default_decoder()(body), json.loads(body))
+
+    def test_fallback(self):
+        with mock.patch.dict(sys.modules, {'orjson': None, 'msgspec': None}):
+            self.assertIs(default_decoder(), json_decoder)
+            with self.assertRaises(ImportError):
+                orjson_decoder()
+
+    def test_transport_option(self):
+        bodies = []
+
+        def decoder(content):
+            bodies.append(content)
+            return json.loads(content)
+
+        client = FinologClient('token', 1, retry_policy=None, decoder=decoder)
+        install(client.transport, lambda method, path, payload: (200, contractor(1, 'Acme')))
+
+        self.assertEqual(client.contractor.get_contractor(1).name, 'Acme')
+        self.assertEqual(len(bodies), 1)
+        self.assertIsInstance(bodies[0], bytes)
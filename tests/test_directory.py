@@ -0,0 +1,53 @@
+import threading
+from unittest import TestCase
+
+from finolog.directory import ContractorDirectory
+
+from tests.fake_api import contractor, requisite
+
+
+class ContractorDirectoryTest(TestCase):
+    def setUp(self):
+        self.directory = ContractorDirectory(
+            contractor(id_, f'Acme {id_}', [requisite(100 + id_, id_, inn=f'77000000{id_:02d}')]) for id_ in range(1, 21)
+        )
+
+    def test_lookups(self):
+        self.assertEqual(self.directory.by_inn(' 7700000003')[0].id, 3)
+        self.assertEqual(self.directory.by_email('C4@Example.com')[0].id, 4)
+        self.assertEqual([entry.id for entry in self.directory.search('acme 1', limit=None)], [1] + list(range(10, 20)))
+
+    def test_upsert_and_discard(self):
+        self.directory.upsert(contractor(3, 'Zeta', [requisite(1, 3, inn='1111111111')]))
+        self.directory.discard(4)
+
+        self.assertEqual(self.directory.by_inn('7700000003'), [])
+        self.assertEqual(self.directory.by_inn('1111111111')[0].name, 'Zeta')
+        self.assertEqual(self.directory.search('zet')[0].id, 3)
+        self.assertNotIn(4, self.directory)
+        self.assertEqual(len(self.directory), 19)
+
+    def test_lookups_during_upserts(self):
+        errors = []
+        done = threading.Event()
+
+        def search():
+            try:
+                while not done.is_set():
+                    for entry in self.directory.search('acme', limit=None):
+                        self.assertIsNotNone(entry.name)
+            except Exception as e:
+                errors.append(e)
+
+        readers = [threading.Thread(target=search) for _ in range(4)]
+        for reader in readers:
+            reader.start()
+        for i in range(3000):
+            id_ = i % 20 + 1
+            self.directory.upsert(contractor(id_, f'Acme {i}'))
+        done.set()
+        for reader in readers:
+            reader.join()
+
+        self.assertEqual(errors, [])
+        self.assertEqual(len(self.directory.search('acme', limit=None)), 20)
@@ -0,0 +1,70 @@
+import io
+import os
+import threading
+from unittest import TestCase
+
+import requests
+from requests.adapters import BaseAdapter
+
+from finolog.exceptions import DownloadError
+from finolog.transport import FinologTransport
+
+BODY = bytes(range(256)) * 40
+
+
+class FileHost(BaseAdapter):
+    """
+    Serves BODY, honouring Range unless ignore_range is set.
+    """
+
+    def __init__(self, ignore_range=False):
+        super().__init__()
+        self.ignore_range = ignore_range
+
+    def send(self, request, stream=False, timeout=None, **kwargs):
+        range_ = request.headers.get('Range')
+        start = int(range_[6:-1]) if range_ and not self.ignore_range else 0
+
+        response = requests.Response()
+        response.status_code = 206 if start else 200
+        response.raw = io.BytesIO(BODY[start:])
+        response.url = request.url
+        response.request = request
+        return response
+
+    def close(self):
+        pass
+
+
+class DownloadTest(TestCase):
+    def setUp(self):
+        self.transport = FinologTransport('token', retry_policy=None)
+
+    def test_download_to_pipe(self):
+        self.transport.session.mount('https://', FileHost())
+        read_fd, write_fd = os.pipe()
+        received = []
+        reader = threading.Thread(target=lambda: received.append(os.fdopen(read_fd, 'rb').read()))
+        reader.start()
+
+        with os.fdopen(write_fd, 'wb') as pipe:
+            self.assertEqual(self.transport.download('https://files.example/1.pdf', pipe), len(BODY))
+        reader.join()
+
+        self.assertEqual(received, [BODY])
+
+    def test_resume_without_range_rewinds_file(self):
+        self.transport.session.mount('https://', FileHost(ignore_range=True))
+        file = io.BytesIO(b'header' + BODY[:100])
+        file.seek(0, io.SEEK_END)
+
+        self.assertEqual(self.transport.download('https://files.example/1.pdf', file, offset=100), len(BODY))
+        self.assertEqual(file.getvalue(), b'header' + BODY)
+
+    def test_resume_without_range_into_pipe_fails(self):
+        self.transport.session.mount('https://', FileHost(ignore_range=True))
+        read_fd, write_fd = os.pipe()
+
+        with os.fdopen(read_fd, 'rb'), os.fdopen(write_fd, 'wb') as pipe:
+            with self.assertRaises(DownloadError):
+                self.transport.download('https://files.example/1.pdf', pipe, offset=100)
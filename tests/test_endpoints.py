@@ -0,0 +1,88 @@
+from unittest import TestCase
+
+from finolog.client import FinologClient
+from finolog.endpoints import ENDPOINTS
+from finolog.exceptions import APIError, ValidationError
+
+from tests.fake_api import contractor, install
+
+ITEM = {'item_id': 1, 'count': 2, 'price': 100}
+
+
+class EndpointSchemaTest(TestCase):
+    def test_aliases_and_flags(self):
+        payload = ENDPOINTS['contractor.list']({'with_': 'requisites', 'is_bizzed': True, 'inn': '7700000001'})
+
+        self.assertEqual(payload, {'with': 'requisites', 'is_bizzed': 'true', 'inn': '7700000001'})
+
+    def test_reports_every_problem(self):
+        with self.assertRaises(ValidationError) as raised:
+            ENDPOINTS['requisite.write']({'inn': '12', 'kpp': 770101001, 'unknown': 1})
+
+        self.assertEqual(
+            sorted((error.field, str(error)) for error in raised.exception.errors()),
+            [('inn', 'must be between 10 and 12 characters long'), ('kpp', f'must be of type {str}'),
+             ('unknown', 'unknown field')]
+        )
+
+    def test_reports_every_bad_item(self):
+        payload = {'type': 'invoice', 'items': [ITEM, {'price': '100'}, 'item', {'unknown': 1}]}
+
+        with self.assertRaises(ValidationError) as raised:
+            ENDPOINTS['document.create'](payload)
+
+        self.assertEqual(
+            [(error.field, str(error)) for error in raised.exception.errors()],
+            [('items[1].price', f'must be of type {int}'), ('items[2]', f'must be of type {dict}'),
+             ('items[3].unknown', 'unknown field')]
+        )
+
+    def test_required(self):
+        with self.assertRaises(ValidationError) as raised:
+            ENDPOINTS['contractor.create']({})
+
+        self.assertEqual([error.field for error in raised.exception.errors()], ['name'])
+
+    def test_without_validation_only_coerces(self):
+        payload = ENDPOINTS['contractor.list']({'with_': 'requisites', 'is_bizzed': False, 'inn': 12}, validate=False)
+
+        self.assertEqual(payload, {'with': 'requisites', 'is_bizzed': 'false', 'inn': 12})
+
+
+class ValidatePayloadsTest(TestCase):
+    def setUp(self):
+        self.sent = []
+
+    def handle(self, method, path, payload):
+        self.sent.append((method, path, payload))
+        if path == 'biz/1/contractor':
+            return 200, [contractor(1)]
+        return 500, {'message': 'failed'}
+
+    def client(self, validate_payloads):
+        client = FinologClient('token', 1, retry_policy=None, validate_payloads=validate_payloads)
+        install(client.transport, self.handle)
+        return client
+
+    def test_validate_payloads_off(self):
+        client = self.client(False)
+
+        client.contractor.get_contractors(inn='12', with_='requisites')
+
+        self.assertEqual(self.sent[-1][2], {'inn': '12', 'with': 'requisites'})
+
+    def test_validate_payloads_on(self):
+        client = self.client(True)
+
+        with self.assertRaises(ValidationError):
+            client.contractor.get_contractors(inn='12')
+        self.assertEqual(self.sent, [])
+
+    def test_bad_item_fails_only_its_document(self):
+        client = self.client(True)
+
+        results = client.document.create_documents([{'items': [ITEM]}, {'items': ['item']}])
+
+        self.assertIsInstance(results[0], APIError)
+        self.assertIsInstance(results[1], ValidationError)
+        self.assertEqual(len(self.sent), 1)
@@ -0,0 +1,27 @@
+from unittest import TestCase
+
+from finolog.client import FinologClient
+from finolog.idempotency import IdempotencyStore
+
+
+class IdempotencyStoreTest(TestCase):
+    def test_keeps_last_maxsize_keys(self):
+        store = IdempotencyStore(maxsize=2)
+        for key in 'abc':
+            store.set(key, {'id': key})
+
+        self.assertIsNone(store.get('a'))
+        self.assertEqual(store.get('c'), {'id': 'c'})
+
+    def test_unbounded(self):
+        store = IdempotencyStore(maxsize=None)
+        for key in range(100):
+            store.set(str(key), key)
+
+        self.assertEqual(store.get('0'), 0)
+
+    def test_default_store_of_service(self):
+        client = FinologClient('token', 1)
+
+        self.assertIsInstance(client.document.idempotency_store, IdempotencyStore)
+        self.assertIsNot(client.document.idempotency_store, FinologClient('token', 1).document.idempotency_store)
@@ -0,0 +1,78 @@
+import time
+from unittest import TestCase
+
+from finolog.identity_map import IdentityMap
+
+
+def obj(id_, updated_at='2023-02-10 10:00:00'):
+    return {'id': id_, 'updated_at': updated_at}
+
+
+class IdentityMapTest(TestCase):
+    def test_evicts_least_recently_used(self):
+        identity_map = IdentityMap(maxsize=3)
+        for id_ in range(1, 4):
+            identity_map.put('contractor', obj(id_))
+
+        identity_map.get('contractor', 1)
+        identity_map.put('contractor', obj(4))
+
+        self.assertEqual(len(identity_map), 3)
+        self.assertIsNone(identity_map.get('contractor', 2))
+        self.assertIsNotNone(identity_map.get('contractor', 1))
+
+    def test_harvest_is_bounded(self):
+        identity_map = IdentityMap(maxsize=100)
+        for id_ in range(1000):
+            identity_map.harvest('document', {**obj(id_), 'from_contractor': obj(id_)})
+
+        self.assertEqual(len(identity_map), 100)
+
+    def test_drops_expired_entries(self):
+        identity_map = IdentityMap(max_age=0.05)
+        identity_map.put('contractor', obj(1))
+        time.sleep(0.1)
+
+        self.assertIsNone(identity_map.get('contractor', 1))
+        self.assertEqual(len(identity_map), 0)
+
+    def test_keeps_newer_copy(self):
+        identity_map = IdentityMap()
+        identity_map.put('contractor', {**obj(1, '2023-03-01 00:00:00'), 'name': 'new'})
+        identity_map.put('contractor', {**obj(1), 'name': 'old'})
+
+        self.assertEqual(identity_map.get('contractor', 1)['name'], 'new')
+
+
+class EmbeddedEntitiesTest(TestCase):
+    def setUp(self):
+        self.identity_map = IdentityMap()
+        self.identity_map.harvest('contractor', {**obj(1), 'requisites': [obj(11), obj(12)]})
+        self.identity_map.harvest('document', {**obj(5), 'to_contractor': {**obj(1), 'requisites': [obj(11)]}})
+
+    def test_newer_copy_evicts_embedders(self):
+        self.identity_map.put('requisite', obj(11, '2023-02-11 10:00:00'))
+
+        self.assertIsNone(self.identity_map.get('contractor', 1))
+        self.assertIsNone(self.identity_map.get('document', 5))
+        self.assertIsNotNone(self.identity_map.get('requisite', 12))
+
+    def test_same_copy_keeps_embedders(self):
+        self.identity_map.harvest('contractor', {**obj(1), 'requisites': [obj(11), obj(12)]})
+
+        self.assertIsNotNone(self.identity_map.get('contractor', 1))
+        self.assertIsNotNone(self.identity_map.get('document', 5))
+
+    def test_evict_cascades(self):
+        self.identity_map.evict('requisite', 11)
+
+        self.assertIsNone(self.identity_map.get('contractor', 1))
+        self.assertIsNone(self.identity_map.get('document', 5))
+        self.assertIsNotNone(self.identity_map.get('requisite', 12))
+
+    def test_links_are_dropped_with_entries(self):
+        identity_map = IdentityMap(maxsize=2)
+        for id_ in range(1, 50):
+            identity_map.harvest('contractor', {**obj(id_), 'requisites': [obj(100 + id_)]})
+
+        self.assertLessEqual(len(identity_map._embedders), 1)
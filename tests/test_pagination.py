@@ -0,0 +1,60 @@
+import threading
+import time
+from unittest import TestCase
+
+from finolog.client import FinologClient
+
+from tests.fake_api import contractor, install
+
+
+class PaginationTest(TestCase):
+    def setUp(self):
+        self.total = 25
+        self.delays = dict()
+        self.requested = []
+        self.lock = threading.Lock()
+
+        self.client = FinologClient('token', 1, retry_policy=None, pool_maxsize=4)
+        self.api = install(self.client.transport, self.handle)
+
+    def handle(self, method, path, payload):
+        page, pagesize = payload['page'], payload['pagesize']
+        with self.lock:
+            self.requested.append(page)
+        time.sleep(self.delays.get(page, 0))
+
+        ids = range((page - 1) * pagesize + 1, min(page * pagesize, self.total) + 1)
+        return 200, [contractor(id_) for id_ in ids]
+
+    def ids(self, **kwargs):
+        return [obj.id for obj in self.client.contractor.iter_contractors(pagesize=10, **kwargs)]
+
+    def test_stops_after_short_page(self):
+        self.assertEqual(self.ids(), list(range(1, 26)))
+        self.assertEqual(self.requested, [1, 2, 3])
+
+    def test_stops_after_empty_page(self):
+        self.total = 20
+
+        self.assertEqual(self.ids(), list(range(1, 21)))
+        self.assertEqual(self.requested, [1, 2, 3])
+
+    def test_first_page(self):
+        self.assertEqual(self.ids(page=2), list(range(11, 26)))
+        self.assertEqual(self.requested, [2, 3])
+
+    def test_prefetch_keeps_page_order(self):
+        # Later pages answer first
+        self.delays = {1: 0.15, 2: 0.1, 3: 0.05}
+
+        self.assertEqual(self.ids(prefetch=3), list(range(1, 26)))
+
+    def test_prefetch_requests_ahead_within_limit(self):
+        self.total = 1000
+        contractors = self.client.contractor.iter_contractors(pagesize=10, prefetch=2)
+
+        next(contractors)
+        time.sleep(0.05)
+        self.assertEqual(sorted(self.requested), [1, 2, 3])
+
+        contractors.close()
@@ -0,0 +1,46 @@
+import time
+from unittest import TestCase
+
+from finolog.ratelimit import RateLimiter, parse_retry_after
+
+
+class RateLimiterTest(TestCase):
+    def setUp(self):
+        self.limiter = RateLimiter(rate=1000, max_concurrency=8)
+
+    def send(self, count):
+        for _ in range(count):
+            self.assertTrue(self.limiter.acquire(timeout=1))
+
+    def test_burst_of_errors_cuts_once(self):
+        self.send(8)
+        for _ in range(8):
+            self.limiter.release(503)
+
+        self.assertEqual(self.limiter.limit, 4)
+
+    def test_errors_after_window_cut_again(self):
+        self.send(2)
+        self.limiter.release(500)
+        self.limiter.release(500)
+        self.assertEqual(self.limiter.limit, 4)
+
+        self.send(1)
+        self.limiter.release(500)
+        self.assertEqual(self.limiter.limit, 2)
+
+    def test_no_cut_while_paused(self):
+        self.send(1)
+        self.limiter.release(429, retry_after=0.05)
+        self.assertEqual(self.limiter.limit, 4)
+        self.assertGreater(self.limiter.paused_until, time.monotonic())
+
+        self.limiter.paused_until = time.monotonic() - 1
+        self.send(1)
+        self.limiter.paused_until = time.monotonic() + 1
+        self.limiter.release(429)
+        self.assertEqual(self.limiter.limit, 4)
+
+    def test_parse_retry_after(self):
+        self.assertEqual(parse_retry_after('3'), 3.0)
+        self.assertIsNone(parse_retry_after('soon'))
@@ -0,0 +1,18 @@
+from unittest import TestCase
+
+from finolog.client import FinologClient
+
+from tests.fake_api import install, requisite
+
+
+class IterRequisitesTest(TestCase):
+    def setUp(self):
+        self.client = FinologClient('token', 1, retry_policy=None)
+        self.api = install(self.client.transport, lambda method, path, payload: (200, [requisite(11), requisite(12)]))
+
+    def test_lazy(self):
+        requisites = self.client.requisite.iter_requisites(contractor_id=1)
+        self.assertEqual(self.api.calls, [])
+
+        self.assertEqual([obj.id for obj in requisites], [11, 12])
+        self.assertEqual(len(self.api.calls), 1)
@@ -0,0 +1,130 @@
+import time
+from unittest import TestCase
+
+import requests
+
+from finolog.client import FinologClient
+from finolog.exceptions import APIError
+from finolog.ratelimit import RateLimiter
+from finolog.retry import HedgePolicy, RetryPolicy
+
+from tests.fake_api import contractor, install
+
+CONTRACTOR_URL = 'https://api.finolog.ru/v1/biz/1/contractor/1'
+
+
+class RetryTest(TestCase):
+    def setUp(self):
+        self.responses = []
+
+    def handle(self, method, path, payload):
+        response = self.responses.pop(0) if self.responses else (200, contractor(1))
+        if isinstance(response, Exception):
+            raise response
+        return response
+
+    def client(self, **options):
+        options.setdefault('retry_policy', RetryPolicy(total=3, backoff_factor=0.001, jitter=False))
+        client = FinologClient('token', 1, **options)
+        self.api = install(client.transport, self.handle)
+        return client
+
+    def test_get_retried_on_503(self):
+        client = self.client()
+        self.responses = [(503, {}), (503, {})]
+
+        self.assertEqual(client.contractor.get_contractor(1).id, 1)
+        self.assertEqual(len(self.api.calls), 3)
+
+    def test_get_retried_on_connection_error(self):
+        client = self.client()
+        self.responses = [requests.ConnectionError('reset')]
+
+        self.assertEqual(client.contractor.get_contractor(1).id, 1)
+        self.assertEqual(len(self.api.calls), 2)
+
+    def test_gives_up_after_total(self):
+        client = self.client()
+        self.responses = [(503, {})] * 5
+
+        with self.assertRaises(APIError):
+            client.contractor.get_contractor(1)
+        self.assertEqual(len(self.api.calls), 4)
+
+    def test_post_not_retried(self):
+        client = self.client()
+        self.responses = [(503, {})]
+
+        with self.assertRaises(APIError):
+            client.contractor.create_contractor(name='Acme')
+        self.assertEqual(len(self.api.calls), 1)
+
+    def test_post_retried_when_enabled(self):
+        client = self.client(retry_policy=RetryPolicy(backoff_factor=0.001, retry_non_idempotent=True))
+        self.responses = [(503, {})]
+
+        self.assertEqual(client.contractor.create_contractor(name='Acme').id, 1)
+        self.assertEqual(len(self.api.calls), 2)
+
+    def test_retry_after_honoured(self):
+        client = self.client()
+        self.responses = [(503, {}, {'Retry-After': '0.2'})]
+
+        started_at = time.monotonic()
+        client.contractor.get_contractor(1)
+
+        self.assertGreaterEqual(time.monotonic() - started_at, 0.2)
+
+    def test_429_retried_by_rate_limiter_only(self):
+        limiter = RateLimiter(rate=1000, default_pause=0.001, max_throttle_retries=2)
+        client = self.client(rate_limiter=limiter)
+        self.responses = [(429, {})] * 10
+
+        with self.assertRaises(APIError):
+            client.contractor.get_contractor(1)
+        self.assertEqual(len(self.api.calls), 3)
+
+    def test_429_retried_by_policy_without_rate_limiter(self):
+        client = self.client()
+        self.responses = [(429, {})] * 10
+
+        with self.assertRaises(APIError):
+            client.contractor.get_contractor(1)
+        self.assertEqual(len(self.api.calls), 4)
+
+
+class HedgeTest(TestCase):
+    def setUp(self):
+        self.calls = 0
+
+    def handle(self, method, path, payload):
+        self.calls += 1
+        if self.calls == 1:
+            time.sleep(0.5)
+        return 200, contractor(1)
+
+    def client(self):
+        self.policy = HedgePolicy(percentile=50, min_samples=3)
+        client = FinologClient('token', 1, retry_policy=None, hedge_policy=self.policy)
+        install(client.transport, self.handle)
+        return client
+
+    def test_hedge_after_percentile(self):
+        client = self.client()
+        for latency in (0.04, 0.05, 0.06):
+            self.policy.record(CONTRACTOR_URL, latency)
+
+        started_at = time.monotonic()
+        self.assertEqual(client.contractor.get_contractor(1).id, 1)
+
+        self.assertLess(time.monotonic() - started_at, 0.3)
+        self.assertEqual(self.calls, 2)
+
+    def test_no_hedge_without_samples(self):
+        client = self.client()
+
+        started_at = time.monotonic()
+        client.contractor.get_contractor(1)
+
+        self.assertGreaterEqual(time.monotonic() - started_at, 0.5)
+        self.assertEqual(self.calls, 1)
@@ -0,0 +1,83 @@
+import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor
+from unittest import TestCase
+
+from finolog.client import FinologClient
+from finolog.exceptions import APIError
+from finolog.transport import AsyncSingleFlight
+
+from tests.fake_api import contractor, install
+
+
+class CoalesceReadsTest(TestCase):
+    def setUp(self):
+        self.status = 200
+
+    def handle(self, method, path, payload):
+        time.sleep(0.2)
+        return self.status, contractor(int(path.rsplit('/', 1)[1])) if self.status == 200 else {'message': 'failed'}
+
+    def client(self, coalesce_reads=True):
+        client = FinologClient('token', 1, retry_policy=None, coalesce_reads=coalesce_reads)
+        self.api = install(client.transport, self.handle)
+        return client
+
+    def run_concurrently(self, fn, args):
+        with ThreadPoolExecutor(len(args)) as executor:
+            futures = [executor.submit(fn, arg) for arg in args]
+        return [future.exception() or future.result() for future in futures]
+
+    def test_identical_reads_share_one_request(self):
+        client = self.client()
+
+        results = self.run_concurrently(client.contractor.get_contractor, [1] * 8 + [2])
+
+        self.assertEqual([result.id for result in results], [1] * 8 + [2])
+        self.assertEqual(len(self.api.calls), 2)
+        # Callers get models of their own
+        self.assertIsNot(results[0], results[1])
+
+    def test_errors_are_shared(self):
+        client = self.client()
+        self.status = 500
+
+        results = self.run_concurrently(client.contractor.get_contractor, [1] * 4)
+
+        self.assertTrue(all(isinstance(result, APIError) for result in results))
+        self.assertEqual(len(self.api.calls), 1)
+
+    def test_writes_are_not_coalesced(self):
+        client = self.client()
+
+        self.run_concurrently(lambda id_: client.contractor.update_contractor(id_, name='Acme'), [1] * 3)
+
+        self.assertEqual(len(self.api.calls), 3)
+
+    def test_off_by_default(self):
+        client = self.client(coalesce_reads=False)
+
+        self.run_concurrently(client.contractor.get_contractor, [1] * 3)
+
+        self.assertEqual(len(self.api.calls), 3)
+
+
+class AsyncSingleFlightTest(TestCase):
+    def test_concurrent_calls_share_one_run(self):
+        runs = []
+
+        async def fetch():
+            runs.append(1)
+            await asyncio.sleep(0.05)
+            return 'result'
+
+        async def main():
+            flight = AsyncSingleFlight()
+            results = await asyncio.gather(*(flight.do('key', fetch) for _ in range(5)))
+            again = await flight.do('key', fetch)
+            return results, again
+
+        results, again = asyncio.run(main())
+
+        self.assertEqual(results, ['result'] * 5)
+        self.assertEqual((again, len(runs)), ('result', 2))
@@ -0,0 +1,65 @@
+import json
+from unittest import TestCase
+
+from finolog.streaming import JSONArraySplitter
+
+ELEMENTS = [
+    {'id': 1, 'name': 'Quote " and [brackets], {braces}'},
+    {'id': 2, 'name': 'Back\\slash\\', 'nested': [1, [2, {'a': '}'}]]},
+    {'id': 3, 'name': 'Юникод   \\"'},
+    'plain string, with comma',
+    42,
+    None,
+]
+
+
+def split(body, size):
+    splitter = JSONArraySplitter()
+    elements = []
+    for start in range(0, len(body), size):
+        elements.extend(splitter.feed(body[start:start + size]))
+    splitter.close()
+    return [json.loads(element) for element in elements]
+
+
+class JSONArraySplitterTest(TestCase):
+    def test_every_chunk_boundary(self):
+        body = json.dumps(ELEMENTS, ensure_ascii=False).encode()
+
+        for size in range(1, 24):
+            with self.subTest(size=size):
+                self.assertEqual(split(body, size), ELEMENTS)
+
+    def test_escapes_at_chunk_end(self):
+        body = b'["a\\\\", "b\\"]", "c"]'
+
+        for cut in range(1, len(body)):
+            with self.subTest(cut=cut):
+                splitter = JSONArraySplitter()
+                elements = splitter.feed(body[:cut]) + splitter.feed(body[cut:])
+                self.assertEqual([json.loads(element) for element in elements], ['a\\', 'b"]', 'c'])
+
+    def test_empty_array(self):
+        for body in (b'[]', b' [ ] ', b'[\n]'):
+            with self.subTest(body=body):
+                self.assertEqual(split(body, 1), [])
+
+    def test_whitespace_around_elements(self):
+        self.assertEqual(split(b'[ 1 ,\n{"a": 2} ]', 3), [1, {'a': 2}])
+
+    def test_ignores_data_after_array(self):
+        splitter = JSONArraySplitter()
+        self.assertEqual(splitter.feed(b'[1]'), [b'1'])
+        self.assertEqual(splitter.feed(b'[2]'), [])
+
+    def test_truncated_body(self):
+        for body in (b'', b'[', b'[1, 2', b'[{"a": 1}', b'["unterminated]'):
+            with self.subTest(body=body):
+                splitter = JSONArraySplitter()
+                splitter.feed(body)
+                with self.assertRaises(ValueError):
+                    splitter.close()
+
+    def test_not_an_array(self):
+        with self.assertRaises(ValueError):
+            JSONArraySplitter().feed(b'{"message": "error"}')
@@ -0,0 +1,101 @@
+import os
+import sqlite3
+import tempfile
+from unittest import TestCase
+
+from finolog.client import FinologClient
+from finolog.exceptions import APIError
+from finolog.sync import SQLiteMirror
+
+from tests.fake_api import contractor, install, requisite
+
+
+class SQLiteMirrorTest(TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, 'mirror.db')
+        self.mirror = SQLiteMirror(self.path)
+
+        self.contractors = {
+            id_: contractor(id_, requisites=[requisite(100 + id_, id_, inn=f'77000000{id_:02d}')]) for id_ in (1, 2, 3)
+        }
+        self.documents = {1: dict(id=1, number='1', date='2023-01-31', updated_at='2023-02-01 10:00:00',
+                                  deleted_at=None, package=dict(currency_id=1, total_price=10.0))}
+        self.during_walk = None
+        self.fail_page = None
+
+        self.client = FinologClient('token', 1, retry_policy=None)
+        install(self.client.transport, self.handle)
+
+    def tearDown(self):
+        self.mirror.close()
+        self.directory.cleanup()
+
+    def handle(self, method, path, payload):
+        if self.during_walk is not None:
+            self.during_walk()
+        if path == 'biz/1/contractor':
+            if payload['page'] == self.fail_page:
+                return 500, {'message': 'failed'}
+            start = (payload['page'] - 1) * payload['pagesize']
+            return 200, list(self.contractors.values())[start:start + payload['pagesize']]
+        if path == 'biz/1/orders/document':
+            return 200, list(self.documents.values())
+        raise AssertionError((method, path))
+
+    def test_initial_load(self):
+        stats = self.mirror.sync(self.client)
+
+        self.assertEqual(stats['contractors'].inserted, 3)
+        self.assertEqual(stats['requisites'].inserted, 3)
+        self.assertEqual(stats['documents'].inserted, 1)
+        self.assertEqual(self.mirror.query('SELECT inn FROM requisites WHERE contractor_id = 2'), [('7700000002',)])
+        self.assertEqual(self.mirror.query('SELECT total_price, date FROM documents'), [(10.0, '2023-01-31')])
+        self.assertEqual(self.mirror.watermark('documents'), '2023-02-01 10:00:00')
+
+    def test_update(self):
+        self.mirror.sync(self.client)
+        self.contractors[2] = dict(self.contractors[2], name='Renamed', updated_at='2023-03-01 10:00:00')
+
+        stats = self.mirror.sync(self.client)['contractors']
+
+        self.assertEqual((stats.inserted, stats.updated, stats.unchanged, stats.deleted), (0, 1, 2, 0))
+        self.assertEqual(self.mirror.query('SELECT name FROM contractors WHERE id = 2'), [('Renamed',)])
+
+    def test_tombstone_and_reappearance(self):
+        self.mirror.sync(self.client)
+        removed = self.contractors.pop(3)
+
+        stats = self.mirror.sync(self.client)
+        self.assertEqual((stats['contractors'].deleted, stats['requisites'].deleted), (1, 1))
+        self.assertEqual(
+            self.mirror.query('SELECT id FROM contractors WHERE deleted_at IS NOT NULL'), [(3,)]
+        )
+
+        self.contractors[3] = removed
+        stats = self.mirror.sync(self.client)['contractors']
+        self.assertEqual((stats.updated, stats.deleted), (1, 0))
+        self.assertEqual(self.mirror.query('SELECT count(*) FROM contractors WHERE deleted_at IS NULL'), [(3,)])
+
+    def test_database_not_locked_during_walk(self):
+        def write():
+            db = sqlite3.connect(self.path, timeout=0, isolation_level=None)
+            try:
+                db.execute('BEGIN IMMEDIATE')
+                db.execute('ROLLBACK')
+            finally:
+                db.close()
+
+        self.during_walk = write
+        self.mirror.sync(self.client)
+
+    def test_failed_walk_changes_nothing(self):
+        self.mirror.sync(self.client)
+        self.contractors[1] = dict(self.contractors[1], name='Renamed', updated_at='2023-03-01 10:00:00')
+        self.client.contractor.DEFAULT_PAGESIZE = 2
+        self.fail_page = 2
+
+        with self.assertRaises(APIError):
+            self.mirror.sync(self.client)
+        self.assertEqual(self.mirror.query('SELECT name FROM contractors WHERE id = 1'), [('Contractor 1',)])
+        self.assertEqual(self.mirror.query('SELECT count(*) FROM contractors WHERE deleted_at IS NULL'), [(3,)])
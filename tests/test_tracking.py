@@ -0,0 +1,83 @@
+import copy
+import pickle
+from unittest import TestCase
+
+from finolog.client import FinologClient
+from finolog.ratelimit import RateLimiter
+
+from tests.fake_api import contractor, install, requisite
+
+
+class TrackedModelTest(TestCase):
+    def setUp(self):
+        self.stored = contractor(1, 'Acme', [requisite(11, 1, inn='7700000001')])
+
+        self.client = FinologClient('secret-token', 1, retry_policy=None, rate_limiter=RateLimiter())
+        self.api = install(self.client.transport, self.handle)
+
+    def handle(self, method, path, payload):
+        if path == 'biz/1/contractor/1':
+            if method == 'PUT':
+                self.stored.update(payload)
+            return 200, self.stored
+        if method == 'PUT' and path == 'biz/1/requisite/11':
+            return 200, dict(self.stored['requisites'][0], **payload)
+        raise AssertionError((method, path))
+
+    def test_changes(self):
+        model = self.client.contractor.get_contractor(1)
+        self.assertEqual(model.changes(), {})
+
+        model.name = 'Beta'
+        model.email = 'new@example.com'
+        model.email = 'c1@example.com'
+        self.assertEqual(model.changes(), {'name': 'Beta'})
+
+        model.clear_changes()
+        self.assertEqual(model.changes(), {})
+
+    def test_update_sends_only_changed_fields(self):
+        model = self.client.contractor.get_contractor(1)
+        model.name = 'Beta'
+
+        updated = self.client.contractor.update_from_model(model)
+
+        self.assertEqual(self.api.calls[-1], ('PUT', 'biz/1/contractor/1', {'name': 'Beta'}))
+        self.assertEqual(updated.name, 'Beta')
+        self.assertEqual(model.changes(), {})
+
+    def test_no_changes_sends_no_request(self):
+        model = self.client.contractor.get_contractor(1)
+        calls = len(self.api.calls)
+
+        self.assertIs(self.client.contractor.update_from_model(model), model)
+        self.assertEqual(len(self.api.calls), calls)
+
+    def test_nested_requisite(self):
+        model = self.client.contractor.get_contractor(1)
+        model.requisites[0].kpp = '770101001'
+
+        updated = self.client.requisite.update_from_model(model.requisites[0])
+
+        self.assertEqual(self.api.calls[-1], ('PUT', 'biz/1/requisite/11', {'kpp': '770101001'}))
+        self.assertEqual(updated.kpp, '770101001')
+        self.assertEqual(model.changes(), {})
+
+    def test_views_are_rejected(self):
+        view = self.client.contractor.get_contractor(1, trust_responses=True)
+
+        with self.assertRaises(TypeError):
+            self.client.contractor.update_from_model(view)
+        with self.assertRaises(TypeError):
+            self.client.contractor.update_from_model(self.client.contractor.get_contractor(1).requisites[0])
+
+    def test_models_do_not_reference_the_client(self):
+        self.client.transport.submit(lambda: None).result()
+        model = self.client.contractor.get_contractor(1)
+        model.name = 'Beta'
+
+        data = pickle.dumps(model)
+        self.assertNotIn(b'secret-token', data)
+        self.assertEqual(pickle.loads(data).changes(), {'name': 'Beta'})
+        self.assertEqual(copy.deepcopy(model).changes(), {'name': 'Beta'})
+        self.assertEqual(model.copy(deep=True).changes(), {'name': 'Beta'})
@@ -0,0 +1,145 @@
+import asyncio
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from unittest import TestCase
+
+from finolog.transport import AsyncFinologTransport, FinologTransport
+
+
+class Server(ThreadingHTTPServer):
+    """
+    Local API answering every request with {"ok": true} after delay seconds;
+    counts the connections opened and the most requests served at once.
+    """
+
+    daemon_threads = True
+
+    def __init__(self, delay=0.0):
+        super().__init__(('127.0.0.1', 0), Handler)
+        self.delay = delay
+        self.connections = 0
+        self.active = 0
+        self.max_active = 0
+        self.lock = threading.Lock()
+        threading.Thread(target=self.serve_forever, args=(0.05,), daemon=True).start()
+
+    @property
+    def url(self):
+        return f'http://127.0.0.1:{self.server_port}/'
+
+    def stop(self):
+        self.shutdown()
+        self.server_close()
+
+
+class Handler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+
+    def setup(self):
+        super().setup()
+        with self.server.lock:
+            self.server.connections += 1
+
+    def do_GET(self):
+        self.rfile.read(int(self.headers.get('Content-Length', 0)))
+        with self.server.lock:
+            self.server.active += 1
+            self.server.max_active = max(self.server.max_active, self.server.active)
+
+        time.sleep(self.server.delay)
+        with self.server.lock:
+            self.server.active -= 1
+
+        body = json.dumps({'ok': True}).encode()
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        if self.close_connection:
+            self.send_header('Connection', 'close')
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+class TransportPoolTest(TestCase):
+    def setUp(self):
+        self.server = Server()
+        self.addCleanup(self.server.stop)
+
+    def test_keep_alive(self):
+        transport = FinologTransport('token')
+        for _ in range(3):
+            self.assertEqual(transport.request('GET', self.server.url), {'ok': True})
+
+        self.assertEqual(self.server.connections, 1)
+
+    def test_without_keep_alive(self):
+        transport = FinologTransport('token', keep_alive=False)
+        for _ in range(3):
+            transport.request('GET', self.server.url)
+
+        self.assertEqual(self.server.connections, 3)
+
+    def test_keeps_api_pool_with_file_hosts(self):
+        files = Server()
+        self.addCleanup(files.stop)
+        transport = FinologTransport('token')
+
+        for url in (self.server.url, files.url, self.server.url):
+            transport.request('GET', url)
+
+        self.assertEqual((self.server.connections, files.connections), (1, 1))
+
+    def test_pool_block(self):
+        self.server.delay = 0.05
+        transport = FinologTransport('token', pool_maxsize=2, pool_block=True)
+
+        threads = [threading.Thread(target=transport.request, args=('GET', self.server.url)) for _ in range(6)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(self.server.max_active, 2)
+        self.assertEqual(self.server.connections, 2)
+
+    def test_invalid_pool_maxsize(self):
+        with self.assertRaises(ValueError):
+            FinologTransport('token', pool_maxsize=0)
+
+
+class AsyncTransportPoolTest(TestCase):
+    def setUp(self):
+        self.server = Server(delay=0.05)
+        self.addCleanup(self.server.stop)
+
+    def run_requests(self, count, concurrently, **options):
+        async def main():
+            transport = AsyncFinologTransport('token', **options)
+            try:
+                if concurrently:
+                    return await asyncio.gather(*(transport.request('GET', self.server.url) for _ in range(count)))
+                return [await transport.request('GET', self.server.url) for _ in range(count)]
+            finally:
+                await transport.close()
+
+        return asyncio.run(main())
+
+    def test_keep_alive(self):
+        self.assertEqual(self.run_requests(3, False), [{'ok': True}] * 3)
+        self.assertEqual(self.server.connections, 1)
+
+    def test_without_keep_alive(self):
+        self.run_requests(3, False, keep_alive=False)
+
+        self.assertEqual(self.server.connections, 3)
+
+    def test_pool_maxsize(self):
+        self.run_requests(6, True, pool_maxsize=2)
+
+        self.assertEqual(self.server.max_active, 2)
+        self.assertEqual(self.server.connections, 2)
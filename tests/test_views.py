@@ -0,0 +1,101 @@
+from datetime import datetime
+from unittest import TestCase
+
+from finolog.client import FinologClient
+from finolog.types.contractor_types import Contractor
+from finolog.types.document_types import Document
+from finolog.types.views import ModelView, projection, view
+
+from tests.fake_api import contractor, install, requisite
+
+
+class ModelViewTest(TestCase):
+    def setUp(self):
+        self.data = contractor(1, 'Acme', [requisite(11, 1, inn='7700000001')])
+        self.view = view(Contractor, self.data)
+
+    def test_fields(self):
+        self.assertEqual(self.view.name, 'Acme')
+        self.assertEqual(self.view.created_at, datetime(2023, 2, 10, 10, 0))
+        self.assertEqual(self.view.requisites[0].inn, '7700000001')
+        self.assertIsInstance(self.view.requisites[0], ModelView)
+
+    def test_parsed_once(self):
+        self.assertIs(self.view.created_at, self.view.created_at)
+
+    def test_read_only(self):
+        with self.assertRaises(AttributeError):
+            self.view.name = 'Beta'
+
+    def test_to_model_and_dict(self):
+        model = self.view.to_model()
+
+        self.assertIsInstance(model, Contractor)
+        self.assertEqual(self.view.dict(), model.dict())
+
+    def test_equality_and_hash(self):
+        same = view(Contractor, dict(self.data))
+        other = view(Contractor, contractor(2))
+
+        self.assertEqual(self.view, same)
+        self.assertNotEqual(self.view, other)
+        self.assertEqual(len({self.view, same, other}), 2)
+
+
+class TrustResponsesTest(TestCase):
+    def setUp(self):
+        self.data = contractor(1, requisites=[requisite(11, 1)])
+        self.data['created_at'] = 'not a date'
+
+    def client(self, trust_responses):
+        client = FinologClient('token', 1, retry_policy=None, trust_responses=trust_responses)
+        install(client.transport, lambda method, path, payload: (200, self.data if path.endswith('/1') else [self.data]))
+        return client
+
+    def test_client_option(self):
+        client = self.client(True)
+
+        # Nothing is validated or parsed until read
+        result = client.contractor.get_contractor(1)
+        self.assertIsInstance(result, ModelView)
+        self.assertEqual(result.id, 1)
+        self.assertIsInstance(client.contractor.get_contractors()[0], ModelView)
+
+    def test_per_call_override(self):
+        client = self.client(False)
+
+        self.assertIsInstance(client.contractor.get_contractor(1, trust_responses=True), ModelView)
+        with self.assertRaises(ValueError):
+            client.contractor.get_contractor(1)
+
+
+class ProjectionTest(TestCase):
+    def setUp(self):
+        self.data = contractor(1, 'Acme', [requisite(11, 1, inn='7700000001')])
+
+    def test_fields(self):
+        project = projection(Contractor, ('id', 'name', 'created_at'))
+        record = project(self.data)
+
+        self.assertEqual(record, (1, 'Acme', datetime(2023, 2, 10, 10, 0)))
+        self.assertEqual(record._fields, ('id', 'name', 'created_at'))
+
+    def test_nested_fields(self):
+        project = projection(Document, ('id', 'package.total_price'))
+
+        record = project({'id': 5, 'package': {'total_price': 12.5, 'created_at': 'never read'}})
+        self.assertEqual(record.package_total_price, 12.5)
+        self.assertEqual(project({'id': 6, 'package': None}), (6, None))
+
+    def test_unknown_fields(self):
+        with self.assertRaises(ValueError):
+            projection(Contractor, ('id', 'nickname'))
+        with self.assertRaises(ValueError):
+            projection(Contractor, ('name.first',))
+
+    def test_listings(self):
+        client = FinologClient('token', 1, retry_policy=None)
+        install(client.transport, lambda method, path, payload: (200, [self.data, contractor(2, 'Beta')]))
+
+        self.assertEqual(client.contractor.get_contractors(fields=['id', 'name']), [(1, 'Acme'), (2, 'Beta')])
+        self.assertEqual([row.name for row in client.contractor.iter_contractors(fields='name')], ['Acme', 'Beta'])